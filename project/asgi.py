@@ -5,3 +5,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
 
 application = get_asgi_application()
+
+if os.environ.get('QUIZ_PRELOAD') == '1':
+    from project.preload import preload
+
+    preload()
@@ -0,0 +1,100 @@
+"""
+Прогрев процесса перед fork.
+
+При QUIZ_PRELOAD=1 модули project.wsgi и project.asgi вызывают preload()
+после создания приложения. Pre-fork сервер, загружающий приложение в
+мастер-процессе (например, gunicorn --preload), получает воркеры, которые
+делят прогретые страницы памяти с мастером по copy-on-write.
+"""
+
+import gc
+import logging
+import time
+from collections.abc import Callable
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+_warmup_hooks: list[Callable[[], None]] = []
+
+
+def register_warmup(func: Callable[[], None]) -> Callable[[], None]:
+    """
+    Регистрирует функцию прогрева кэша сервиса.
+
+    :param func: Функция без аргументов.
+    :return: Та же функция (можно использовать как декоратор).
+    """
+    _warmup_hooks.append(func)
+    return func
+
+
+def warm_orm_metadata() -> None:
+    """Заполняет кэши _meta всех моделей (поля, связи, обратные связи)."""
+    for model in apps.get_models():
+        meta = model._meta
+        meta.get_fields()
+        meta.concrete_fields
+        meta.local_concrete_fields
+        meta.related_objects
+        meta.fields_map
+
+
+def warm_url_resolvers() -> None:
+    """Импортирует URLconf со всеми представлениями и строит таблицы reverse."""
+    resolver = get_resolver()
+    resolver.reverse_dict
+    resolver.namespace_dict
+    resolver.app_dict
+
+
+def warm_schema() -> None:
+    """Загружает OpenAPI-схему в память процесса."""
+    from quiz.schema import get_schema
+
+    get_schema()
+
+
+def warm_question_bank() -> None:
+    """Загружает банк вопросов, если сервисы читают из памяти."""
+    if settings.QUIZ_SERVICE_BACKEND != 'memory':
+        return
+    from quiz.bank import get_bank
+
+    get_bank()
+
+
+def warm_autocomplete_index() -> None:
+    """Строит индекс подсказок автодополнения."""
+    from quiz.autocomplete import get_autocomplete_index
+
+    get_autocomplete_index()
+
+
+def preload() -> None:
+    """
+    Прогревает процесс перед fork.
+
+    После прогрева закрывает соединения с БД, чтобы воркеры не
+    унаследовали общий сокет, и замораживает сборщик мусора, чтобы
+    его проходы не копировали общие страницы.
+    """
+    started = time.perf_counter()
+    warm_orm_metadata()
+    warm_url_resolvers()
+    warm_schema()
+    warm_question_bank()
+    warm_autocomplete_index()
+    for hook in _warmup_hooks:
+        hook()
+    connections.close_all()
+    gc.collect()
+    gc.freeze()
+    logger.info(
+        'Preloaded in %.0f ms',
+        (time.perf_counter() - started) * 1000,
+    )
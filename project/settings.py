@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -9,7 +10,7 @@ DEBUG = True
 ALLOWED_HOSTS = []
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -21,6 +22,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'quiz.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -28,6 +30,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'quiz.middleware.ReplicaPinningMiddleware',
 ]
 
 ROOT_URLCONF = 'project.urls'
@@ -56,6 +59,40 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения: локально это копии db.sqlite3, которые обновляет
+# manage.py sync_replica. Количество задаётся переменной QUIZ_REPLICAS.
+QUIZ_READ_REPLICAS = []
+for replica_number in range(1, int(os.environ.get('QUIZ_REPLICAS', '0')) + 1):
+    replica_alias = f'replica_{replica_number}'
+    DATABASES[replica_alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db.{replica_alias}.sqlite3',
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    }
+    QUIZ_READ_REPLICAS.append(replica_alias)
+
+# Шарды квизов: QUIZ_SHARDS=N раскладывает квизы и вопросы по N файлам
+# db.shard_<n>.sqlite3 (схема создаётся manage.py init_shards).
+QUIZ_SHARDS = []
+for shard_number in range(int(os.environ.get('QUIZ_SHARDS', '0'))):
+    shard_alias = f'shard_{shard_number}'
+    DATABASES[shard_alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db.{shard_alias}.sqlite3',
+    }
+    QUIZ_SHARDS.append(shard_alias)
+# Размер диапазона идентификаторов квизов и вопросов одного шарда.
+QUIZ_SHARD_ID_SPAN = 10 ** 12
+
+DATABASE_ROUTERS = [
+    'quiz.routers.ShardRouter',
+    'quiz.routers.ReadWriteRouter',
+]
+# Сколько секунд после записи клиент читает из основной базы.
+QUIZ_REPLICA_PIN_SECONDS = 5
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -82,3 +119,76 @@ USE_TZ = True
 STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Размер порции строк для пакетных DELETE/UPDATE.
+QUIZ_DELETE_CHUNK_SIZE = 500
+# Начиная с этого числа вопросов удаление уходит в фоновую задачу.
+QUIZ_BACKGROUND_DELETE_THRESHOLD = 10_000
+# Выполнять фоновые задачи синхронно (удобно для тестов и отладки).
+QUIZ_JOBS_EAGER = False
+# 'thread' — задачи выполняет пул внутри веб-процесса,
+# 'external' — только отдельный процесс manage.py run_jobs.
+QUIZ_JOBS_MODE = 'thread'
+# Размер пула потоков/процессов для фоновых задач.
+QUIZ_JOBS_WORKERS = 2
+# Выполняющаяся задача отмечается живой не чаще раза в столько секунд
+# (при сообщении прогресса и проверке отмены).
+QUIZ_JOBS_HEARTBEAT_SECONDS = 30
+# Задача в статусе running без такой отметки дольше этого срока
+# считается брошенной упавшим воркером и возвращается в очередь, секунды.
+QUIZ_JOBS_STALE_SECONDS = 10 * 60
+# Пауза перед повтором упавшей задачи; удваивается с каждой попыткой.
+QUIZ_JOBS_RETRY_DELAY_SECONDS = 5
+
+# Файл с предсобранной OpenAPI-схемой (manage.py build_schema).
+QUIZ_SCHEMA_PATH = BASE_DIR / 'openapi.json'
+
+# Реализация сервисов: 'db' — запросы к БД, 'memory' — весь банк вопросов
+# в памяти процесса (quiz.bank), обновляемый по журналу изменений.
+QUIZ_SERVICE_BACKEND = os.environ.get('QUIZ_SERVICE_BACKEND', 'db')
+# Вести журнал изменений ChangeLog. По нему обновляются банк вопросов в
+# памяти и индекс подсказок /api/autocomplete/.
+QUIZ_CHANGE_LOG = True
+# Как часто банк в памяти проверяет журнал изменений, секунды.
+QUIZ_BANK_REFRESH_SECONDS = 1.0
+# Как часто индекс подсказок проверяет журнал изменений, секунды.
+QUIZ_AUTOCOMPLETE_REFRESH_SECONDS = 1.0
+# Сколько хранить записи журнала (manage.py prune_change_log), секунды.
+# Банк, не обновлявшийся дольше, перечитывается целиком.
+QUIZ_CHANGE_LOG_RETENTION = 24 * 60 * 60
+
+# Общий для воркеров кэш ответов, id вопросов квизов и строк квизов в файле,
+# отображённом в память (quiz.sharedcache). Пустое значение выключает кэш;
+# лучше указывать файл на tmpfs, например /dev/shm/quiz-cache.
+QUIZ_SHARED_CACHE_PATH = os.environ.get('QUIZ_SHARED_CACHE_PATH', '')
+# Число слотов хэш-таблицы (степень двойки).
+QUIZ_SHARED_CACHE_SLOTS = 1 << 16
+# Размер области данных, байты. При переполнении кэш очищается.
+QUIZ_SHARED_CACHE_ARENA_SIZE = 32 * 1024 * 1024
+
+# Каталог опубликованных снимков квизов (manage.py publish_quizzes).
+# Его можно отдавать статическим сервером по тому же URL /api/snapshots/.
+QUIZ_SNAPSHOT_DIR = BASE_DIR / 'snapshots'
+
+# Каталог индекса похожих вопросов (manage.py build_related_questions).
+QUIZ_RELATED_DIR = BASE_DIR / 'related'
+
+# Живые раунды (quiz.live): сколько событий держать в очереди клиента,
+# как часто слать keep-alive в пустой поток и через сколько секунд без
+# переключения вопросов забывать раунд.
+QUIZ_LIVE_CLIENT_BUFFER = 8
+QUIZ_LIVE_HEARTBEAT_SECONDS = 15.0
+QUIZ_LIVE_ROUND_IDLE_SECONDS = 6 * 60 * 60
+
+# Каталог, через который воркеры складывают метрики для /metrics
+# (quiz.metrics). Пустое значение — /metrics показывает только свой процесс.
+QUIZ_METRICS_DIR = os.environ.get('QUIZ_METRICS_DIR', '')
+# Как часто процесс записывает свои метрики в каталог, секунды.
+QUIZ_METRICS_FLUSH_SECONDS = 5.0
+
+SWAGGER_SETTINGS = {
+    'SPEC_URL': ('schema-json', {'format': 'json'}),
+}
+REDOC_SETTINGS = {
+    'SPEC_URL': ('schema-json', {'format': 'json'}),
+}
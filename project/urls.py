@@ -1,38 +1,32 @@
 from django.contrib import admin
 from django.urls import include, path
 
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-
-
-schema_view = get_schema_view(
-   openapi.Info(
-      title='Quiz API',
-      default_version='v1',
-      description='Quiz and questions API',
-   ),
-   public=True,
-   permission_classes=(permissions.AllowAny,),
-)
+from quiz.views.metrics import metrics_view
+from quiz.views.schema import schema_file_view, schema_ui_view
 
+# Админка подключена через SimpleAdminConfig: модули admin.py
+# импортируются при загрузке URLconf, а не при django.setup().
+admin.autodiscover()
 
 urlpatterns = [
    path(
       'swagger.<format>/',
-      schema_view.without_ui(cache_timeout=0),
+      schema_file_view,
       name='schema-json'
    ),
    path(
       'swagger/',
-      schema_view.with_ui('swagger', cache_timeout=0),
+      schema_ui_view,
+      {'renderer': 'swagger'},
       name='schema-swagger-ui'
    ),
    path(
       'redoc/',
-      schema_view.with_ui('redoc', cache_timeout=0),
+      schema_ui_view,
+      {'renderer': 'redoc'},
       name='schema-redoc'
    ),
+   path('metrics', metrics_view, name='metrics'),
    path('admin/', admin.site.urls),
    path('api/', include('quiz.urls')),
 ]
@@ -1,9 +1,164 @@
 """Модуль с настройками административной панели для моделей quiz"""
 
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Q
+from django.utils.functional import cached_property
 
-from quiz.constants import MAX_STR_RETURN_LENGTH
-from quiz.models import Category, Question, Quiz
+from quiz.constants import ADMIN_TITLE_SEARCH_LIMIT, MAX_STR_RETURN_LENGTH
+from quiz.models import (
+    Category,
+    ChangeOperation,
+    DuplicateCluster,
+    Question,
+    Quiz,
+)
+from quiz.normalization import search_key
+from quiz.signals import (
+    adjust_question_counts,
+    log_changes,
+    saved_rows,
+    touch_quizzes,
+)
+from quiz.utils import estimate_count_from_stats
+
+BULK_SAVE_ATTR = '_quiz_bulk_save_objects'
+# Верхняя граница диапазона для поиска по префиксу через индекс.
+PREFIX_UPPER_BOUND = '\U0010ffff'
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор с оценкой количества строк.
+
+    Для неотфильтрованной таблицы количество берётся из статистики БД
+    вместо COUNT(*).
+    """
+
+    @cached_property
+    def count(self):
+        """Возвращает оценку или точное количество объектов."""
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = estimate_count_from_stats(
+                self.object_list.model,
+                None,
+                using=self.object_list.db,
+            )
+            if estimate is not None:
+                return estimate
+        return super().count
+
+
+class AutocompleteFilter(admin.SimpleListFilter):
+    """
+    Фильтр по внешнему ключу с полем автодополнения вместо списка.
+
+    Варианты подгружаются через autocomplete-view админки, поэтому
+    боковая панель не перечисляет все связанные объекты.
+    """
+
+    template = 'admin/quiz/autocomplete_filter.html'
+    field_name = None
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        field = model._meta.get_field(self.field_name)
+        form_field = forms.ModelChoiceField(
+            queryset=field.remote_field.model.objects.all(),
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+            required=False,
+        )
+        self.rendered_widget = form_field.widget.render(
+            self.parameter_name,
+            self.value(),
+            attrs={
+                'id': f'id_filter_{self.field_name}',
+                'onchange': 'this.form.submit()',
+            },
+        )
+        self.hidden_params = ()
+
+    def lookups(self, request, model_admin):
+        """Варианты не перечисляются: их подгружает автодополнение."""
+        return ()
+
+    def has_output(self):
+        """Фильтр отображается всегда."""
+        return True
+
+    def choices(self, changelist):
+        """Возвращает ссылку «Все» и запоминает прочие параметры запроса."""
+        self.hidden_params = tuple(
+            (name, value) for name, value in changelist.params.items()
+            if name != self.parameter_name
+        )
+        yield from super().choices(changelist)
+
+    def queryset(self, request, queryset):
+        """Фильтрует по идентификатору связанного объекта."""
+        value = self.value()
+        if not value:
+            return queryset
+        if not value.isdigit():
+            return queryset.none()
+        return queryset.filter(**{f'{self.field_name}_id': value})
+
+
+class QuizAutocompleteFilter(AutocompleteFilter):
+    """Фильтр вопросов по квизу с автодополнением."""
+
+    title = 'quiz'
+    field_name = 'quiz'
+    parameter_name = 'quiz'
+
+
+class CategoryAutocompleteFilter(AutocompleteFilter):
+    """Фильтр вопросов по категории с автодополнением."""
+
+    title = 'category'
+    field_name = 'category'
+    parameter_name = 'category'
+
+
+class LargeTableAdminMixin:
+    """
+    Настройки changelist для больших таблиц.
+
+    Количество строк оценивается по статистике, полный COUNT(*) для
+    «показать все» не выполняется, а изменения list_editable
+    сохраняются одним bulk_update вместо save() на каждую строку.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def changelist_view(self, request, extra_context=None):
+        """Собирает изменённые строки и сохраняет их одним запросом."""
+        if request.method != 'POST' or '_save' not in request.POST:
+            return super().changelist_view(request, extra_context)
+        with transaction.atomic():
+            setattr(request, BULK_SAVE_ATTR, [])
+            response = super().changelist_view(request, extra_context)
+            pending = getattr(request, BULK_SAVE_ATTR)
+            if pending:
+                self.model.objects.bulk_update(pending, self.list_editable)
+                self.bulk_saved(pending)
+        return response
+
+    def bulk_saved(self, objects: list) -> None:
+        """Вызывается после bulk_update: сигналы post_save не отправляются."""
+
+    def save_model(self, request, obj, form, change):
+        """Откладывает сохранение строк changelist до bulk_update."""
+        pending = getattr(request, BULK_SAVE_ATTR, None)
+        if change and pending is not None:
+            pending.append(obj)
+            return
+        super().save_model(request, obj, form, change)
 
 
 @admin.register(Category)
@@ -48,7 +203,7 @@ class QuizAdmin(admin.ModelAdmin):
 
 
 @admin.register(Question)
-class QuestionAdmin(admin.ModelAdmin):
+class QuestionAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     """Административный интерфейс для модели Question."""
 
     list_display = (
@@ -66,18 +221,21 @@ class QuestionAdmin(admin.ModelAdmin):
         'category',
         'quiz',
     )
+    autocomplete_fields = (
+        'category',
+        'quiz',
+    )
     search_fields = (
         'text',
-        'options',
-        'correct_answer',
-        'explanation',
-        'category__title',
-        'quiz__title'
+    )
+    search_help_text = (
+        'ID вопроса, начало текста вопроса или начало названия '
+        'квиза/категории'
     )
     list_filter = (
         'difficulty',
-        'category',
-        'quiz',
+        CategoryAutocompleteFilter,
+        QuizAutocompleteFilter,
     )
     list_select_related = (
         'category',
@@ -85,6 +243,94 @@ class QuestionAdmin(admin.ModelAdmin):
     )
     empty_value_display = '-empty-'
 
+    @property
+    def media(self):
+        """Добавляет скрипты автодополнения для фильтров."""
+        widget = AutocompleteSelect(
+            Question._meta.get_field('quiz'),
+            self.admin_site
+        )
+        return super().media + widget.media
+
+    def bulk_saved(self, objects: list) -> None:
+        """
+        Сдвигает счётчики вопросов после bulk_update.
+
+        Квизы изменённых вопросов отмечаются для публикации снимков.
+        """
+        rows = [saved_rows(obj, self.list_editable) for obj in objects]
+        adjust_question_counts(
+            [previous for previous, _ in rows],
+            [current for _, current in rows],
+        )
+        log_changes(Question, (obj.pk for obj in objects))
+        touch_quizzes(set().union(*(obj.affected_quiz_ids() for obj in objects)))
+
+    def delete_model(self, request, obj):
+        """Удаляет вопрос, уменьшает счётчики и отмечает квиз изменённым."""
+        question_id = obj.pk
+        previous, _ = saved_rows(obj)
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            adjust_question_counts(removed=(previous,))
+        log_changes(Question, (question_id,), ChangeOperation.DELETE)
+        touch_quizzes(obj.affected_quiz_ids())
+
+    def delete_queryset(self, request, queryset):
+        """
+        Удаляет выбранные вопросы и уменьшает счётчики.
+
+        Квизы удалённых вопросов отмечаются изменёнными.
+        """
+        with transaction.atomic():
+            rows = list(
+                queryset.values_list('pk', 'quiz_id', 'category_id', 'difficulty')
+            )
+            super().delete_queryset(request, queryset)
+            adjust_question_counts(removed=[row[1:] for row in rows])
+        log_changes(
+            Question,
+            (row[0] for row in rows),
+            ChangeOperation.DELETE
+        )
+        touch_quizzes({row[1] for row in rows})
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Ищет вопросы только по индексам.
+
+        Число ищется как идентификатор, строка — как префикс текста
+        вопроса (индекс по search_text) или префикс названия квиза
+        или категории, которые сначала разрешаются в идентификаторы.
+
+        :return: Кортеж (queryset, may_have_duplicates).
+        """
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if term.isdigit():
+            return queryset.filter(pk=int(term)), False
+        prefix = search_key(term)
+        quiz_ids = list(
+            Quiz.objects
+            .filter(title__istartswith=term)
+            .values_list('pk', flat=True)[:ADMIN_TITLE_SEARCH_LIMIT]
+        )
+        category_ids = list(
+            Category.objects
+            .filter(title__istartswith=term)
+            .values_list('pk', flat=True)[:ADMIN_TITLE_SEARCH_LIMIT]
+        )
+        queryset = queryset.filter(
+            Q(
+                search_text__gte=prefix,
+                search_text__lt=prefix + PREFIX_UPPER_BOUND,
+            )
+            | Q(quiz_id__in=quiz_ids)
+            | Q(category_id__in=category_ids)
+        )
+        return queryset, False
+
     @admin.display(description='Текст вопроса')
     def short_text(self, obj):
         """
@@ -126,3 +372,26 @@ class QuestionAdmin(admin.ModelAdmin):
         if obj.explanation:
             return obj.explanation[:MAX_STR_RETURN_LENGTH]
         return '-empty-'
+
+
+@admin.register(DuplicateCluster)
+class DuplicateClusterAdmin(admin.ModelAdmin):
+    """Административный интерфейс для просмотра кластеров дубликатов."""
+
+    list_display = (
+        'id',
+        'size',
+        'similarity',
+        'question_ids',
+        'created_at',
+    )
+    readonly_fields = (
+        'question_ids',
+        'size',
+        'similarity',
+        'created_at',
+    )
+
+    def has_add_permission(self, request):
+        """Кластеры создаёт только find_near_duplicates."""
+        return False
@@ -0,0 +1,115 @@
+"""
+Модуль проверки ответов.
+
+У каждого вопроса есть политика сравнения ответа (MatchPolicy). Принятые
+ответы приводятся к нормализованной форме один раз — при сохранении
+вопроса — и хранятся в Question.accepted_answers. Проверка ответа
+нормализует только сам ответ и ищет его в множестве принятых форм.
+"""
+
+import math
+from dataclasses import dataclass
+
+from django.db import models
+
+
+class MatchPolicy(models.TextChoices):
+    """Перечисление политик сравнения ответа с правильным."""
+
+    EXACT = 'exact', 'Точное совпадение'
+    CASEFOLD = 'casefold', 'Без учёта регистра'
+    NUMERIC = 'numeric', 'Число с допуском'
+    ALIASES = 'aliases', 'Любой из вариантов'
+
+
+def parse_number(answer: str) -> float | None:
+    """
+    Разбирает ответ как число.
+
+    :param answer: Ответ; допускается десятичная запятая.
+    :return: Конечное число или None, если ответ не число.
+    """
+    try:
+        value = float(answer.strip().replace(',', '.'))
+    except ValueError:
+        return None
+    return value if math.isfinite(value) else None
+
+
+def normalize_answer(answer: str, policy: str) -> str | None:
+    """
+    Приводит ответ к форме, в которой он сравнивается по политике.
+
+    :param answer: Ответ.
+    :param policy: Политика сравнения.
+    :return: Нормализованный ответ или None, если ответ не подходит
+        политике (не число для NUMERIC).
+    """
+    if policy == MatchPolicy.EXACT:
+        return answer.strip()
+    if policy == MatchPolicy.NUMERIC:
+        value = parse_number(answer)
+        # 3, 3.0 и 3,00 дают одну форму.
+        return None if value is None else repr(value + 0.0)
+    return ' '.join(answer.casefold().split())
+
+
+def accepted_answers(
+    correct_answer: str,
+    policy: str,
+    aliases: list[str] | None = None,
+) -> list[str]:
+    """
+    Вычисляет нормализованные формы принятых ответов.
+
+    :param correct_answer: Правильный ответ.
+    :param policy: Политика сравнения.
+    :param aliases: Другие принимаемые ответы.
+    :return: Отсортированные различные формы.
+    """
+    answers = [correct_answer, *(aliases or ())]
+    forms = (normalize_answer(str(answer), policy) for answer in answers)
+    return sorted({form for form in forms if form is not None})
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """Принятые формы ответа на вопрос и правило сравнения."""
+
+    policy: str
+    accepted: frozenset[str]
+    tolerance: float = 0.0
+
+    @classmethod
+    def from_values(
+        cls,
+        policy: str,
+        accepted: list[str],
+        tolerance: float | None,
+    ) -> 'AnswerKey':
+        """Собирает ключ из значений полей вопроса."""
+        return cls(policy, frozenset(accepted), tolerance or 0.0)
+
+    def to_list(self) -> list:
+        """Возвращает ключ списком для сериализации в JSON."""
+        return [self.policy, sorted(self.accepted), self.tolerance]
+
+    def matches(self, answer: str) -> bool:
+        """
+        Проверяет ответ.
+
+        :param answer: Ответ пользователя.
+        :return: True, если ответ принимается.
+        """
+        form = normalize_answer(answer, self.policy)
+        if form is None:
+            return False
+        if form in self.accepted:
+            return True
+        if self.policy != MatchPolicy.NUMERIC or not self.tolerance:
+            return False
+        value = float(form)
+        return any(
+            abs(value - float(accepted)) <= self.tolerance
+            for accepted in self.accepted
+        )
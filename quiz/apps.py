@@ -7,3 +7,7 @@ class QuizConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quiz'
     verbose_name = 'Quiz configuration application'
+
+    def ready(self):
+        """Подключает обработчики сигналов моделей."""
+        from quiz import signals  # noqa: F401
@@ -0,0 +1,223 @@
+"""
+Индекс подсказок для автодополнения.
+
+Названия квизов и категорий и тексты вопросов разбиваются на слова в
+нижнем регистре (casefold). Для каждого вида объектов хранится
+отсортированный список пар (слово, id): все слова с заданным префиксом
+лежат в нём подряд и находятся двумя бинарными поисками.
+
+Индекс живёт в памяти процесса и догоняет БД по журналу ChangeLog не
+чаще раза в QUIZ_AUTOCOMPLETE_REFRESH_SECONDS.
+"""
+
+import bisect
+import re
+import threading
+
+from quiz.changes import ChangeLogFollower, Changes, fetch_rows
+from quiz.models import Category, ChangeOperation, Question, Quiz
+from quiz.sharding import shard_aliases
+
+AUTOCOMPLETE_QUIZ = 'quiz'
+AUTOCOMPLETE_CATEGORY = 'category'
+AUTOCOMPLETE_QUESTION = 'question'
+AUTOCOMPLETE_TYPES = (
+    AUTOCOMPLETE_QUIZ,
+    AUTOCOMPLETE_CATEGORY,
+    AUTOCOMPLETE_QUESTION,
+)
+
+WORD_RE = re.compile(r'\w+')
+# Больше любого символа, который может продолжать префикс.
+PREFIX_END = '\U0010ffff'
+
+
+def words(text: str) -> tuple[str, ...]:
+    """Возвращает различные слова текста в нижнем регистре."""
+    return tuple(dict.fromkeys(WORD_RE.findall(text.casefold())))
+
+
+class PrefixIndex:
+    """Отсортированный список слов с бинарным поиском по префиксу."""
+
+    def __init__(self):
+        self._entries: list[tuple[str, int]] = []
+        self._texts: dict[int, str] = {}
+        self._words: dict[int, tuple[str, ...]] = {}
+
+    def load(self, rows: list[tuple[int, str]]) -> None:
+        """Строит индекс заново по парам (id, текст)."""
+        self._texts = dict(rows)
+        self._words = {
+            object_id: words(text) for object_id, text in self._texts.items()
+        }
+        self._entries = sorted(
+            (word, object_id)
+            for object_id, object_words in self._words.items()
+            for word in object_words
+        )
+
+    def set(self, object_id: int, text: str | None) -> None:
+        """Добавляет, заменяет или (при text=None) удаляет объект."""
+        for word in self._words.pop(object_id, ()):
+            del self._entries[bisect.bisect_left(self._entries, (word, object_id))]
+        self._texts.pop(object_id, None)
+        if text is None:
+            return
+        self._texts[object_id] = text
+        self._words[object_id] = words(text)
+        for word in self._words[object_id]:
+            bisect.insort(self._entries, (word, object_id))
+
+    def search(self, query: str, limit: int) -> list[tuple[int, str]]:
+        """
+        Ищет объекты, в тексте которых есть слова с префиксами из запроса.
+
+        Перебираются слова самого узкого префикса, остальные префиксы
+        проверяются по словам найденного объекта.
+
+        :param query: Строка запроса.
+        :param limit: Максимальное число подсказок.
+        :return: Пары (id, текст) в порядке найденных слов.
+        """
+        prefixes = words(query)
+        if not prefixes:
+            return []
+        ranges = sorted(
+            (
+                bisect.bisect_left(self._entries, (prefix + PREFIX_END,))
+                - bisect.bisect_left(self._entries, (prefix,)),
+                prefix,
+            )
+            for prefix in prefixes
+        )
+        driver = ranges[0][1]
+        others = [prefix for _, prefix in ranges[1:]]
+        start = bisect.bisect_left(self._entries, (driver,))
+        found: dict[int, str] = {}
+        for position in range(start, start + ranges[0][0]):
+            object_id = self._entries[position][1]
+            if object_id in found:
+                continue
+            object_words = self._words[object_id]
+            if all(
+                any(word.startswith(prefix) for word in object_words)
+                for prefix in others
+            ):
+                found[object_id] = self._texts[object_id]
+                if len(found) == limit:
+                    break
+        return list(found.items())
+
+
+class AutocompleteIndex(ChangeLogFollower):
+    """Индексы подсказок для квизов, категорий и вопросов."""
+
+    refresh_setting = 'QUIZ_AUTOCOMPLETE_REFRESH_SECONDS'
+
+    def __init__(self):
+        super().__init__()
+        self._indexes = {kind: PrefixIndex() for kind in AUTOCOMPLETE_TYPES}
+        self._question_quiz: dict[int, int] = {}
+        self._quiz_questions: dict[int, set[int]] = {}
+
+    def _load(self) -> None:
+        """Строит индексы по всем строкам БД."""
+        quizzes = []
+        questions = []
+        self._question_quiz = {}
+        self._quiz_questions = {}
+        for alias in shard_aliases():
+            quizzes.extend(Quiz.objects.using(alias).values_list('id', 'title'))
+            for question_id, quiz_id, text in (
+                Question.objects.using(alias)
+                .values_list('id', 'quiz_id', 'text')
+                .iterator()
+            ):
+                questions.append((question_id, text))
+                self._link_question(question_id, quiz_id)
+        self._indexes[AUTOCOMPLETE_CATEGORY].load(
+            list(Category.objects.values_list('id', 'title'))
+        )
+        self._indexes[AUTOCOMPLETE_QUIZ].load(quizzes)
+        self._indexes[AUTOCOMPLETE_QUESTION].load(questions)
+
+    def _apply(self, changes: Changes) -> None:
+        """Перечитывает тексты изменённых объектов."""
+        for model, kind in (
+            (Category, AUTOCOMPLETE_CATEGORY),
+            (Quiz, AUTOCOMPLETE_QUIZ),
+        ):
+            operations = changes.get(model, {})
+            titles = dict(fetch_rows(model, _upserts(operations), ('id', 'title')))
+            for object_id in operations:
+                self._indexes[kind].set(object_id, titles.get(object_id))
+                if model is Quiz and object_id not in titles:
+                    # Вопросы удалённого квиза удалены каскадом.
+                    for question_id in self._quiz_questions.pop(object_id, ()):
+                        self._question_quiz.pop(question_id, None)
+                        self._indexes[AUTOCOMPLETE_QUESTION].set(question_id, None)
+
+        operations = changes.get(Question, {})
+        rows = {
+            question_id: (quiz_id, text)
+            for question_id, quiz_id, text in fetch_rows(
+                Question,
+                _upserts(operations),
+                ('id', 'quiz_id', 'text'),
+            )
+        }
+        for question_id in operations:
+            old_quiz_id = self._question_quiz.pop(question_id, None)
+            if old_quiz_id is not None:
+                self._quiz_questions[old_quiz_id].discard(question_id)
+            quiz_id, text = rows.get(question_id, (None, None))
+            if quiz_id is not None:
+                self._link_question(question_id, quiz_id)
+            self._indexes[AUTOCOMPLETE_QUESTION].set(question_id, text)
+
+    def _link_question(self, question_id: int, quiz_id: int) -> None:
+        """Запоминает квиз вопроса, чтобы убрать вопрос вместе с квизом."""
+        self._question_quiz[question_id] = quiz_id
+        self._quiz_questions.setdefault(quiz_id, set()).add(question_id)
+
+    def suggest(self, kind: str, query: str, limit: int) -> list[tuple[int, str]]:
+        """
+        Возвращает подсказки.
+
+        :param kind: 'quiz', 'category' или 'question'.
+        :param query: Введённый текст.
+        :param limit: Максимальное число подсказок.
+        :return: Пары (id, текст).
+        """
+        with self._reading():
+            return self._indexes[kind].search(query, limit)
+
+
+def _upserts(operations: dict[int, str]) -> list[int]:
+    """Возвращает id объектов, которые созданы или изменены."""
+    return [
+        object_id for object_id, operation in operations.items()
+        if operation == ChangeOperation.UPSERT
+    ]
+
+
+_index: AutocompleteIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_autocomplete_index() -> AutocompleteIndex:
+    """
+    Возвращает индекс подсказок процесса, строя его при первом вызове.
+
+    :return: Загруженный индекс.
+    """
+    global _index
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = AutocompleteIndex()
+                index.load()
+                _index = index
+    return _index
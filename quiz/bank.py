@@ -0,0 +1,476 @@
+"""
+Банк вопросов в памяти процесса.
+
+Все категории, квизы и вопросы загружаются один раз и хранятся
+кортежами значений колонок (по одному на строку) в словарях id → строка.
+Для запросов поддерживаются индексы: id вопросов каждого квиза, в том
+числе по сложностям, и каждой категории по сложностям (отсортированные
+array), вопросы каждой категории и триграммный индекс
+текста вопросов для поиска подстроки.
+
+Изменения подтягиваются из журнала ChangeLog не чаще раза в
+QUIZ_BANK_REFRESH_SECONDS: перечитываются только изменившиеся строки.
+Объекты моделей создаются из кортежей при каждом чтении, поэтому
+вызывающий код может свободно их менять.
+"""
+
+import bisect
+import random
+import threading
+from array import array
+from collections.abc import Iterable
+
+from django.db import DEFAULT_DB_ALIAS, models
+
+from quiz.answers import AnswerKey
+from quiz.changes import ChangeLogFollower, Changes, fetch_rows
+from quiz.models import Category, ChangeOperation, Difficulty, Question, Quiz
+from quiz.sampling import (
+    difficulty_strata,
+    sample_from_pools,
+    stratified_sample,
+)
+from quiz.sharding import shard_aliases, shard_for_id
+
+TRIGRAM_LENGTH = 3
+
+
+def _attnames(model: type[models.Model]) -> tuple[str, ...]:
+    """Возвращает имена колонок модели в порядке конструктора."""
+    return tuple(field.attname for field in model._meta.concrete_fields)
+
+
+CATEGORY_FIELDS = _attnames(Category)
+QUIZ_FIELDS = _attnames(Quiz)
+QUESTION_FIELDS = _attnames(Question)
+# Позиции колонок в кортежах.
+TITLE = QUIZ_FIELDS.index('title')
+CATEGORY_TITLE = CATEGORY_FIELDS.index('title')
+QUESTION_CATEGORY = QUESTION_FIELDS.index('category_id')
+QUESTION_QUIZ = QUESTION_FIELDS.index('quiz_id')
+QUESTION_TEXT = QUESTION_FIELDS.index('text')
+QUESTION_MATCH_POLICY = QUESTION_FIELDS.index('match_policy')
+QUESTION_ACCEPTED_ANSWERS = QUESTION_FIELDS.index('accepted_answers')
+QUESTION_ANSWER_TOLERANCE = QUESTION_FIELDS.index('answer_tolerance')
+QUESTION_DIFFICULTY = QUESTION_FIELDS.index('difficulty')
+
+MODEL_FIELDS = {
+    Category: CATEGORY_FIELDS,
+    Quiz: QUIZ_FIELDS,
+    Question: QUESTION_FIELDS,
+}
+
+
+def trigrams(text: str) -> set[str]:
+    """Возвращает триграммы строки в нижнем регистре."""
+    text = text.lower()
+    return {
+        text[start:start + TRIGRAM_LENGTH]
+        for start in range(len(text) - TRIGRAM_LENGTH + 1)
+    }
+
+
+class QuestionBank(ChangeLogFollower):
+    """Копия таблиц категорий, квизов и вопросов в памяти процесса."""
+
+    def __init__(self):
+        super().__init__()
+        self._clear()
+
+    def _clear(self) -> None:
+        """Сбрасывает все строки и индексы."""
+        self._categories: dict[int, tuple] = {}
+        self._quizzes: dict[int, tuple] = {}
+        self._questions: dict[int, tuple] = {}
+        self._quiz_questions: dict[int, array] = {}
+        self._quiz_difficulty_questions: dict[tuple[int, str], array] = {}
+        self._category_difficulty_questions: dict[tuple[int, str], array] = {}
+        self._category_questions: dict[int, set[int]] = {}
+        self._trigrams: dict[str, set[int]] = {}
+        # Ключи ответов строятся при первой проверке вопроса.
+        self._answer_keys: dict[int, AnswerKey] = {}
+
+    def _load(self) -> None:
+        """Загружает все таблицы из БД заново."""
+        self._clear()
+        for row in Category.objects.values_list(*CATEGORY_FIELDS).iterator():
+            self._categories[row[0]] = row
+        for alias in shard_aliases():
+            quizzes = Quiz.objects.using(alias).values_list(*QUIZ_FIELDS)
+            for row in quizzes.iterator():
+                self._quizzes[row[0]] = row
+            # По возрастанию id вставка в индекс квиза — дописывание.
+            questions = Question.objects.using(alias).order_by(
+                'pk'
+            ).values_list(*QUESTION_FIELDS)
+            for row in questions.iterator():
+                self._add_question(row)
+
+    def _apply(self, changes: Changes) -> None:
+        """Перечитывает изменённые строки и удаляет удалённые."""
+        for model in (Category, Quiz, Question):
+            operations = changes.get(model, {})
+            upserts = [
+                object_id for object_id, operation in operations.items()
+                if operation == ChangeOperation.UPSERT
+            ]
+            rows = {
+                row[0]: row
+                for row in fetch_rows(model, upserts, MODEL_FIELDS[model])
+            }
+            for object_id in operations:
+                row = rows.get(object_id)
+                if model is Category:
+                    self._set_category(object_id, row)
+                elif model is Quiz:
+                    self._set_quiz(object_id, row)
+                else:
+                    self._remove_question(object_id)
+                    if row is not None:
+                        self._add_question(row)
+
+    def _set_category(self, category_id: int, row: tuple | None) -> None:
+        """Сохраняет категорию или удаляет её и обнуляет ссылки вопросов."""
+        if row is not None:
+            self._categories[category_id] = row
+            return
+        self._categories.pop(category_id, None)
+        for difficulty in Difficulty.values:
+            self._category_difficulty_questions.pop((category_id, difficulty), None)
+        for question_id in self._category_questions.pop(category_id, ()):
+            values = list(self._questions[question_id])
+            values[QUESTION_CATEGORY] = None
+            self._questions[question_id] = tuple(values)
+
+    def _set_quiz(self, quiz_id: int, row: tuple | None) -> None:
+        """Сохраняет квиз или удаляет его вместе с вопросами."""
+        if row is not None:
+            self._quizzes[quiz_id] = row
+            return
+        self._quizzes.pop(quiz_id, None)
+        for question_id in list(self._quiz_questions.get(quiz_id, ())):
+            self._remove_question(question_id)
+
+    def _add_question(self, row: tuple) -> None:
+        """Добавляет вопрос в таблицу и индексы."""
+        question_id = row[0]
+        self._questions[question_id] = row
+        for index, key in self._sorted_indexes(row):
+            bisect.insort(index.setdefault(key, array('q')), question_id)
+        if row[QUESTION_CATEGORY] is not None:
+            self._category_questions.setdefault(
+                row[QUESTION_CATEGORY],
+                set(),
+            ).add(question_id)
+        for trigram in trigrams(row[QUESTION_TEXT]):
+            self._trigrams.setdefault(trigram, set()).add(question_id)
+
+    def _remove_question(self, question_id: int) -> None:
+        """Удаляет вопрос из таблицы и индексов."""
+        row = self._questions.pop(question_id, None)
+        self._answer_keys.pop(question_id, None)
+        if row is None:
+            return
+        for index, key in self._sorted_indexes(row):
+            question_ids = index[key]
+            del question_ids[bisect.bisect_left(question_ids, question_id)]
+            if not question_ids:
+                del index[key]
+        if row[QUESTION_CATEGORY] is not None:
+            self._category_questions[row[QUESTION_CATEGORY]].discard(question_id)
+        for trigram in trigrams(row[QUESTION_TEXT]):
+            postings = self._trigrams[trigram]
+            postings.discard(question_id)
+            if not postings:
+                del self._trigrams[trigram]
+
+    def _sorted_indexes(self, row: tuple) -> list[tuple[dict, object]]:
+        """Возвращает индексы с массивами id, в которые входит вопрос."""
+        indexes = [
+            (self._quiz_questions, row[QUESTION_QUIZ]),
+            (
+                self._quiz_difficulty_questions,
+                (row[QUESTION_QUIZ], row[QUESTION_DIFFICULTY]),
+            ),
+        ]
+        if row[QUESTION_CATEGORY] is not None:
+            indexes.append((
+                self._category_difficulty_questions,
+                (row[QUESTION_CATEGORY], row[QUESTION_DIFFICULTY]),
+            ))
+        return indexes
+
+    def categories(self) -> list[Category]:
+        """Возвращает все категории в порядке названий."""
+        with self._reading():
+            rows = sorted(
+                self._categories.values(),
+                key=lambda row: row[CATEGORY_TITLE],
+            )
+            return [_build(Category, row) for row in rows]
+
+    def category(self, category_id: int) -> Category | None:
+        """Возвращает категорию по id."""
+        with self._reading():
+            row = self._categories.get(category_id)
+            return None if row is None else _build(Category, row)
+
+    def quizzes(self, title: str | None = None) -> list[Quiz]:
+        """
+        Возвращает квизы в порядке названий.
+
+        :param title: Подстрока названия (без учёта регистра).
+        :return: Список квизов.
+        """
+        with self._reading():
+            rows = self._quizzes.values()
+            if title is not None:
+                needle = title.lower()
+                rows = [row for row in rows if needle in row[TITLE].lower()]
+            rows = sorted(rows, key=lambda row: row[TITLE])
+            return [_build(Quiz, row) for row in rows]
+
+    def quiz(self, quiz_id: int) -> Quiz | None:
+        """Возвращает квиз по id."""
+        with self._reading():
+            row = self._quizzes.get(quiz_id)
+            return None if row is None else _build(Quiz, row)
+
+    def questions(
+        self,
+        quiz_id: int | None = None,
+        category_id: int | None = None,
+        difficulty: str | None = None,
+    ) -> list[Question]:
+        """
+        Возвращает вопросы, подходящие под фильтры.
+
+        :return: Вопросы в порядке сложности и id.
+        """
+        with self._reading():
+            rows = self._filter(quiz_id, category_id, difficulty)
+            return [_build(Question, row) for row in _sorted_questions(rows)]
+
+    def count_questions(
+        self,
+        quiz_id: int | None = None,
+        category_id: int | None = None,
+        difficulty: str | None = None,
+    ) -> int:
+        """Возвращает количество вопросов, подходящих под фильтры."""
+        with self._reading():
+            if quiz_id is None and category_id is None and difficulty is None:
+                return len(self._questions)
+            return sum(1 for _ in self._filter(quiz_id, category_id, difficulty))
+
+    def question(self, question_id: int) -> Question | None:
+        """Возвращает вопрос по id."""
+        with self._reading():
+            row = self._questions.get(question_id)
+            return None if row is None else _build(Question, row)
+
+    def questions_by_ids(self, question_ids: list[int]) -> list[Question]:
+        """Возвращает существующие вопросы в порядке question_ids."""
+        with self._reading():
+            return [
+                _build(Question, self._questions[question_id])
+                for question_id in question_ids
+                if question_id in self._questions
+            ]
+
+    def attach_related(
+        self,
+        questions: list[Question],
+        relations: tuple[str, ...],
+    ) -> list[Question]:
+        """
+        Подставляет вопросам объекты категорий и квизов из памяти.
+
+        :param questions: Вопросы, построенные банком.
+        :param relations: Имена связей: category и/или quiz.
+        :return: Те же вопросы.
+        """
+        if not relations:
+            return questions
+        with self._reading():
+            for question in questions:
+                if 'category' in relations and question.category_id is not None:
+                    row = self._categories.get(question.category_id)
+                    if row is not None:
+                        question.category = _build(Category, row)
+                if 'quiz' in relations:
+                    row = self._quizzes.get(question.quiz_id)
+                    if row is not None:
+                        question.quiz = _build(Quiz, row)
+        return questions
+
+    def search_questions(self, text: str) -> list[Question]:
+        """
+        Ищет вопросы, текст которых содержит подстроку (без учёта регистра).
+
+        Кандидаты берутся из пересечения списков триграмм запроса и
+        проверяются на вхождение подстроки.
+
+        :param text: Подстрока для поиска.
+        :return: Вопросы в порядке сложности и id.
+        """
+        with self._reading():
+            needle = text.lower()
+            grams = trigrams(needle)
+            if grams:
+                postings = sorted(
+                    (self._trigrams.get(gram, set()) for gram in grams),
+                    key=len,
+                )
+                candidates = set.intersection(*postings)
+            else:
+                candidates = self._questions.keys()
+            rows = [
+                self._questions[question_id] for question_id in candidates
+                if needle in self._questions[question_id][QUESTION_TEXT].lower()
+            ]
+            return [_build(Question, row) for row in _sorted_questions(rows)]
+
+    def random_question(self, quiz_id: int) -> Question | None:
+        """Возвращает случайный вопрос квиза или None, если вопросов нет."""
+        with self._reading():
+            question_ids = self._quiz_questions.get(quiz_id)
+            if not question_ids:
+                return None
+            return _build(Question, self._questions[random.choice(question_ids)])
+
+    def random_questions(
+        self,
+        quiz_id: int,
+        k: int,
+        difficulties: Iterable[str] = (),
+    ) -> list[Question]:
+        """
+        Возвращает до k различных случайных вопросов квиза.
+
+        :param quiz_id: Идентификатор квиза.
+        :param k: Сколько вопросов выбрать.
+        :param difficulties: Допустимые сложности (пусто — любые).
+        :return: Вопросы в случайном порядке.
+        """
+        with self._reading():
+            if difficulties:
+                pools = [
+                    self._quiz_difficulty_questions.get((quiz_id, difficulty), ())
+                    for difficulty in dict.fromkeys(difficulties)
+                ]
+            else:
+                pools = [self._quiz_questions.get(quiz_id, ())]
+            return [
+                _build(Question, self._questions[question_id])
+                for question_id in sample_from_pools(pools, k)
+            ]
+
+    def practice_set(
+        self,
+        category_ids: list[int],
+        count: int,
+        shares: dict[str, float] | None = None,
+        seed: int | None = None,
+    ) -> list[Question]:
+        """
+        Собирает набор вопросов из категорий по долям сложностей.
+
+        :param category_ids: Идентификаторы категорий.
+        :param count: Сколько вопросов выбрать.
+        :param shares: Сложность → доля вопросов.
+        :param seed: Зерно генератора.
+        :return: Вопросы в случайном порядке.
+        """
+        with self._reading():
+            strata = [
+                (share, [
+                    self._category_difficulty_questions.get(
+                        (category_id, difficulty),
+                        (),
+                    )
+                    for category_id in sorted(set(category_ids))
+                    for difficulty in difficulties
+                ])
+                for share, difficulties in difficulty_strata(shares)
+            ]
+            return [
+                _build(Question, self._questions[question_id])
+                for question_id in stratified_sample(
+                    strata,
+                    count,
+                    random.Random(seed),
+                )
+            ]
+
+    def answer_key(self, question_id: int) -> AnswerKey | None:
+        """Возвращает ключ ответа на вопрос или None, если вопроса нет."""
+        with self._reading():
+            key = self._answer_keys.get(question_id)
+            if key is None:
+                row = self._questions.get(question_id)
+                if row is None:
+                    return None
+                key = self._answer_keys[question_id] = AnswerKey.from_values(
+                    row[QUESTION_MATCH_POLICY],
+                    row[QUESTION_ACCEPTED_ANSWERS],
+                    row[QUESTION_ANSWER_TOLERANCE],
+                )
+            return key
+
+    def _filter(
+        self,
+        quiz_id: int | None,
+        category_id: int | None,
+        difficulty: str | None,
+    ) -> Iterable[tuple]:
+        """Выбирает строки вопросов через самый узкий индекс."""
+        if quiz_id is not None:
+            ids = self._quiz_questions.get(quiz_id, ())
+        elif category_id is not None:
+            ids = self._category_questions.get(category_id, ())
+        else:
+            ids = self._questions.keys()
+        for question_id in ids:
+            row = self._questions[question_id]
+            if (
+                (quiz_id is None or row[QUESTION_QUIZ] == quiz_id)
+                and (category_id is None or row[QUESTION_CATEGORY] == category_id)
+                and (difficulty is None or row[QUESTION_DIFFICULTY] == difficulty)
+            ):
+                yield row
+
+
+def _sorted_questions(rows: Iterable[tuple]) -> list[tuple]:
+    """Сортирует строки вопросов как Question.Meta.ordering, затем по id."""
+    return sorted(rows, key=lambda row: (row[QUESTION_DIFFICULTY], row[0]))
+
+
+def _build(model: type[models.Model], row: tuple) -> models.Model:
+    """Создаёт объект модели из кортежа значений без запроса к БД."""
+    if model is Category:
+        alias = DEFAULT_DB_ALIAS
+    else:
+        alias = shard_for_id(row[0]) or DEFAULT_DB_ALIAS
+    return model.from_db(alias, MODEL_FIELDS[model], row)
+
+
+_bank: QuestionBank | None = None
+_bank_lock = threading.Lock()
+
+
+def get_bank() -> QuestionBank:
+    """
+    Возвращает банк вопросов процесса, загружая его при первом вызове.
+
+    :return: Загруженный банк.
+    """
+    global _bank
+
+    if _bank is None:
+        with _bank_lock:
+            if _bank is None:
+                bank = QuestionBank()
+                bank.load()
+                _bank = bank
+    return _bank
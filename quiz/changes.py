@@ -0,0 +1,134 @@
+"""
+Модуль структур в памяти, обновляемых по журналу изменений.
+
+ChangeLogFollower загружает данные из БД целиком, а затем периодически
+читает из ChangeLog записи, появившиеся после загрузки, и применяет
+только их. На нём построены банк вопросов (quiz.bank) и индекс подсказок
+(quiz.autocomplete).
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.db import models
+
+from quiz.models import Category, ChangeLog, Question, Quiz
+from quiz.sharding import shard_for_id
+
+# Сколько id подставлять в один запрос pk__in (ограничение SQLite).
+FETCH_CHUNK_SIZE = 500
+# Больше изменений за раз дешевле перечитать целиком.
+MAX_CHANGES_PER_REFRESH = 10_000
+
+# Изменения по модели: id объекта → последняя операция.
+Changes = dict[type[models.Model], dict[int, str]]
+
+
+class ChangeLogFollower(ABC):
+    """Данные в памяти, которые догоняют БД по журналу изменений."""
+
+    # Имя настройки с интервалом проверки журнала, секунды.
+    refresh_setting = 'QUIZ_BANK_REFRESH_SECONDS'
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._last_change_id = 0
+        self._checked_at = 0.0
+        self._refreshed_at = 0.0
+
+    def load(self) -> None:
+        """Загружает все данные из БД заново."""
+        with self._lock:
+            last_change_id = (
+                ChangeLog.objects.order_by('-pk')
+                .values_list('pk', flat=True)
+                .first()
+            ) or 0
+            self._load()
+            self._last_change_id = last_change_id
+            self._loaded = True
+            self._refreshed_at = self._checked_at = time.monotonic()
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Применяет изменения из журнала.
+
+        :param force: Проверить журнал, не дожидаясь интервала обновления.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not self._loaded or (
+                now - self._refreshed_at > settings.QUIZ_CHANGE_LOG_RETENTION
+            ):
+                self.load()
+                return
+            if not force and (
+                now - self._checked_at < getattr(settings, self.refresh_setting)
+            ):
+                return
+            self._checked_at = now
+            changes = list(
+                ChangeLog.objects
+                .filter(pk__gt=self._last_change_id)
+                .order_by('pk')
+                .values_list('pk', 'model_name', 'object_id', 'operation')
+                [:MAX_CHANGES_PER_REFRESH + 1]
+            )
+            if len(changes) > MAX_CHANGES_PER_REFRESH:
+                self.load()
+                return
+            if changes:
+                models_by_name = {
+                    model._meta.model_name: model
+                    for model in (Category, Quiz, Question)
+                }
+                latest: Changes = {}
+                for _, model_name, object_id, operation in changes:
+                    model = models_by_name[model_name]
+                    latest.setdefault(model, {})[object_id] = operation
+                self._apply(latest)
+                self._last_change_id = changes[-1][0]
+            self._refreshed_at = now
+
+    @abstractmethod
+    def _load(self) -> None:
+        """Заполняет структуры данными из БД."""
+        ...
+
+    @abstractmethod
+    def _apply(self, changes: Changes) -> None:
+        """Применяет изменения объектов."""
+        ...
+
+    def _reading(self) -> threading.RLock:
+        """Подтягивает изменения и возвращает блокировку для чтения."""
+        self.refresh()
+        return self._lock
+
+
+def fetch_rows(
+    model: type[models.Model],
+    object_ids: Iterable[int],
+    fields: tuple[str, ...],
+) -> Iterable[tuple]:
+    """
+    Загружает строки модели по id из их шардов.
+
+    :param model: Category, Quiz или Question.
+    :param object_ids: Идентификаторы объектов.
+    :param fields: Колонки строки; первой должна идти id.
+    :return: Кортежи значений колонок.
+    """
+    by_alias: dict[str | None, list[int]] = {}
+    for object_id in object_ids:
+        alias = None if model is Category else shard_for_id(object_id)
+        by_alias.setdefault(alias, []).append(object_id)
+    for alias, ids in by_alias.items():
+        for start in range(0, len(ids), FETCH_CHUNK_SIZE):
+            yield from model.objects.using(alias).filter(
+                pk__in=ids[start:start + FETCH_CHUNK_SIZE]
+            ).values_list(*fields)
@@ -8,3 +8,37 @@ MAX_QUESTION_DESCRIPTION_LENGTH = 500
 MAX_QUESTION_EXPLANATION_LENGTH = 250
 MAX_STR_RETURN_LENGTH = 100
 MIN_ANSWERS = 2
+
+QUESTION_QUIZ_DIFFICULTY_INDEX = 'question_quiz_difficulty_idx'
+QUESTION_CATEGORY_DIFFICULTY_INDEX = 'question_category_diff_idx'
+QUESTION_DIFFICULTY_INDEX = 'question_difficulty_idx'
+QUESTION_SEARCH_TEXT_INDEX = 'question_search_text_idx'
+QUESTION_QUIZ_CONTENT_HASH_INDEX = 'question_quiz_hash_idx'
+CONTENT_HASH_LENGTH = 32
+MAX_MATCH_POLICY_LENGTH = 20
+ADMIN_TITLE_SEARCH_LIMIT = 100
+
+MAX_JOB_NAME_LENGTH = 100
+MAX_JOB_STATUS_LENGTH = 20
+DEFAULT_JOB_MAX_ATTEMPTS = 3
+JOB_STATUS_INDEX = 'job_status_idx'
+JOB_PROGRESS_MIN_STEP = 0.01
+
+MAX_CHANGE_MODEL_LENGTH = 20
+MAX_CHANGE_OPERATION_LENGTH = 10
+
+MAX_BULK_QUESTION_IDS = 10_000
+MAX_BULK_CATEGORY_TITLES = 1000
+
+AUTOCOMPLETE_DEFAULT_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+MAX_AUTOCOMPLETE_QUERY_LENGTH = 100
+
+RELATED_DEFAULT_K = 5
+RELATED_MAX_K = 20
+
+RANDOM_QUESTIONS_DEFAULT_K = 10
+RANDOM_QUESTIONS_MAX_K = 100
+
+PRACTICE_SET_MAX_COUNT = 100
+PRACTICE_SET_MAX_CATEGORIES = 50
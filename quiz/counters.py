@@ -0,0 +1,86 @@
+"""
+Пересчёт счётчиков вопросов квизов и категорий.
+
+Счётчики QuestionCounts поддерживаются приращениями (quiz.signals).
+Если они разошлись с таблицей вопросов — например, после прерванного
+удаления квиза или правки БД в обход приложения, — recount_question_counts
+считает их заново по GROUP BY в каждом шарде и сохраняет только
+отличающиеся.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db.models import Count, QuerySet
+
+from quiz.models import DIFFICULTY_COUNT_FIELDS, Category, Question, Quiz
+from quiz.sharding import shard_aliases
+from quiz.signals import log_changes, touch_quizzes
+
+COUNT_FIELDS = ('question_count', *DIFFICULTY_COUNT_FIELDS.values())
+
+
+@dataclass(frozen=True)
+class RecountResult:
+    """Итог пересчёта: сколько квизов и категорий исправлено."""
+
+    quizzes: int
+    categories: int
+
+
+def recount_question_counts() -> RecountResult:
+    """
+    Пересчитывает счётчики вопросов всех квизов и категорий.
+
+    :return: Итог пересчёта.
+    """
+    category_counts: dict[int, Counter] = {}
+    fixed_quizzes = 0
+    for alias in shard_aliases():
+        quiz_counts: dict[int, Counter] = {}
+        for quiz_id, category_id, difficulty, count in (
+            Question.objects.using(alias)
+            .values_list('quiz_id', 'category_id', 'difficulty')
+            .annotate(count=Count('pk'))
+            .order_by()
+        ):
+            quiz_counts.setdefault(quiz_id, Counter())[difficulty] += count
+            if category_id is not None:
+                category_counts.setdefault(category_id, Counter())[difficulty] += count
+        quiz_ids = _store_counts(Quiz.objects.using(alias), quiz_counts)
+        if quiz_ids:
+            touch_quizzes(quiz_ids, alias)
+        fixed_quizzes += len(quiz_ids)
+    category_ids = _store_counts(Category.objects.all(), category_counts)
+    if category_ids:
+        log_changes(Category, category_ids)
+    return RecountResult(quizzes=fixed_quizzes, categories=len(category_ids))
+
+
+def _store_counts(queryset: QuerySet, counts: dict[int, Counter]) -> list[int]:
+    """
+    Сохраняет счётчики объектов, которые отличаются от посчитанных.
+
+    :param queryset: Объекты модели со счётчиками.
+    :param counts: id объекта → сложность → число вопросов.
+    :return: Идентификаторы исправленных объектов.
+    """
+    changed = []
+    for instance in queryset.only('pk', *COUNT_FIELDS).order_by('pk').iterator():
+        counter = counts.get(instance.pk, Counter())
+        values = {
+            field: counter[difficulty]
+            for difficulty, field in DIFFICULTY_COUNT_FIELDS.items()
+        }
+        values['question_count'] = counter.total()
+        if any(getattr(instance, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(instance, field, value)
+            changed.append(instance)
+    queryset.bulk_update(
+        changed,
+        COUNT_FIELDS,
+        batch_size=settings.QUIZ_DELETE_CHUNK_SIZE,
+    )
+    return [instance.pk for instance in changed]
@@ -4,21 +4,30 @@ from abc import ABC, abstractmethod
 
 from quiz.models import Quiz, Question, Category
 
+Fields = tuple[str, ...] | None
+Expand = tuple[str, ...]
+
 
 class AbstractCategoryService(ABC):
     """Интерфейс для работы c категориями"""
 
     @abstractmethod
-    def list_categories(self) -> list[Category]:
-        """Метод для получения списка категорий"""
+    def list_categories(self, fields: Fields = None) -> list[Category]:
+        """
+        Метод для получения списка категорий.
+
+        :param fields: Поля, которые нужно загрузить (None — все поля).
+        :return: Список категорий.
+        """
         ...
 
     @abstractmethod
-    def get_category(self, category_id: int) -> Category:
+    def get_category(self, category_id: int, fields: Fields = None) -> Category:
         """
         Метод для получения категории по идентификатору.
 
         :param category_id: Идентификатор категории.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
         :return: Категория из БД.
         """
         ...
@@ -33,6 +42,16 @@ class AbstractCategoryService(ABC):
         """
         ...
 
+    @abstractmethod
+    def get_or_create_categories(self, titles: list[str]) -> list[Category]:
+        """
+        Находит или создаёт категории по названиям.
+
+        :param titles: Названия категорий.
+        :return: Категории в порядке первых вхождений названий.
+        """
+        ...
+
     @abstractmethod
     def update_category(self, category_id: int, data: dict) -> Category:
         """
@@ -58,26 +77,33 @@ class AbstractQuizService(ABC):
     """Интерфейс для работы с квизами"""
 
     @abstractmethod
-    def list_quizzes(self) -> list[Quiz]:
-        """Возвращает список всех квизов."""
+    def list_quizzes(self, fields: Fields = None) -> list[Quiz]:
+        """
+        Возвращает список всех квизов.
+
+        :param fields: Поля, которые нужно загрузить (None — все поля).
+        :return: Список квизов.
+        """
         ...
 
     @abstractmethod
-    def get_quiz(self, quiz_id: int) -> Quiz:
+    def get_quiz(self, quiz_id: int, fields: Fields = None) -> Quiz:
         """
         Возвращает квиз по его идентификатору.
 
         :param quiz_id: Идентификатор квиза.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
         :return: Квиз из БД.
         """
         ...
 
     @abstractmethod
-    def get_quizes_by_title(self, title: str) -> list[Quiz]:
+    def get_quizes_by_title(self, title: str, fields: Fields = None) -> list[Quiz]:
         """
         Возвращает список квизов по названию.
 
         :param title: Название квиза.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
         :return: Список квизов с подходящими названиями.
         """
         ...
@@ -117,40 +143,99 @@ class AbstractQuestionService(ABC):
     """Интерфейс для работы с вопросами"""
 
     @abstractmethod
-    def list_questions(self) -> list[Question]:
+    def list_questions(
+        self,
+        fields: Fields = None,
+        filters: dict | None = None,
+        expand: Expand = (),
+    ) -> list[Question]:
         """
         Возвращает список всех вопросов.
 
+        :param fields: Поля, которые нужно загрузить (None — все поля).
+        :param filters: Фильтры quiz_id, category_id, difficulty.
+        :param expand: Связи (category, quiz), которые нужно загрузить
+            вместе с вопросами.
         :return: Список вопросов.
         """
         ...
 
     @abstractmethod
-    def get_question(self, question_id: int) -> Question:
+    def count_questions(
+        self,
+        filters: dict | None = None,
+        estimated: bool = False,
+    ) -> int:
+        """
+        Возвращает количество вопросов, подходящих под фильтры.
+
+        :param filters: Фильтры quiz_id, category_id, difficulty.
+        :param estimated: Разрешить приблизительную оценку по статистике БД.
+        :return: Количество вопросов.
+        """
+        ...
+
+    @abstractmethod
+    def get_question(
+        self,
+        question_id: int,
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> Question:
         """
         Возвращает вопрос по его идентификатору.
 
         :param question_id: Идентификатор вопроса.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
+        :param expand: Связи (category, quiz), которые нужно загрузить
+            вместе с вопросами.
         :return: Вопрос из БД.
         """
         ...
 
     @abstractmethod
-    def get_questions_by_text(self, text: str) -> list[Question]:
+    def get_questions_by_ids(
+        self,
+        question_ids: list[int],
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> list[Question]:
+        """
+        Возвращает вопросы по списку идентификаторов.
+
+        :param question_ids: Идентификаторы вопросов.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
+        :param expand: Связи (category, quiz), которые нужно загрузить
+            вместе с вопросами.
+        :return: Найденные вопросы в порядке question_ids.
+        """
+        ...
+
+    @abstractmethod
+    def get_questions_by_text(
+        self,
+        text: str,
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> list[Question]:
         """
         Возвращает вопрос по его тексту.
 
         :param text: Текст вопроса.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
+        :param expand: Связи (category, quiz), которые нужно загрузить
+            вместе с вопросами.
         :return: Вопрос из БД.
         """
         ...
 
     @abstractmethod
-    def get_questions_for_quiz(self, quiz_id: int) -> list[Question]:
+    def get_questions_for_quiz(self, quiz_id: int, fields: Fields = None) -> list[Question]:
         """
         Получение вопросов по идентификатору квиза.
 
         :param quiz_id: Идентификатор квиза.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
         :return: Список вопросов квиза.
         """
         ...
@@ -186,6 +271,42 @@ class AbstractQuestionService(ABC):
         """
         ...
 
+    @abstractmethod
+    def bulk_update_questions(
+        self,
+        values: dict,
+        question_ids: list[int] | None = None,
+        filters: dict | None = None,
+    ) -> int:
+        """
+        Изменяет поля сразу многих вопросов.
+
+        Вопросы выбираются списком id или фильтрами quiz_id,
+        category_id, difficulty.
+
+        :param values: Новые значения полей difficulty и category.
+        :param question_ids: Идентификаторы вопросов.
+        :param filters: Фильтры, если id не переданы.
+        :return: Количество изменённых вопросов.
+        """
+        ...
+
+    @abstractmethod
+    def bulk_delete_questions(
+        self,
+        question_ids: list[int] | None = None,
+        filters: dict | None = None,
+    ) -> int:
+        """
+        Удаляет сразу много вопросов.
+
+        :param question_ids: Идентификаторы вопросов.
+        :param filters: Фильтры quiz_id, category_id, difficulty, если id
+            не переданы.
+        :return: Количество удалённых вопросов.
+        """
+        ...
+
     @abstractmethod
     def check_answer(self, question_id: int, answer: str) -> bool:
         """
@@ -193,16 +314,75 @@ class AbstractQuestionService(ABC):
 
         :param question_id: Идентификатор вопроса.
         :param answer: Ответ пользователя.
-        :return: True, если ответ правильный, False - в противном случае.
+        :return: True, если ответ принимается политикой сравнения вопроса
+            (Question.match_policy), False - в противном случае.
         """
         ...
 
     @abstractmethod
-    def random_question_from_quiz(self, quiz_id: int) -> Question:
+    def random_question_from_quiz(
+        self,
+        quiz_id: int,
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> Question:
         """
         Возвращает случайный вопрос из указанного квиза.
 
         :param quiz_id: Идентификатор квиза.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
+        :param expand: Связи (category, quiz), которые нужно загрузить
+            вместе с вопросами.
         :return: Случайный вопрос из квиза.
         """
         ...
+
+    @abstractmethod
+    def practice_set(
+        self,
+        category_ids: list[int],
+        count: int,
+        shares: dict[str, float] | None = None,
+        seed: int | None = None,
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> list[Question]:
+        """
+        Собирает набор вопросов из категорий по долям сложностей.
+
+        :param category_ids: Идентификаторы категорий.
+        :param count: Сколько вопросов выбрать.
+        :param shares: Сложность → доля вопросов; сложности без доли
+            делят остаток (см. quiz.sampling.difficulty_strata).
+        :param seed: Зерно генератора: с одним зерном и теми же
+            вопросами в категориях набор повторяется.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
+        :param expand: Связи (category, quiz), которые нужно загрузить
+            вместе с вопросами.
+        :return: Вопросы в случайном порядке; меньше count, если в
+            каком-то слое не хватило вопросов.
+        """
+        ...
+
+    @abstractmethod
+    def random_questions_from_quiz(
+        self,
+        quiz_id: int,
+        k: int,
+        difficulties: tuple[str, ...] = (),
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> list[Question]:
+        """
+        Возвращает до k различных случайных вопросов квиза.
+
+        :param quiz_id: Идентификатор квиза.
+        :param k: Сколько вопросов выбрать.
+        :param difficulties: Допустимые сложности (пусто — любые).
+        :param fields: Поля, которые нужно загрузить (None — все поля).
+        :param expand: Связи (category, quiz), которые нужно загрузить
+            вместе с вопросами.
+        :return: Вопросы в случайном порядке; все подходящие, если их
+            не больше k.
+        """
+        ...
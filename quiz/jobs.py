@@ -0,0 +1,397 @@
+"""
+Модуль фоновых задач.
+
+Задачи хранятся в таблице Job и выполняются либо пулом потоков внутри
+веб-процесса (QUIZ_JOBS_MODE = 'thread'), либо отдельным процессом
+manage.py run_jobs (QUIZ_JOBS_MODE = 'external'). Задачи, помеченные
+как cpu_bound, выполняются в пуле процессов и занимают несколько ядер.
+
+Упавшая задача повторяется с паузой, которая удваивается с каждой
+попыткой. Выполняющаяся задача периодически отмечается живой; задачу
+без отметки дольше QUIZ_JOBS_STALE_SECONDS (воркер упал или был убит)
+следующий claim_next() возвращает в очередь или, если попытки
+исчерпаны, помечает упавшей.
+"""
+
+import logging
+import multiprocessing
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from importlib import import_module
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+
+import django
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F, Min, Q
+from django.utils import timezone
+
+from quiz import metrics
+from quiz.constants import JOB_PROGRESS_MIN_STEP
+from quiz.models import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+JOBS_MODE_THREAD = 'thread'
+STALE_JOB_ERROR = 'The worker stopped without finishing the job.'
+# Модуль, в котором объявлены задачи; импортируется при первом обращении.
+TASKS_MODULE = 'quiz.tasks'
+
+
+class JobCancelled(Exception):
+    """Исключение, которым задача прерывается после запроса на отмену."""
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    """Описание зарегистрированной задачи."""
+
+    name: str
+    func: Callable
+    cpu_bound: bool = False
+
+
+class JobContext:
+    """Объект, через который задача сообщает прогресс и узнаёт об отмене."""
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self._reported = 0.0
+        self._beat_at = time.monotonic()
+
+    def set_progress(self, done: int, total: int) -> None:
+        """
+        Сохраняет прогресс задачи и проверяет, не запрошена ли отмена.
+
+        Запись в БД делается только при заметном изменении прогресса.
+
+        :param done: Сколько единиц работы выполнено.
+        :param total: Сколько единиц работы всего.
+        :raises JobCancelled: Если задачу попросили отменить.
+        """
+        progress = min(done / total, 1.0) if total else 1.0
+        if progress - self._reported >= JOB_PROGRESS_MIN_STEP:
+            Job.objects.filter(pk=self.job_id).update(progress=progress)
+            self._reported = progress
+        self.check_cancelled()
+
+    def check_cancelled(self) -> None:
+        """
+        Прерывает задачу, если для неё запрошена отмена.
+
+        :raises JobCancelled: Если задачу попросили отменить.
+        """
+        self.heartbeat()
+        if Job.objects.filter(pk=self.job_id, cancel_requested=True).exists():
+            raise JobCancelled
+
+    def heartbeat(self) -> None:
+        """
+        Отмечает, что задача выполняется.
+
+        Запись делается не чаще раза в QUIZ_JOBS_HEARTBEAT_SECONDS.
+        Задача, которая дольше QUIZ_JOBS_STALE_SECONDS не сообщает
+        прогресс и не проверяет отмену, считается брошенной.
+        """
+        now = time.monotonic()
+        if now - self._beat_at >= settings.QUIZ_JOBS_HEARTBEAT_SECONDS:
+            Job.objects.filter(pk=self.job_id).update(heartbeat_at=timezone.now())
+            self._beat_at = now
+
+
+_registry: dict[str, JobSpec] = {}
+_executors: dict[str, Executor] = {}
+_executors_lock = threading.Lock()
+
+
+def register(name: str, cpu_bound: bool = False) -> Callable:
+    """
+    Декоратор, регистрирующий функцию как фоновую задачу.
+
+    Функция вызывается как func(context, **payload).
+
+    :param name: Уникальное имя задачи.
+    :param cpu_bound: Выполнять задачу в пуле процессов.
+    :return: Декоратор.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        _registry[name] = JobSpec(name, func, cpu_bound)
+        return func
+
+    return decorator
+
+
+def get_spec(name: str) -> JobSpec:
+    """
+    Возвращает описание задачи по имени.
+
+    Модуль с задачами импортируется лениво, чтобы не замедлять запуск
+    процесса, которому фоновые задачи не нужны.
+
+    :param name: Имя задачи.
+    :return: Описание задачи.
+    :raises KeyError: Если задача не зарегистрирована.
+    """
+    if name not in _registry:
+        import_module(TASKS_MODULE)
+    return _registry[name]
+
+
+def enqueue(name: str, **payload) -> Job:
+    """
+    Ставит задачу в очередь.
+
+    В режиме 'thread' задача запускается пулом текущего процесса после
+    фиксации транзакции; при QUIZ_JOBS_EAGER = True — сразу.
+
+    :param name: Имя зарегистрированной задачи.
+    :param payload: JSON-совместимые аргументы задачи.
+    :return: Созданная запись Job.
+    """
+    get_spec(name)
+    job = Job.objects.create(name=name, payload=payload)
+    if settings.QUIZ_JOBS_EAGER:
+        while job.status == JobStatus.PENDING:
+            run_job(job.pk)
+            job.refresh_from_db()
+    elif settings.QUIZ_JOBS_MODE == JOBS_MODE_THREAD:
+        transaction.on_commit(lambda: _executor('thread').submit(_drain))
+    return job
+
+
+def cancel(job_id: int) -> Job:
+    """
+    Отменяет задачу.
+
+    Задача в очереди отменяется сразу, выполняющаяся — при следующей
+    проверке JobContext.check_cancelled().
+
+    :param job_id: Идентификатор задачи.
+    :return: Обновлённая запись Job.
+    """
+    Job.objects.filter(pk=job_id, status=JobStatus.PENDING).update(
+        status=JobStatus.CANCELLED,
+        cancel_requested=True,
+        finished_at=timezone.now(),
+    )
+    Job.objects.filter(pk=job_id, status=JobStatus.RUNNING).update(
+        cancel_requested=True,
+    )
+    return Job.objects.get(pk=job_id)
+
+
+def claim_next() -> Job | None:
+    """
+    Атомарно забирает следующую задачу из очереди.
+
+    Условный UPDATE гарантирует, что одну задачу не заберут два
+    исполнителя одновременно.
+
+    :return: Захваченная задача или None, если очередь пуста.
+    """
+    requeue_stale()
+    while True:
+        now = timezone.now()
+        job_id = (
+            Job.objects
+            .filter(status=JobStatus.PENDING)
+            .filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now))
+            .values_list('pk', flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        claimed = Job.objects.filter(
+            pk=job_id,
+            status=JobStatus.PENDING,
+        ).update(status=JobStatus.RUNNING, started_at=now, heartbeat_at=now)
+        if claimed:
+            return Job.objects.get(pk=job_id)
+
+
+def requeue_stale() -> int:
+    """
+    Возвращает в очередь задачи, брошенные упавшими воркерами.
+
+    Брошенная задача — в статусе running без отметки о работе дольше
+    QUIZ_JOBS_STALE_SECONDS. Её прерванная попытка уже учтена в
+    attempts: если попытки исчерпаны, задача помечается failed.
+
+    :return: Количество обработанных задач.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(
+        status=JobStatus.RUNNING,
+        heartbeat_at__lt=now - timedelta(seconds=settings.QUIZ_JOBS_STALE_SECONDS),
+    )
+    requeued = stale.filter(attempts__lt=F('max_attempts')).update(
+        status=JobStatus.PENDING,
+        error=STALE_JOB_ERROR,
+        next_attempt_at=now,
+    )
+    failed = stale.update(
+        status=JobStatus.FAILED,
+        error=STALE_JOB_ERROR,
+        finished_at=now,
+    )
+    if requeued or failed:
+        logger.warning('Requeued %s and failed %s stale jobs', requeued, failed)
+    return requeued + failed
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """
+    Возвращает паузу перед следующей попыткой.
+
+    :param attempts: Сколько попыток уже сделано.
+    :return: QUIZ_JOBS_RETRY_DELAY_SECONDS, удвоенная за каждую попытку
+        после первой.
+    """
+    return timedelta(
+        seconds=settings.QUIZ_JOBS_RETRY_DELAY_SECONDS * 2 ** max(attempts - 1, 0)
+    )
+
+
+def run_job(job_id: int) -> None:
+    """
+    Выполняет задачу и сохраняет её результат.
+
+    Неудачная задача возвращается в очередь с паузой retry_delay(),
+    пока не исчерпаны попытки.
+
+    :param job_id: Идентификатор задачи.
+    """
+    now = timezone.now()
+    Job.objects.filter(pk=job_id, status=JobStatus.PENDING).update(
+        status=JobStatus.RUNNING,
+        started_at=now,
+        heartbeat_at=now,
+    )
+    job = Job.objects.get(pk=job_id)
+    if job.status != JobStatus.RUNNING:
+        return
+    job.attempts += 1
+    Job.objects.filter(pk=job_id).update(attempts=job.attempts)
+    spec = get_spec(job.name)
+    start = time.perf_counter()
+    try:
+        result = spec.func(JobContext(job_id), **job.payload)
+    except JobCancelled:
+        outcome = JobStatus.CANCELLED
+        _finish(job_id, outcome)
+    except Exception:
+        logger.exception('Job %s #%s failed', job.name, job_id)
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            # Попытка не удалась, задача вернулась в очередь.
+            outcome = JobStatus.PENDING
+            Job.objects.filter(pk=job_id).update(
+                status=outcome,
+                error=error,
+                next_attempt_at=timezone.now() + retry_delay(job.attempts),
+            )
+        else:
+            outcome = JobStatus.FAILED
+            _finish(job_id, outcome, error=error)
+    else:
+        outcome = JobStatus.SUCCEEDED
+        _finish(job_id, outcome, result=result, progress=1.0)
+    metrics.JOB_DURATION.observe(time.perf_counter() - start, job=job.name)
+    metrics.JOBS_FINISHED.inc(job=job.name, status=outcome)
+    metrics.maybe_flush()
+
+
+def dispatch(job: Job) -> None:
+    """
+    Выполняет захваченную задачу подходящим исполнителем.
+
+    CPU-bound задачи уходят в пул процессов, остальные выполняются
+    в текущем потоке.
+
+    :param job: Задача в статусе running.
+    """
+    if get_spec(job.name).cpu_bound:
+        _executor('process').submit(_run_in_process, job.pk).result()
+    else:
+        run_job(job.pk)
+
+
+def _finish(job_id: int, status: str, **fields) -> None:
+    """Переводит задачу в конечный статус."""
+    Job.objects.filter(pk=job_id).update(
+        status=status,
+        finished_at=timezone.now(),
+        **fields,
+    )
+
+
+def _drain() -> None:
+    """
+    Выполняет задачи из очереди, пока она не опустеет.
+
+    Если в очереди остались задачи, ждущие повтора, следующий проход
+    запускается к времени ближайшей из них.
+    """
+    try:
+        while (job := claim_next()) is not None:
+            dispatch(job)
+        next_attempt_at = Job.objects.filter(
+            status=JobStatus.PENDING,
+        ).aggregate(next_attempt_at=Min('next_attempt_at'))['next_attempt_at']
+        if next_attempt_at is not None:
+            _schedule_drain(next_attempt_at)
+    finally:
+        close_old_connections()
+
+
+def _schedule_drain(when: datetime) -> None:
+    """Запускает _drain в пуле потоков в момент when."""
+    delay = max((when - timezone.now()).total_seconds(), 0.0)
+    timer = threading.Timer(
+        delay,
+        lambda: _executor('thread').submit(_drain),
+    )
+    timer.daemon = True
+    timer.start()
+
+
+def _run_in_process(job_id: int) -> None:
+    """Точка входа задачи в дочернем процессе пула."""
+    try:
+        run_job(job_id)
+    finally:
+        connections.close_all()
+
+
+def _init_process() -> None:
+    """Инициализирует Django в дочернем процессе пула."""
+    django.setup()
+
+
+def _executor(kind: str) -> Executor:
+    """
+    Возвращает (и при необходимости создаёт) пул исполнителей.
+
+    :param kind: 'thread' или 'process'.
+    :return: Пул потоков или процессов.
+    """
+    with _executors_lock:
+        if kind not in _executors:
+            workers = settings.QUIZ_JOBS_WORKERS
+            if kind == 'process':
+                _executors[kind] = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_process,
+                )
+            else:
+                _executors[kind] = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix='quiz-job',
+                )
+        return _executors[kind]
@@ -0,0 +1,246 @@
+"""
+Живые раунды квиза.
+
+Ведущий создаёт раунд и переключает вопросы, участники получают текущий
+вопрос потоком Server-Sent Events вместо опроса API. Раунды и подписчики
+хранятся в памяти процесса: все запросы одного раунда должны попадать в
+один ASGI-воркер (например, маршрутизацией по id раунда).
+
+У каждого подписчика своя очередь событий ограниченного размера
+(QUIZ_LIVE_CLIENT_BUFFER). Если клиент не успевает читать, старые
+события вытесняются новыми: важен только текущий вопрос. Ожидающий
+клиент не занимает поток — только задачу в цикле событий, поэтому один
+воркер держит тысячи соединений.
+"""
+
+import asyncio
+import json
+import secrets
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+
+from django.conf import settings
+
+EVENT_QUESTION = 'question'
+EVENT_END = 'end'
+# Комментарий SSE: держит соединение открытым через прокси.
+HEARTBEAT = b': keep-alive\n\n'
+
+
+@dataclass(frozen=True)
+class LiveEvent:
+    """Событие раунда."""
+
+    id: int
+    name: str
+    data: dict
+
+    def encode(self) -> bytes:
+        """Кодирует событие в формате text/event-stream."""
+        return (
+            f'id: {self.id}\nevent: {self.name}\n'
+            f'data: {json.dumps(self.data, ensure_ascii=False)}\n\n'
+        ).encode()
+
+
+class Subscriber:
+    """Очередь событий одного клиента с ограниченным буфером."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, size: int):
+        self._loop = loop
+        self._events: deque[LiveEvent] = deque(maxlen=size)
+        self._ready = asyncio.Event()
+
+    def push(self, event: LiveEvent) -> None:
+        """Передаёт событие в цикл событий клиента из любого потока."""
+        try:
+            self._loop.call_soon_threadsafe(self._push, event)
+        except RuntimeError:
+            # Цикл событий уже закрыт: клиент отключился.
+            pass
+
+    def _push(self, event: LiveEvent) -> None:
+        """Добавляет событие, вытесняя самое старое при переполнении."""
+        self._events.append(event)
+        self._ready.set()
+
+    async def get(self, timeout: float) -> LiveEvent | None:
+        """
+        Ждёт следующее событие.
+
+        :param timeout: Сколько ждать, секунды.
+        :return: Событие или None, если за timeout событий не было.
+        """
+        if not self._events:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except TimeoutError:
+                return None
+        return self._events.popleft()
+
+
+@dataclass
+class LiveRound:
+    """Раунд: квиз, показанные вопросы, последнее событие и подписчики."""
+
+    round_id: str
+    quiz_id: int
+    host_token: str
+    asked: list[int] = field(default_factory=list)
+    updated_at: float = field(default_factory=time.monotonic)
+    _last: LiveEvent | None = field(default=None, init=False, repr=False)
+    _subscribers: set[Subscriber] = field(
+        default_factory=set,
+        init=False,
+        repr=False,
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock,
+        init=False,
+        repr=False,
+    )
+
+    def is_host(self, token: str | None) -> bool:
+        """Проверяет токен ведущего."""
+        return token is not None and secrets.compare_digest(token, self.host_token)
+
+    def publish(self, name: str, data: dict) -> LiveEvent:
+        """
+        Рассылает событие всем подписчикам и запоминает его как текущее.
+
+        :param name: Имя события (EVENT_QUESTION, EVENT_END).
+        :param data: Данные события.
+        :return: Разосланное событие.
+        """
+        with self._lock:
+            event = LiveEvent(
+                (self._last.id if self._last else 0) + 1,
+                name,
+                data,
+            )
+            self._last = event
+            self.updated_at = time.monotonic()
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.push(event)
+        return event
+
+    def advance(self, question_id: int, question: dict) -> LiveEvent:
+        """
+        Показывает следующий вопрос раунда.
+
+        :param question_id: Идентификатор вопроса.
+        :param question: Данные вопроса для участников.
+        :return: Разосланное событие EVENT_QUESTION.
+        """
+        with self._lock:
+            self.asked.append(question_id)
+            number = len(self.asked)
+        return self.publish(EVENT_QUESTION, {'number': number, 'question': question})
+
+    def subscribe(self, subscriber: Subscriber) -> LiveEvent | None:
+        """
+        Добавляет подписчика.
+
+        :return: Текущее событие: оно уже разослано и в очередь нового
+            подписчика не попадёт.
+        """
+        with self._lock:
+            self._subscribers.add(subscriber)
+            return self._last
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Удаляет подписчика."""
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        """Число подключённых подписчиков."""
+        return len(self._subscribers)
+
+
+_rounds: dict[str, LiveRound] = {}
+_rounds_lock = threading.Lock()
+
+
+def create_round(quiz_id: int) -> LiveRound:
+    """
+    Создаёт раунд квиза.
+
+    Заодно удаляет раунды, которые не менялись дольше
+    QUIZ_LIVE_ROUND_IDLE_SECONDS.
+
+    :param quiz_id: Идентификатор квиза.
+    :return: Новый раунд.
+    """
+    live_round = LiveRound(
+        round_id=secrets.token_urlsafe(8),
+        quiz_id=quiz_id,
+        host_token=secrets.token_urlsafe(24),
+    )
+    deadline = time.monotonic() - settings.QUIZ_LIVE_ROUND_IDLE_SECONDS
+    with _rounds_lock:
+        expired = [
+            stale for stale in _rounds.values() if stale.updated_at < deadline
+        ]
+        for stale in expired:
+            del _rounds[stale.round_id]
+        _rounds[live_round.round_id] = live_round
+    for stale in expired:
+        stale.publish(EVENT_END, {})
+    return live_round
+
+
+def get_round(round_id: str) -> LiveRound | None:
+    """Возвращает раунд или None, если его нет."""
+    return _rounds.get(round_id)
+
+
+def finish_round(live_round: LiveRound) -> None:
+    """Завершает раунд: подписчики получают EVENT_END и отключаются."""
+    with _rounds_lock:
+        _rounds.pop(live_round.round_id, None)
+    live_round.publish(EVENT_END, {})
+
+
+async def stream(
+    live_round: LiveRound,
+    last_event_id: int | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Отдаёт события раунда в формате text/event-stream.
+
+    Сначала отправляется текущее событие, если клиент его ещё не видел
+    (заголовок Last-Event-ID при переподключении), затем новые события.
+    Без событий раз в QUIZ_LIVE_HEARTBEAT_SECONDS отправляется
+    комментарий. Поток заканчивается событием EVENT_END.
+
+    :param live_round: Раунд.
+    :param last_event_id: id последнего полученного клиентом события.
+    :return: Асинхронный итератор байтов потока.
+    """
+    subscriber = Subscriber(
+        asyncio.get_running_loop(),
+        settings.QUIZ_LIVE_CLIENT_BUFFER,
+    )
+    current = live_round.subscribe(subscriber)
+    try:
+        if current is not None and current.id != last_event_id:
+            yield current.encode()
+            if current.name == EVENT_END:
+                return
+        while True:
+            event = await subscriber.get(settings.QUIZ_LIVE_HEARTBEAT_SECONDS)
+            if event is None:
+                yield HEARTBEAT
+                continue
+            yield event.encode()
+            if event.name == EVENT_END:
+                return
+    finally:
+        live_round.unsubscribe(subscriber)
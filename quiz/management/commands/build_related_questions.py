@@ -0,0 +1,26 @@
+"""Команда сборки индекса похожих вопросов."""
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from quiz import related
+
+
+class Command(BaseCommand):
+    """Собирает или дополняет индекс похожих вопросов."""
+
+    help = 'Build the related-questions index or add new questions to it.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Описывает аргументы командной строки."""
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Rebuild the index from scratch instead of adding new questions.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Пересчитывает соседей и публикует новую версию индекса."""
+        result = related.build() if options['full'] else related.update()
+        self.stdout.write(
+            f'{result.questions} questions indexed, {result.added} added'
+        )
@@ -0,0 +1,28 @@
+"""Команда сборки OpenAPI-схемы в статический файл."""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from quiz.schema import build_schema
+
+
+class Command(BaseCommand):
+    """Генерирует схему и сохраняет её в QUIZ_SCHEMA_PATH."""
+
+    help = 'Build the OpenAPI schema into a static artifact.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Описывает аргументы командной строки."""
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild even if the artifact matches the current code.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Собирает схему."""
+        artifact = build_schema(force=options['force'])
+        self.stdout.write(
+            f'Schema written to {settings.QUIZ_SCHEMA_PATH} '
+            f'({len(artifact.content)} bytes, etag {artifact.etag})'
+        )
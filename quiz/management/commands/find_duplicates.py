@@ -0,0 +1,74 @@
+"""Команда поиска дубликатов вопросов."""
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db.models import Count, Min
+
+from quiz.models import Question
+from quiz.normalization import question_content_hash
+from quiz.sharding import shard_aliases
+
+REHASH_CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    """Выводит группы вопросов квиза с одинаковым хэшем содержимого."""
+
+    help = (
+        'Report groups of questions with the same normalized content '
+        'within a quiz.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Описывает аргументы командной строки."""
+        parser.add_argument(
+            '--quiz',
+            type=int,
+            default=None,
+            help='Only look at questions of this quiz.',
+        )
+        parser.add_argument(
+            '--rehash',
+            action='store_true',
+            help='Recompute content hashes of all questions first.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Ищет дубликаты в каждом шарде одним GROUP BY."""
+        groups = 0
+        for alias in shard_aliases():
+            questions = Question.objects.using(alias)
+            if options['rehash']:
+                self._rehash(questions)
+            if options['quiz'] is not None:
+                questions = questions.filter(quiz_id=options['quiz'])
+            duplicates = (
+                questions.order_by()
+                .values('quiz_id', 'content_hash')
+                .annotate(copies=Count('id'), first_id=Min('id'))
+                .filter(copies__gt=1)
+                .order_by('quiz_id', 'first_id')
+            )
+            for group in duplicates:
+                groups += 1
+                self.stdout.write(
+                    f'quiz {group["quiz_id"]}: {group["copies"]} copies of '
+                    f'question {group["first_id"]} '
+                    f'(hash {group["content_hash"]})'
+                )
+        self.stdout.write(f'Found {groups} duplicate groups')
+
+    def _rehash(self, questions) -> None:
+        """Пересчитывает хэши порциями, сохраняя только изменившиеся."""
+        changed = []
+        for question in questions.only('text', 'options', 'content_hash').iterator(
+            chunk_size=REHASH_CHUNK_SIZE,
+        ):
+            content_hash = question_content_hash(question.text, question.options)
+            if content_hash != question.content_hash:
+                question.content_hash = content_hash
+                changed.append(question)
+            if len(changed) == REHASH_CHUNK_SIZE:
+                questions.bulk_update(changed, ('content_hash',))
+                changed = []
+        if changed:
+            questions.bulk_update(changed, ('content_hash',))
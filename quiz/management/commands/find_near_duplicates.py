@@ -0,0 +1,28 @@
+"""Команда поиска почти одинаковых вопросов."""
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from quiz.neardup import DEFAULT_THRESHOLD, find_near_duplicates
+
+
+class Command(BaseCommand):
+    """Пересчитывает кластеры почти одинаковых вопросов (MinHash + LSH)."""
+
+    help = 'Rebuild candidate clusters of near-duplicate questions.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Описывает аргументы командной строки."""
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=DEFAULT_THRESHOLD,
+            help='Minimal estimated similarity to the cluster root (0..1).',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Ищет кластеры и сохраняет их в DuplicateCluster."""
+        result = find_near_duplicates(options['threshold'])
+        self.stdout.write(
+            f'{result.questions} questions checked, '
+            f'{result.clusters} clusters written'
+        )
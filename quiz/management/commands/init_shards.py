@@ -0,0 +1,32 @@
+"""Команда подготовки шардов квизов."""
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.models import Category
+from quiz.sharding import replicate
+
+
+class Command(BaseCommand):
+    """Создаёт схему в каждом шарде и копирует в шарды категории."""
+
+    help = 'Create the schema on every quiz shard and copy categories to it.'
+
+    def handle(self, *args, **options) -> None:
+        """Готовит все шарды из QUIZ_SHARDS."""
+        if not settings.QUIZ_SHARDS:
+            raise CommandError('No shards configured (QUIZ_SHARDS).')
+        for alias in settings.QUIZ_SHARDS:
+            call_command(
+                'migrate',
+                database=alias,
+                run_syncdb=True,
+                verbosity=0,
+            )
+            self.stdout.write(f'{alias}: schema is up to date')
+        categories = 0
+        for category in Category.objects.using('default').iterator():
+            replicate(category)
+            categories += 1
+        self.stdout.write(f'Copied {categories} categories to every shard')
@@ -0,0 +1,33 @@
+"""Команда очистки журнала изменений."""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+
+from quiz.models import ChangeLog
+
+
+class Command(BaseCommand):
+    """Удаляет из ChangeLog записи старше срока хранения."""
+
+    help = 'Delete change log entries older than the retention period.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Описывает аргументы командной строки."""
+        parser.add_argument(
+            '--older-than',
+            type=float,
+            default=None,
+            help='Age in seconds (default: QUIZ_CHANGE_LOG_RETENTION).',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Удаляет устаревшие записи."""
+        seconds = options['older_than']
+        if seconds is None:
+            seconds = settings.QUIZ_CHANGE_LOG_RETENTION
+        deadline = timezone.now() - timedelta(seconds=seconds)
+        deleted = ChangeLog.objects.filter(created_at__lt=deadline).delete()[0]
+        self.stdout.write(f'Deleted {deleted} change log entries')
@@ -0,0 +1,29 @@
+"""Команда публикации статических снимков квизов."""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from quiz.snapshots import publish
+
+
+class Command(BaseCommand):
+    """Записывает снимки изменившихся квизов в QUIZ_SNAPSHOT_DIR."""
+
+    help = 'Publish changed quizzes as static JSON snapshots.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Описывает аргументы командной строки."""
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-render every quiz, not only the changed ones.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Публикует снимки."""
+        result = publish(force=options['force'])
+        self.stdout.write(
+            f'Snapshots in {settings.QUIZ_SNAPSHOT_DIR}: '
+            f'{result.written} written, {result.unchanged} unchanged, '
+            f'{result.removed} removed'
+        )
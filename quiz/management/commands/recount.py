@@ -0,0 +1,18 @@
+"""Команда пересчёта счётчиков вопросов."""
+
+from django.core.management.base import BaseCommand
+
+from quiz.counters import recount_question_counts
+
+
+class Command(BaseCommand):
+    """Пересчитывает счётчики вопросов квизов и категорий."""
+
+    help = 'Recount denormalized question counts of quizzes and categories.'
+
+    def handle(self, *args, **options) -> None:
+        """Исправляет разошедшиеся счётчики и сообщает, сколько исправлено."""
+        result = recount_question_counts()
+        self.stdout.write(
+            f'{result.quizzes} quizzes and {result.categories} categories fixed'
+        )
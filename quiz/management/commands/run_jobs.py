@@ -0,0 +1,76 @@
+"""Команда запуска обработчика фоновых задач."""
+
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import close_old_connections
+
+from quiz import jobs
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+
+class Command(BaseCommand):
+    """Выполняет задачи из таблицы Job в нескольких потоках."""
+
+    help = 'Run background jobs from the job table.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Описывает аргументы командной строки."""
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of worker threads.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=DEFAULT_POLL_INTERVAL,
+            help='Seconds to sleep when the queue is empty.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit as soon as the queue is empty.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Запускает рабочие потоки и ждёт их завершения."""
+        stop = threading.Event()
+        workers = [
+            threading.Thread(
+                target=self._work,
+                args=(stop, options['poll_interval'], options['once']),
+                name=f'run-jobs-{index}',
+                daemon=True,
+            )
+            for index in range(options['workers'])
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                while worker.is_alive():
+                    worker.join(timeout=options['poll_interval'])
+        except KeyboardInterrupt:
+            stop.set()
+            self.stdout.write('Stopping after current jobs...')
+            for worker in workers:
+                worker.join()
+
+    def _work(self, stop: threading.Event, poll_interval: float, once: bool) -> None:
+        """Цикл одного рабочего потока."""
+        try:
+            while not stop.is_set():
+                job = jobs.claim_next()
+                if job is None:
+                    if once:
+                        return
+                    time.sleep(poll_interval)
+                    continue
+                self.stdout.write(f'Running {job}')
+                jobs.dispatch(job)
+        finally:
+            close_old_connections()
@@ -0,0 +1,103 @@
+"""Команда профилирования времени запуска воркера."""
+
+import os
+import subprocess
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+IMPORT_TIME_PREFIX = 'import time:'
+DEFAULT_LIMIT = 25
+TARGETS = {
+    'wsgi': 'import project.wsgi',
+    'asgi': 'import project.asgi',
+    'preload': 'import project.wsgi; from project.preload import preload; preload()',
+}
+
+
+class Command(BaseCommand):
+    """Запускает старт воркера в отдельном процессе с -X importtime."""
+
+    help = 'Profile worker start-up time and the most expensive imports.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Описывает аргументы командной строки."""
+        parser.add_argument(
+            '--target',
+            choices=tuple(TARGETS),
+            default='wsgi',
+            help='What to start: wsgi/asgi application or wsgi + preload.',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=DEFAULT_LIMIT,
+            help='How many imports to show.',
+        )
+        parser.add_argument(
+            '--self',
+            action='store_true',
+            dest='sort_by_self',
+            help='Sort by self time instead of cumulative time.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """
+        Запускает профилируемый процесс и печатает отчёт.
+
+        :raises CommandError: Если процесс завершился с ошибкой; код
+            возврата команды совпадает с кодом процесса.
+        """
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'project.settings')
+        started = time.perf_counter()
+        completed = subprocess.run(
+            (sys.executable, '-X', 'importtime', '-c', TARGETS[options['target']]),
+            env=env,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        wall_ms = (time.perf_counter() - started) * 1000
+        if completed.returncode:
+            self.stderr.write(''.join(
+                line for line in completed.stderr.splitlines(keepends=True)
+                if not line.startswith(IMPORT_TIME_PREFIX)
+            ))
+            raise CommandError(
+                f'{options["target"]} start-up failed '
+                f'with exit code {completed.returncode}.',
+                returncode=completed.returncode,
+            )
+
+        imports = parse_import_times(completed.stderr)
+        key = 1 if options['sort_by_self'] else 2
+        imports.sort(key=lambda item: item[key], reverse=True)
+        self.stdout.write(
+            f'{options["target"]}: {wall_ms:.0f} ms wall, '
+            f'{len(imports)} modules imported'
+        )
+        self.stdout.write(f'{"self ms":>9} {"cumul ms":>9}  module')
+        for name, self_us, cumulative_us in imports[:options['limit']]:
+            self.stdout.write(
+                f'{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {name}'
+            )
+
+
+def parse_import_times(output: str) -> list[tuple[str, int, int]]:
+    """
+    Разбирает вывод python -X importtime.
+
+    :param output: Содержимое stderr профилируемого процесса.
+    :return: Список (модуль, собственное время мкс, суммарное время мкс).
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith(IMPORT_TIME_PREFIX):
+            continue
+        self_us, cumulative_us, name = line[len(IMPORT_TIME_PREFIX):].split('|')
+        if not self_us.strip().isdigit():
+            continue
+        imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return imports
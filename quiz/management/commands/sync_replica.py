@@ -0,0 +1,86 @@
+"""Команда обновления локальных SQLite-реплик."""
+
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import DEFAULT_DB_ALIAS
+
+SQLITE_ENGINE = 'django.db.backends.sqlite3'
+
+
+class Command(BaseCommand):
+    """Копирует основную SQLite-базу в файлы реплик."""
+
+    help = 'Copy the primary SQLite database into the read replica files.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Описывает аргументы командной строки."""
+        parser.add_argument(
+            '--replica',
+            action='append',
+            dest='replicas',
+            help='Replica alias to sync (default: all QUIZ_READ_REPLICAS).',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Repeat every N seconds instead of syncing once.',
+        )
+
+    def handle(self, *args, **options) -> None:
+        """Синхронизирует реплики один раз или в цикле."""
+        aliases = options['replicas'] or settings.QUIZ_READ_REPLICAS
+        if not aliases:
+            raise CommandError('No read replicas configured (QUIZ_REPLICAS).')
+        source = _sqlite_path(DEFAULT_DB_ALIAS)
+        targets = [_sqlite_path(alias) for alias in aliases]
+        while True:
+            for alias, target in zip(aliases, targets, strict=True):
+                started = time.perf_counter()
+                sync_sqlite_file(source, target)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                self.stdout.write(f'{alias}: synced in {elapsed_ms:.0f} ms')
+            if options['interval'] <= 0:
+                return
+            time.sleep(options['interval'])
+
+
+def sync_sqlite_file(source: Path, target: Path) -> None:
+    """
+    Копирует SQLite-базу через backup API и атомарно подменяет файл реплики.
+
+    Читатели реплики видят либо старую, либо новую копию целиком.
+
+    :param source: Путь к основной базе.
+    :param target: Путь к файлу реплики.
+    """
+    temporary = target.with_name(f'{target.name}.tmp')
+    source_connection = sqlite3.connect(source)
+    try:
+        target_connection = sqlite3.connect(temporary)
+        try:
+            source_connection.backup(target_connection)
+        finally:
+            target_connection.close()
+    finally:
+        source_connection.close()
+    os.replace(temporary, target)
+
+
+def _sqlite_path(alias: str) -> Path:
+    """
+    Возвращает путь к файлу SQLite-базы по её алиасу.
+
+    :param alias: Алиас из DATABASES.
+    :return: Путь к файлу базы.
+    :raises CommandError: Если алиас неизвестен или это не SQLite.
+    """
+    database = settings.DATABASES.get(alias)
+    if database is None or database['ENGINE'] != SQLITE_ENGINE:
+        raise CommandError(f'{alias} is not a configured SQLite database.')
+    return Path(database['NAME'])
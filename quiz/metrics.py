@@ -0,0 +1,333 @@
+"""
+Метрики приложения в текстовом формате Prometheus.
+
+Счётчики и гистограммы копятся в памяти процесса: запись — короткая
+секция под собственной блокировкой метрики. Запросы замеряет
+MetricsMiddleware (время, код ответа, число и время запросов к БД),
+кэш и фоновые задачи отмечают свои события сами.
+
+Если задан QUIZ_METRICS_DIR, каждый процесс не чаще раза в
+QUIZ_METRICS_FLUSH_SECONDS записывает свои значения в файл <pid>.json
+этого каталога, а /metrics складывает файлы всех процессов. Файл
+перезапущенного воркера с тем же pid перезаписывается, что Prometheus
+воспринимает как сброс счётчика.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count
+from django.http import HttpRequest, HttpResponse
+
+from quiz.models import Job, JobStatus
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+JOB_DURATION_BUCKETS = (0.1, 1.0, 10.0, 60.0, 300.0, 1800.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# url_name для запросов, не попавших ни в один маршрут.
+UNMATCHED_VIEW = 'unmatched'
+
+# Значения метрики: метки → значение (счётчик) или список
+# [корзины..., сумма, количество] (гистограмма).
+Samples = dict[tuple[str, ...], float | list[float]]
+
+
+class Metric(ABC):
+    """Метрика с набором меток."""
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...]):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: Samples = {}
+        self._lock = threading.Lock()
+        REGISTRY[name] = self
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        """Упорядочивает значения меток."""
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def samples(self) -> Samples:
+        """Возвращает копию значений."""
+        with self._lock:
+            return {
+                key: list(value) if isinstance(value, list) else value
+                for key, value in self._values.items()
+            }
+
+    @abstractmethod
+    def render(self, samples: Samples) -> Iterable[str]:
+        """Выводит значения строками формата Prometheus."""
+        ...
+
+
+class Counter(Metric):
+    """Монотонно растущий счётчик."""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Увеличивает счётчик с метками labels."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self, samples: Samples) -> Iterable[str]:
+        """Выводит значения строками формата Prometheus."""
+        for key, value in sorted(samples.items()):
+            yield f'{self.name}{_labels(self.labels, key)} {_number(value)}'
+
+
+class Histogram(Metric):
+    """Распределение наблюдений по корзинам."""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...],
+        buckets: tuple[float, ...],
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Добавляет наблюдение с метками labels."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 3)
+            row[index] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def render(self, samples: Samples) -> Iterable[str]:
+        """Выводит накопленные корзины, сумму и количество."""
+        bounds = [*map(_number, self.buckets), '+Inf']
+        for key, row in sorted(samples.items()):
+            total = 0.0
+            for bound, count in zip(bounds, row[:-2], strict=True):
+                total += count
+                labels = _labels((*self.labels, 'le'), (*key, bound))
+                yield f'{self.name}_bucket{labels} {_number(total)}'
+            labels = _labels(self.labels, key)
+            yield f'{self.name}_sum{labels} {_number(row[-2])}'
+            yield f'{self.name}_count{labels} {_number(row[-1])}'
+
+
+REGISTRY: dict[str, Metric] = {}
+
+REQUEST_DURATION = Histogram(
+    'quiz_http_request_duration_seconds',
+    'Time to build the response, by URL name.',
+    ('view', 'method'),
+    LATENCY_BUCKETS,
+)
+RESPONSES = Counter(
+    'quiz_http_responses_total',
+    'Responses by URL name and status code.',
+    ('view', 'status'),
+)
+REQUEST_QUERIES = Histogram(
+    'quiz_http_request_db_queries',
+    'Database queries per request, by URL name.',
+    ('view',),
+    QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    'quiz_http_request_db_seconds',
+    'Time spent in database queries per request, by URL name.',
+    ('view',),
+    LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    'quiz_cache_requests_total',
+    'Cache lookups by cache and result (hit or miss).',
+    ('cache', 'result'),
+)
+JOBS_FINISHED = Counter(
+    'quiz_jobs_finished_total',
+    'Background job runs by job name and outcome.',
+    ('job', 'status'),
+)
+JOB_DURATION = Histogram(
+    'quiz_job_duration_seconds',
+    'Background job run time, by job name.',
+    ('job',),
+    JOB_DURATION_BUCKETS,
+)
+ROWS_PROCESSED = Counter(
+    'quiz_rows_processed_total',
+    'Rows written by bulk imports and exports, by operation.',
+    ('operation',),
+)
+
+
+class QueryStats:
+    """Обёртка выполнения SQL, считающая запросы и их время."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Выполняет запрос и учитывает его."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.seconds += time.perf_counter() - start
+
+
+class MetricsMiddleware:
+    """
+    Замеряет запросы: время, код ответа, число и время запросов к БД.
+
+    Для потоковых ответов учитывается время до начала отдачи потока.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """Выполняет запрос и записывает его метрики."""
+        stats = QueryStats()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(stats))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+        match = getattr(request, 'resolver_match', None)
+        view = match.url_name if match is not None and match.url_name else UNMATCHED_VIEW
+        REQUEST_DURATION.observe(elapsed, view=view, method=request.method)
+        RESPONSES.inc(view=view, status=response.status_code)
+        REQUEST_QUERIES.observe(stats.queries, view=view)
+        REQUEST_DB_DURATION.observe(stats.seconds, view=view)
+        maybe_flush()
+        return response
+
+
+_last_flush = 0.0
+
+
+def snapshot() -> dict[str, list]:
+    """Возвращает значения всех метрик процесса в виде, пригодном для JSON."""
+    return {
+        name: [[list(key), value] for key, value in metric.samples().items()]
+        for name, metric in REGISTRY.items()
+    }
+
+
+def flush() -> None:
+    """Записывает значения процесса в QUIZ_METRICS_DIR, если он задан."""
+    global _last_flush
+
+    _last_flush = time.monotonic()
+    if not settings.QUIZ_METRICS_DIR:
+        return
+    directory = Path(settings.QUIZ_METRICS_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'{os.getpid()}.json'
+    temporary = path.with_suffix(f'.{threading.get_ident()}.tmp')
+    temporary.write_text(json.dumps(snapshot()))
+    os.replace(temporary, path)
+
+
+def maybe_flush() -> None:
+    """Записывает значения, если с прошлой записи прошло достаточно времени."""
+    if time.monotonic() - _last_flush >= settings.QUIZ_METRICS_FLUSH_SECONDS:
+        flush()
+
+
+def collect() -> dict[str, Samples]:
+    """
+    Складывает значения всех процессов.
+
+    :return: Имя метрики → значения по меткам.
+    """
+    if settings.QUIZ_METRICS_DIR:
+        flush()
+        snapshots = []
+        for path in Path(settings.QUIZ_METRICS_DIR).glob('*.json'):
+            try:
+                snapshots.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                # Файл удалён или пишется без os.replace.
+                continue
+    else:
+        snapshots = [snapshot()]
+    merged: dict[str, Samples] = {name: {} for name in REGISTRY}
+    for values in snapshots:
+        for name, rows in values.items():
+            if name not in merged:
+                continue
+            target = merged[name]
+            for key, value in rows:
+                key = tuple(key)
+                if isinstance(value, list):
+                    current = target.setdefault(key, [0.0] * len(value))
+                    target[key] = [a + b for a, b in zip(current, value, strict=True)]
+                else:
+                    target[key] = target.get(key, 0.0) + value
+    return merged
+
+
+def render() -> str:
+    """Выводит все метрики в текстовом формате Prometheus."""
+    lines = []
+    for name, samples in collect().items():
+        metric = REGISTRY[name]
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        lines.extend(metric.render(samples))
+    lines.extend(_job_queue_lines())
+    return '\n'.join(lines) + '\n'
+
+
+def _job_queue_lines() -> Iterable[str]:
+    """Выводит число задач в очереди по статусам (общее для процессов)."""
+    counts = dict(
+        Job.objects.values_list('status').annotate(count=Count('pk')).order_by()
+    )
+    yield '# HELP quiz_jobs Background jobs by status.'
+    yield '# TYPE quiz_jobs gauge'
+    for status in JobStatus.values:
+        yield f'quiz_jobs{_labels(("status",), (status,))} {counts.get(status, 0)}'
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    """Форматирует метки {name="value",...}."""
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)
+    )
+    return f'{{{pairs}}}'
+
+
+def _escape(value: str) -> str:
+    """Экранирует значение метки."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value: float) -> str:
+    """Форматирует число: целые без дробной части."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
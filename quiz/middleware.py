@@ -0,0 +1,47 @@
+"""Middleware приложения quiz."""
+
+from collections.abc import Callable
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+
+from quiz.routers import (
+    PIN_STICKY,
+    has_written,
+    pin_to_primary,
+    reset_pinning,
+    restore_pinning,
+)
+
+PIN_PRIMARY_COOKIE = 'quiz_pin_primary'
+
+
+class ReplicaPinningMiddleware:
+    """
+    Ограничивает привязку к основной базе рамками запроса.
+
+    Если в запросе была запись, ставит cookie, по которой следующие
+    запросы клиента какое-то время тоже читают из основной базы.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """Обрабатывает запрос с отдельным состоянием привязки."""
+        token = reset_pinning()
+        try:
+            if request.COOKIES.get(PIN_PRIMARY_COOKIE):
+                pin_to_primary(PIN_STICKY)
+            response = self.get_response(request)
+            if has_written() and settings.QUIZ_READ_REPLICAS:
+                response.set_cookie(
+                    PIN_PRIMARY_COOKIE,
+                    '1',
+                    max_age=settings.QUIZ_REPLICA_PIN_SECONDS,
+                    httponly=True,
+                    samesite='Lax',
+                )
+            return response
+        finally:
+            restore_pinning(token)
@@ -1,20 +1,81 @@
 """Модели данных для приложения quiz."""
 
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, router, transaction
 
 from quiz.constants import (
+    CONTENT_HASH_LENGTH,
+    DEFAULT_JOB_MAX_ATTEMPTS,
+    JOB_STATUS_INDEX,
+    MAX_MATCH_POLICY_LENGTH,
     MAX_CATEGORY_TITLE_LENGTH,
+    MAX_CHANGE_MODEL_LENGTH,
+    MAX_CHANGE_OPERATION_LENGTH,
+    MAX_JOB_NAME_LENGTH,
+    MAX_JOB_STATUS_LENGTH,
     MAX_QUIZ_TITLE_LENGTH,
     MAX_QUIZ_DESCRIPTION_LENGTH,
     MAX_STR_RETURN_LENGTH,
     MAX_QUESTION_DESCRIPTION_LENGTH,
     MAX_QUESTION_TEXT_LENGTH,
-    MAX_QUESTION_EXPLANATION_LENGTH
+    MAX_QUESTION_EXPLANATION_LENGTH,
+    QUESTION_CATEGORY_DIFFICULTY_INDEX,
+    QUESTION_DIFFICULTY_INDEX,
+    QUESTION_QUIZ_CONTENT_HASH_INDEX,
+    QUESTION_QUIZ_DIFFICULTY_INDEX,
+    QUESTION_SEARCH_TEXT_INDEX,
 )
-from quiz.validators import validate_answer_options
+from quiz.answers import MatchPolicy, accepted_answers
+from quiz.normalization import question_content_hash, search_key
+from quiz.validators import (
+    validate_answer_aliases,
+    validate_answer_options,
+    validate_answer_tolerance,
+    validate_numeric_answers,
+)
+
+# Поля, от которых зависят принятые формы ответа.
+ANSWER_SOURCE_FIELDS = frozenset({
+    'correct_answer',
+    'match_policy',
+    'answer_aliases',
+})
+
+
+class QuestionCounts(models.Model):
+    """
+    Счётчики вопросов: всего и по каждой сложности.
 
+    Поддерживаются при сохранении и удалении вопросов (quiz.signals),
+    пересчитываются командой manage.py recount.
+    """
 
-class Category(models.Model):
+    question_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='questions',
+    )
+    easy_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='easy questions',
+    )
+    medium_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='medium questions',
+    )
+    hard_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='hard questions',
+    )
+
+    class Meta:
+        abstract = True
+
+
+class Category(QuestionCounts):
     """Модель категории вопросов."""
 
     title = models.CharField(
@@ -34,7 +95,7 @@ class Category(models.Model):
         return self.title[:MAX_STR_RETURN_LENGTH]
 
 
-class Quiz(models.Model):
+class Quiz(QuestionCounts):
     """Модель квиза (теста/викторины)."""
 
     title = models.CharField(
@@ -49,6 +110,10 @@ class Quiz(models.Model):
         blank=True,
         verbose_name='quiz description',
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='updated at',
+    )
 
     class Meta:
         verbose_name_plural = 'Quizzes'
@@ -72,6 +137,14 @@ class Difficulty(models.TextChoices):
         return 'Difficulty choices: EASY, MEDIUM, HARD'
 
 
+# Счётчик QuestionCounts для каждой сложности.
+DIFFICULTY_COUNT_FIELDS = {
+    Difficulty.EASY: 'easy_count',
+    Difficulty.MEDIUM: 'medium_count',
+    Difficulty.HARD: 'hard_count',
+}
+
+
 class Question(models.Model):
     """Модель вопроса."""
 
@@ -106,6 +179,32 @@ class Question(models.Model):
     correct_answer = models.TextField(
         verbose_name='correct answer',
     )
+    match_policy = models.CharField(
+        max_length=MAX_MATCH_POLICY_LENGTH,
+        choices=MatchPolicy.choices,
+        default=MatchPolicy.EXACT,
+        verbose_name='answer match policy',
+    )
+    answer_aliases = models.JSONField(
+        default=list,
+        blank=True,
+        validators=(
+            validate_answer_aliases,
+        ),
+        verbose_name='other accepted answers',
+    )
+    answer_tolerance = models.FloatField(
+        default=0,
+        validators=(
+            validate_answer_tolerance,
+        ),
+        verbose_name='numeric answer tolerance',
+    )
+    accepted_answers = models.JSONField(
+        default=list,
+        editable=False,
+        verbose_name='normalized accepted answers',
+    )
     explanation = models.TextField(
         max_length=MAX_QUESTION_EXPLANATION_LENGTH,
         blank=True,
@@ -116,6 +215,15 @@ class Question(models.Model):
         choices=Difficulty.choices,
         verbose_name='difficulty options',
     )
+    content_hash = models.CharField(
+        max_length=CONTENT_HASH_LENGTH,
+        editable=False,
+        verbose_name='normalized content hash',
+    )
+    search_text = models.TextField(
+        editable=False,
+        verbose_name='casefolded text for search',
+    )
 
     class Meta:
         default_related_name = 'questions'
@@ -124,3 +232,266 @@ class Question(models.Model):
         ordering = (
             'difficulty',
         )
+        indexes = (
+            models.Index(
+                fields=('quiz', 'difficulty'),
+                name=QUESTION_QUIZ_DIFFICULTY_INDEX,
+            ),
+            models.Index(
+                fields=('category', 'difficulty'),
+                name=QUESTION_CATEGORY_DIFFICULTY_INDEX,
+            ),
+            models.Index(
+                fields=('difficulty',),
+                name=QUESTION_DIFFICULTY_INDEX,
+            ),
+            models.Index(
+                fields=('search_text',),
+                name=QUESTION_SEARCH_TEXT_INDEX,
+            ),
+            models.Index(
+                fields=('quiz', 'content_hash'),
+                name=QUESTION_QUIZ_CONTENT_HASH_INDEX,
+            ),
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает значения полей, с которыми объект загружен из БД."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values, strict=True))
+        return instance
+
+    def clean(self):
+        """Проверяет числовые ответы и отсутствие дубликата в квизе."""
+        super().clean()
+        validate_numeric_answers(
+            self.match_policy,
+            self.correct_answer,
+            self.answer_aliases,
+        )
+        if self.quiz_id is None:
+            return
+        duplicate_id = self.find_duplicate(
+            router.db_for_write(type(self), instance=self),
+        )
+        if duplicate_id is not None:
+            raise ValidationError(
+                f'Duplicate of question {duplicate_id} in this quiz.'
+            )
+
+    def find_duplicate(self, using: str) -> int | None:
+        """
+        Ищет в квизе другой вопрос с тем же нормализованным содержимым.
+
+        :param using: Алиас базы для записи: реплика может ещё не знать
+            о только что созданном дубликате.
+        :return: id дубликата или None.
+        """
+        return (
+            Question.objects.using(using)
+            .filter(
+                quiz_id=self.quiz_id,
+                content_hash=question_content_hash(self.text, self.options),
+            )
+            .exclude(pk=self.pk)
+            .values_list('pk', flat=True)
+            .first()
+        )
+
+    def save(self, *args, **kwargs):
+        """
+        Пересчитывает вычисляемые поля перед сохранением.
+
+        Хэш содержимого, текст для поиска и принятые ответы вычисляются
+        из полей вопроса. Сохранение и сдвиг счётчиков в обработчике
+        post_save выполняются в одной транзакции.
+        """
+        self.content_hash = question_content_hash(self.text, self.options)
+        self.search_text = search_key(self.text)
+        self.accepted_answers = accepted_answers(
+            self.correct_answer,
+            self.match_policy,
+            self.answer_aliases,
+        )
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if {'text', 'options'} & update_fields:
+                update_fields.add('content_hash')
+            if 'text' in update_fields:
+                update_fields.add('search_text')
+            if ANSWER_SOURCE_FIELDS & update_fields:
+                update_fields.add('accepted_answers')
+            kwargs['update_fields'] = update_fields
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+    def affected_quiz_ids(self) -> set[int]:
+        """Возвращает текущий и исходный квизы вопроса."""
+        loaded = getattr(self, '_loaded_values', {})
+        return {self.quiz_id, loaded.get('quiz_id')} - {None}
+
+
+class JobStatus(models.TextChoices):
+    """Перечисление состояний фоновой задачи."""
+
+    PENDING = 'pending', 'Ожидает'
+    RUNNING = 'running', 'Выполняется'
+    SUCCEEDED = 'succeeded', 'Выполнена'
+    FAILED = 'failed', 'Ошибка'
+    CANCELLED = 'cancelled', 'Отменена'
+
+
+class Job(models.Model):
+    """Модель фоновой задачи."""
+
+    name = models.CharField(
+        max_length=MAX_JOB_NAME_LENGTH,
+        verbose_name='job name',
+    )
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='job arguments',
+    )
+    status = models.CharField(
+        max_length=MAX_JOB_STATUS_LENGTH,
+        choices=JobStatus.choices,
+        default=JobStatus.PENDING,
+        verbose_name='status',
+    )
+    progress = models.FloatField(
+        default=0.0,
+        verbose_name='progress (0..1)',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='attempts made',
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=DEFAULT_JOB_MAX_ATTEMPTS,
+        verbose_name='max attempts',
+    )
+    cancel_requested = models.BooleanField(
+        default=False,
+        verbose_name='cancel requested',
+    )
+    result = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name='result',
+    )
+    error = models.TextField(
+        blank=True,
+        default='',
+        verbose_name='last error',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='created at',
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='started at',
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='finished at',
+    )
+    heartbeat_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='last heartbeat',
+    )
+    next_attempt_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='next attempt not before',
+    )
+
+    class Meta:
+        verbose_name_plural = 'Jobs'
+        verbose_name = 'Job'
+        ordering = (
+            'id',
+        )
+        indexes = (
+            models.Index(
+                fields=('status', 'id'),
+                name=JOB_STATUS_INDEX,
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
+
+
+class ChangeOperation(models.TextChoices):
+    """Перечисление видов изменений в журнале."""
+
+    UPSERT = 'upsert', 'Создание или изменение'
+    DELETE = 'delete', 'Удаление'
+
+
+class ChangeLog(models.Model):
+    """Журнал изменений квизов, вопросов и категорий."""
+
+    model_name = models.CharField(
+        max_length=MAX_CHANGE_MODEL_LENGTH,
+        verbose_name='model name',
+    )
+    object_id = models.BigIntegerField(
+        verbose_name='object id',
+    )
+    operation = models.CharField(
+        max_length=MAX_CHANGE_OPERATION_LENGTH,
+        choices=ChangeOperation.choices,
+        verbose_name='operation',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='created at',
+    )
+
+    class Meta:
+        verbose_name_plural = 'Change log'
+        verbose_name = 'Change log entry'
+        ordering = (
+            'id',
+        )
+
+    def __str__(self):
+        return f'{self.operation} {self.model_name} #{self.object_id}'
+
+
+class DuplicateCluster(models.Model):
+    """Кластер почти одинаковых вопросов для ручной проверки."""
+
+    question_ids = models.JSONField(
+        verbose_name='question ids',
+    )
+    size = models.PositiveIntegerField(
+        verbose_name='number of questions',
+    )
+    similarity = models.FloatField(
+        verbose_name='min estimated similarity',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='created at',
+    )
+
+    class Meta:
+        verbose_name_plural = 'Duplicate clusters'
+        verbose_name = 'Duplicate cluster'
+        ordering = (
+            '-size',
+            'id',
+        )
+
+    def __str__(self):
+        return f'{self.size} questions ({self.similarity:.2f})'
@@ -0,0 +1,240 @@
+"""
+Модуль поиска почти одинаковых вопросов (MinHash + LSH).
+
+Текст вопроса вместе с вариантами ответов нормализуется и разбивается
+на символьные k-граммы (шинглы). Для каждого вопроса считается
+MinHash-сигнатура: минимум по шинглам от каждой из NUM_PERMUTATIONS
+хэш-функций. Доля совпадающих позиций двух сигнатур оценивает
+коэффициент Жаккара множеств шинглов.
+
+Сигнатуры режутся на BANDS полос по ROWS_PER_BAND значений; вопросы с
+одинаковой полосой попадают в одну корзину и становятся кандидатами.
+Кандидаты объединяются в компоненты связности, после чего в кластере
+остаются только вопросы, сигнатура которых достаточно близка к
+сигнатуре первого вопроса кластера. Все шаги векторизованы NumPy,
+попарного сравнения вопросов нет.
+"""
+
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+import numpy as np
+from django.db import transaction
+
+from quiz.models import DuplicateCluster, Question
+from quiz.normalization import normalize_text, parse_options
+from quiz.sharding import shard_aliases
+
+SHINGLE_LENGTH = 5
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+# Минимальная оценка сходства с первым вопросом кластера.
+DEFAULT_THRESHOLD = 0.6
+# Сколько вопросов обрабатывать за раз при подсчёте сигнатур.
+BATCH_SIZE = 20_000
+SEED = 20240601
+POLYNOMIAL_BASE = np.uint64(1_000_003)
+BAND_MIX = np.uint64(0x100000001B3)
+
+
+@dataclass(frozen=True)
+class ClusteringResult:
+    """Итог поиска: сколько вопросов просмотрено и кластеров найдено."""
+
+    questions: int
+    clusters: int
+
+
+def question_document(text: str, options: str) -> str:
+    """Собирает нормализованный текст вопроса с вариантами ответов."""
+    parts = [normalize_text(text)]
+    parts.extend(normalize_text(str(option)) for option in parse_options(options))
+    return ' '.join(part for part in parts if part)
+
+
+def _permutations() -> tuple[np.ndarray, np.ndarray]:
+    """Возвращает коэффициенты хэш-функций multiply-shift."""
+    rng = np.random.default_rng(SEED)
+    high = np.iinfo(np.uint64).max
+    a = rng.integers(1, high, size=NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, high, size=NUM_PERMUTATIONS, dtype=np.uint64)
+    return a, b
+
+
+def minhash_signatures(documents: list[str]) -> np.ndarray:
+    """
+    Считает MinHash-сигнатуры документов.
+
+    :param documents: Нормализованные тексты.
+    :return: Массив (len(documents), NUM_PERMUTATIONS) uint32.
+    """
+    a, b = _permutations()
+    signatures = np.empty((len(documents), NUM_PERMUTATIONS), dtype=np.uint32)
+    for start in range(0, len(documents), BATCH_SIZE):
+        batch = documents[start:start + BATCH_SIZE]
+        signatures[start:start + len(batch)] = _batch_signatures(batch, a, b)
+    return signatures
+
+
+def _batch_signatures(documents: list[str], a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Считает сигнатуры одной порции документов."""
+    encoded = [
+        document.encode().ljust(SHINGLE_LENGTH) for document in documents
+    ]
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.uint64)
+    owners = np.repeat(np.arange(len(encoded), dtype=np.uint64), lengths)
+
+    # Полиномиальный хэш каждого окна длины SHINGLE_LENGTH.
+    windows = len(data) - SHINGLE_LENGTH + 1
+    hashes = np.zeros(windows, dtype=np.uint64)
+    for offset in range(SHINGLE_LENGTH):
+        hashes = hashes * POLYNOMIAL_BASE + data[offset:offset + windows]
+    # Окна, пересекающие границу документов, отбрасываются.
+    inside = owners[:windows] == owners[SHINGLE_LENGTH - 1:]
+    hashes = (hashes ^ (hashes >> np.uint64(32))) & np.uint64(0xFFFFFFFF)
+    # Уникальные пары (документ, шингл), отсортированные по документу.
+    keys = np.unique((owners[:windows][inside] << np.uint64(32)) | hashes[inside])
+    shingles = keys & np.uint64(0xFFFFFFFF)
+    # Каждый документ не короче шингла, поэтому у каждого есть начало.
+    documents_of = keys >> np.uint64(32)
+    starts = np.flatnonzero(
+        np.concatenate(([True], documents_of[1:] != documents_of[:-1]))
+    )
+
+    signatures = np.empty((len(encoded), NUM_PERMUTATIONS), dtype=np.uint32)
+    for permutation in range(NUM_PERMUTATIONS):
+        values = (a[permutation] * shingles + b[permutation]) >> np.uint64(32)
+        signatures[:, permutation] = np.minimum.reduceat(values, starts)
+    return signatures
+
+
+def cluster_signatures(
+    signatures: np.ndarray,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Группирует сигнатуры через LSH.
+
+    :param signatures: Массив MinHash-сигнатур.
+    :param threshold: Минимальная оценка сходства с корнем кластера.
+    :return: Для каждой строки — индекс корня её кластера и оценка
+        сходства с ним.
+    """
+    count = len(signatures)
+    labels = np.arange(count)
+    groups = [
+        group for group in (
+            _band_groups(signatures, band) for band in range(BANDS)
+        )
+        if len(group[0])
+    ]
+    changed = True
+    while changed:
+        changed = False
+        for members, starts in groups:
+            current = labels[members]
+            smallest = np.minimum.reduceat(current, starts)
+            spread = np.repeat(smallest, np.diff(np.append(starts, len(members))))
+            if (spread < current).any():
+                # Каждая строка входит в одну корзину полосы.
+                labels[members] = np.minimum(current, spread)
+                changed = True
+        # Сжатие путей: метка указывает на корень компоненты.
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+    similarity = (signatures == signatures[labels]).mean(axis=1)
+    outliers = similarity < threshold
+    labels[outliers] = np.flatnonzero(outliers)
+    similarity[outliers] = 1.0
+    return labels, similarity
+
+
+def _band_groups(signatures: np.ndarray, band: int) -> tuple[np.ndarray, np.ndarray]:
+    """Возвращает строки из корзин полосы размером от двух и начала корзин."""
+    rows = signatures[:, band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+    keys = np.zeros(len(signatures), dtype=np.uint64)
+    for column in rows.T:
+        keys = (keys * BAND_MIX) ^ column.astype(np.uint64)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+    starts = np.concatenate(([0], boundaries))
+    sizes = np.diff(np.append(starts, len(keys)))
+    shared = np.repeat(sizes >= 2, sizes)
+    members = order[shared]
+    kept_sizes = sizes[sizes >= 2]
+    return members, np.cumsum(kept_sizes) - kept_sizes
+
+
+def load_documents() -> tuple[np.ndarray, list[str]]:
+    """Загружает id и нормализованные тексты всех вопросов."""
+    ids = []
+    documents = []
+    for alias in shard_aliases():
+        for question_id, text, options in (
+            Question.objects.using(alias)
+            .order_by('pk')
+            .values_list('pk', 'text', 'options')
+            .iterator()
+        ):
+            ids.append(question_id)
+            documents.append(question_document(text, options))
+    return np.array(ids, dtype=np.int64), documents
+
+
+def find_near_duplicates(
+    threshold: float = DEFAULT_THRESHOLD,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> ClusteringResult:
+    """
+    Находит кластеры почти одинаковых вопросов и сохраняет их.
+
+    Прежние кластеры заменяются новыми.
+
+    :param threshold: Минимальная оценка сходства с корнем кластера.
+    :param on_progress: Вызывается после каждого этапа с (готово, всего).
+    :return: Итог поиска.
+    """
+    ids, documents = load_documents()
+    _progress(on_progress, 1)
+    signatures = minhash_signatures(documents)
+    _progress(on_progress, 2)
+    labels, similarity = cluster_signatures(signatures, threshold)
+    clusters = list(_clusters(ids, labels, similarity))
+    with transaction.atomic():
+        DuplicateCluster.objects.all().delete()
+        DuplicateCluster.objects.bulk_create(clusters, batch_size=1000)
+    _progress(on_progress, 3)
+    return ClusteringResult(questions=len(ids), clusters=len(clusters))
+
+
+def _clusters(
+    ids: np.ndarray,
+    labels: np.ndarray,
+    similarity: np.ndarray,
+) -> Iterable[DuplicateCluster]:
+    """Превращает метки компонент в кластеры из двух и более вопросов."""
+    order = np.argsort(labels, kind='stable')
+    sorted_labels = labels[order]
+    starts = np.flatnonzero(np.diff(sorted_labels, prepend=-1))
+    ends = np.append(starts, len(order))[1:]
+    for start, end in zip(starts, ends, strict=True):
+        if end - start < 2:
+            continue
+        members = order[start:end]
+        yield DuplicateCluster(
+            question_ids=sorted(ids[members].tolist()),
+            size=int(end - start),
+            similarity=float(similarity[members].min()),
+        )
+
+
+def _progress(on_progress: Callable[[int, int], None] | None, done: int) -> None:
+    """Сообщает о завершении этапа."""
+    if on_progress is not None:
+        on_progress(done, 3)
@@ -0,0 +1,85 @@
+"""
+Модуль нормализации текстов вопросов.
+
+Нормализованная форма не зависит от регистра, пунктуации и количества
+пробелов. По ней вычисляется хэш содержимого вопроса, одинаковый у
+вопросов, которые отличаются только оформлением.
+"""
+
+import hashlib
+import json
+import re
+
+from quiz.constants import CONTENT_HASH_LENGTH
+
+NON_WORD_RE = re.compile(r'[\W_]+')
+# Разделители частей хэшируемой строки: не встречаются в нормализованном тексте.
+PART_SEPARATOR = '\x1f'
+OPTION_SEPARATOR = '\x1e'
+
+
+def normalize_text(text: str) -> str:
+    """
+    Приводит текст к нормализованной форме.
+
+    Регистр сворачивается (casefold), пунктуация и пробельные символы
+    заменяются одним пробелом.
+
+    :param text: Исходный текст.
+    :return: Нормализованный текст.
+    """
+    return NON_WORD_RE.sub(' ', text.casefold()).strip()
+
+
+def search_key(text: str) -> str:
+    """
+    Приводит текст к форме для поиска по префиксу без учёта регистра.
+
+    Регистр сворачивается в Python: lower() в SQLite меняет только
+    ASCII-буквы, и кириллица в индексе по lower(text) не находилась бы.
+
+    :param text: Исходный текст.
+    :return: Текст в нижнем регистре (casefold).
+    """
+    return text.casefold()
+
+
+def parse_options(options: str | list | tuple) -> list:
+    """
+    Возвращает варианты ответов списком.
+
+    :param options: JSON-список из поля Question.options или сам список.
+    :return: Список вариантов; строка не в формате JSON — один вариант.
+    """
+    if isinstance(options, str):
+        try:
+            options = json.loads(options)
+        except ValueError:
+            return [options]
+    if isinstance(options, (list, tuple)):
+        return list(options)
+    return [options]
+
+
+def question_content_hash(text: str, options: str | list | tuple) -> str:
+    """
+    Вычисляет хэш содержимого вопроса.
+
+    Хэшируются нормализованный текст и отсортированные нормализованные
+    варианты ответов, поэтому порядок вариантов не важен.
+
+    :param text: Текст вопроса.
+    :param options: Варианты ответов.
+    :return: Шестнадцатеричный хэш длины CONTENT_HASH_LENGTH.
+    """
+    normalized_options = sorted(
+        normalize_text(str(option)) for option in parse_options(options)
+    )
+    content = PART_SEPARATOR.join((
+        normalize_text(text),
+        OPTION_SEPARATOR.join(normalized_options),
+    ))
+    return hashlib.blake2b(
+        content.encode(),
+        digest_size=CONTENT_HASH_LENGTH // 2,
+    ).hexdigest()
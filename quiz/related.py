@@ -0,0 +1,395 @@
+"""
+Модуль рекомендаций похожих вопросов.
+
+Каждый вопрос (текст и варианты ответов) превращается в плотный вектор
+размерности VECTOR_DIM: слова нормализуются, получают вес
+(1 + log tf) * idf и хэшируются со случайным знаком в одну из координат
+(feature hashing), затем вектор нормируется. Скалярное произведение
+векторов — косинусная близость TF-IDF с шумом от коллизий порядка
+1/sqrt(VECTOR_DIM).
+
+Офлайн-сборка (build) перемножает матрицу векторов на себя блоками и
+сохраняет для каждого вопроса RELATED_MAX_K лучших соседей. Запрос
+рекомендаций — бинарный поиск id в отсортированном массиве и чтение
+строки из .npy, отображённого в память. Сборка пишет новую версию в
+отдельный каталог и переключает manifest.json атомарно.
+
+Инкрементальное обновление (update) добавляет вопросы, которых ещё нет
+в индексе: считает их векторы с сохранёнными idf, находит им соседей и
+улучшает списки соседей уже проиндексированных вопросов. Вопросы,
+созданные после последнего обновления, рекомендаций не получают.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import zlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from quiz.changes import fetch_rows
+from quiz.constants import RELATED_MAX_K
+from quiz.models import Question
+from quiz.neardup import question_document
+from quiz.sharding import shard_aliases
+
+VECTOR_DIM = 512
+# Строк матрицы запросов и столбцов матрицы базы в одном блоке.
+QUERY_BLOCK = 512
+BASE_BLOCK = 65_536
+MANIFEST_NAME = 'manifest.json'
+ARRAYS = ('ids', 'vectors', 'idf', 'neighbors', 'scores')
+SIGN_BIT = 1 << 31
+
+
+@dataclass(frozen=True)
+class RelatedIndexResult:
+    """Итог сборки: сколько вопросов в индексе и сколько добавлено."""
+
+    questions: int
+    added: int
+
+
+def index_dir() -> Path:
+    """Возвращает каталог индекса рекомендаций."""
+    return Path(settings.QUIZ_RELATED_DIR)
+
+
+def tokenize(documents: list[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Хэширует слова документов.
+
+    :param documents: Нормализованные тексты.
+    :return: Номера документов, координаты и знаки (+1/-1) всех слов.
+    """
+    owners = []
+    hashes = []
+    for number, document in enumerate(documents):
+        for word in document.split():
+            owners.append(number)
+            hashes.append(zlib.crc32(word.encode()))
+    owners = np.array(owners, dtype=np.int64)
+    hashes = np.array(hashes, dtype=np.int64)
+    buckets = hashes % VECTOR_DIM
+    signs = np.where(hashes & SIGN_BIT, -1.0, 1.0).astype(np.float32)
+    return owners, buckets, signs
+
+
+def document_frequencies(documents: list[str]) -> np.ndarray:
+    """Считает, в скольких документах встречается каждая координата."""
+    owners, buckets, _ = tokenize(documents)
+    pairs = np.unique(owners * VECTOR_DIM + buckets)
+    return np.bincount(pairs % VECTOR_DIM, minlength=VECTOR_DIM)
+
+
+def idf_weights(frequencies: np.ndarray, documents: int) -> np.ndarray:
+    """Возвращает сглаженные веса idf координат."""
+    return (np.log((1 + documents) / (1 + frequencies)) + 1).astype(np.float32)
+
+
+def vectorize(documents: list[str], idf: np.ndarray) -> np.ndarray:
+    """
+    Строит нормированные векторы документов.
+
+    :param documents: Нормализованные тексты.
+    :param idf: Веса idf координат.
+    :return: Массив (len(documents), VECTOR_DIM) float32.
+    """
+    owners, buckets, signs = tokenize(documents)
+    cells, counts = np.unique(owners * VECTOR_DIM + buckets, return_counts=True)
+    # Знак слова внутри координаты: сумма знаков ячейки после повторов.
+    signed = np.zeros(len(documents) * VECTOR_DIM, dtype=np.float32)
+    np.add.at(signed, owners * VECTOR_DIM + buckets, signs)
+    vectors = np.zeros(len(documents) * VECTOR_DIM, dtype=np.float32)
+    vectors[cells] = (
+        np.sign(signed[cells])
+        * (1 + np.log(counts))
+        * idf[cells % VECTOR_DIM]
+    )
+    vectors = vectors.reshape(len(documents), VECTOR_DIM)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, np.float32(1e-12))
+
+
+def top_neighbors(
+    queries: np.ndarray,
+    base: np.ndarray,
+    query_ids: np.ndarray,
+    base_ids: np.ndarray,
+    k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Находит k ближайших векторов базы для каждого запроса.
+
+    Матрица сходства считается блоками, чтобы не держать её целиком.
+
+    :param queries: Векторы запросов.
+    :param base: Векторы базы.
+    :param query_ids: id вопросов запросов (сам вопрос не попадает в соседи).
+    :param base_ids: id вопросов базы.
+    :param k: Число соседей.
+    :return: id соседей и их сходство, по убыванию сходства; недостающие
+        соседи обозначены id 0.
+    """
+    neighbors = np.zeros((len(queries), k), dtype=np.int64)
+    scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    for start in range(0, len(queries), QUERY_BLOCK):
+        block = slice(start, start + QUERY_BLOCK)
+        best_ids = neighbors[block]
+        best_scores = scores[block]
+        for base_start in range(0, len(base), BASE_BLOCK):
+            ids = base_ids[base_start:base_start + BASE_BLOCK]
+            similarity = queries[block] @ base[base_start:base_start + BASE_BLOCK].T
+            similarity[query_ids[block, None] == ids[None, :]] = -np.inf
+            best_ids, best_scores = _merge(
+                best_ids,
+                best_scores,
+                np.broadcast_to(ids, similarity.shape),
+                similarity,
+                k,
+            )
+        neighbors[block] = best_ids
+        scores[block] = best_scores
+    neighbors[~np.isfinite(scores)] = 0
+    return neighbors, scores
+
+
+def _merge(
+    ids: np.ndarray,
+    scores: np.ndarray,
+    candidate_ids: np.ndarray,
+    candidate_scores: np.ndarray,
+    k: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Оставляет в каждой строке k лучших из текущих соседей и кандидатов."""
+    all_ids = np.concatenate((ids, candidate_ids), axis=1)
+    all_scores = np.concatenate((scores, candidate_scores), axis=1)
+    if all_scores.shape[1] > k:
+        top = np.argpartition(-all_scores, k - 1, axis=1)[:, :k]
+        all_ids = np.take_along_axis(all_ids, top, axis=1)
+        all_scores = np.take_along_axis(all_scores, top, axis=1)
+    order = np.argsort(-all_scores, axis=1, kind='stable')
+    return (
+        np.take_along_axis(all_ids, order, axis=1)[:, :k],
+        np.take_along_axis(all_scores, order, axis=1)[:, :k],
+    )
+
+
+def load_documents(
+    indexed_ids: np.ndarray | None = None,
+) -> tuple[np.ndarray, list[str]]:
+    """
+    Загружает id и тексты вопросов, отсортированные по id.
+
+    :param indexed_ids: Отсортированные id уже проиндексированных
+        вопросов: загружаются только остальные. У каждого шарда свой
+        диапазон id, поэтому новые вопросы ищутся разностью множеств,
+        а не по id больше последнего проиндексированного.
+    :return: id вопросов и их нормализованные тексты.
+    """
+    if indexed_ids is None:
+        rows = []
+        for alias in shard_aliases():
+            rows.extend(
+                Question.objects.using(alias)
+                .values_list('pk', 'text', 'options')
+                .iterator()
+            )
+    else:
+        new_ids = []
+        for alias in shard_aliases():
+            ids = np.fromiter(
+                Question.objects.using(alias).values_list('pk', flat=True).iterator(),
+                dtype=np.int64,
+            )
+            new_ids.extend(np.setdiff1d(ids, indexed_ids).tolist())
+        rows = list(fetch_rows(Question, new_ids, ('pk', 'text', 'options')))
+    rows.sort()
+    return (
+        np.array([row[0] for row in rows], dtype=np.int64),
+        [question_document(text, options) for _, text, options in rows],
+    )
+
+
+def build(
+    on_progress: Callable[[int, int], None] | None = None,
+) -> RelatedIndexResult:
+    """
+    Собирает индекс рекомендаций заново.
+
+    :param on_progress: Вызывается с (готово, всего) по блокам запросов.
+    :return: Итог сборки.
+    """
+    ids, documents = load_documents()
+    idf = idf_weights(document_frequencies(documents), len(documents))
+    vectors = vectorize(documents, idf)
+    neighbors, scores = _neighbors_with_progress(vectors, ids, on_progress)
+    _publish({
+        'ids': ids,
+        'vectors': vectors.astype(np.float16),
+        'idf': idf,
+        'neighbors': neighbors,
+        'scores': scores,
+    })
+    return RelatedIndexResult(questions=len(ids), added=len(ids))
+
+
+def update() -> RelatedIndexResult:
+    """
+    Добавляет в индекс вопросы, созданные после последней сборки.
+
+    Без собранного индекса выполняет полную сборку. Изменённые и
+    удалённые вопросы учитываются только полной сборкой.
+
+    :return: Итог обновления.
+    """
+    index = RelatedIndex.current()
+    if index is None:
+        return build()
+    old_ids = np.asarray(index.ids)
+    new_ids, documents = load_documents(indexed_ids=old_ids)
+    if not len(new_ids):
+        return RelatedIndexResult(questions=len(old_ids), added=0)
+
+    idf = np.asarray(index.idf)
+    old_vectors = np.asarray(index.vectors, dtype=np.float32)
+    new_vectors = vectorize(documents, idf)
+    ids = np.concatenate((old_ids, new_ids))
+    vectors = np.concatenate((old_vectors, new_vectors))
+    new_neighbors, new_scores = top_neighbors(
+        new_vectors, vectors, new_ids, ids, RELATED_MAX_K,
+    )
+    # Новые вопросы могут оказаться ближе прежних соседей старых.
+    candidates, candidate_scores = top_neighbors(
+        old_vectors, new_vectors, old_ids, new_ids, RELATED_MAX_K,
+    )
+    old_neighbors, old_scores = _merge(
+        np.asarray(index.neighbors),
+        np.asarray(index.scores),
+        candidates,
+        candidate_scores,
+        RELATED_MAX_K,
+    )
+    old_neighbors[~np.isfinite(old_scores)] = 0
+    # Поиск по индексу — бинарный поиск, поэтому строки сортируются по id.
+    order = np.argsort(ids, kind='stable')
+    _publish({
+        'ids': ids[order],
+        'vectors': vectors.astype(np.float16)[order],
+        'idf': idf,
+        'neighbors': np.concatenate((old_neighbors, new_neighbors))[order],
+        'scores': np.concatenate((old_scores, new_scores))[order],
+    })
+    return RelatedIndexResult(questions=len(ids), added=len(new_ids))
+
+
+def _neighbors_with_progress(
+    vectors: np.ndarray,
+    ids: np.ndarray,
+    on_progress: Callable[[int, int], None] | None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Ищет соседей всех вопросов, сообщая о прогрессе по блокам."""
+    neighbors = np.zeros((len(ids), RELATED_MAX_K), dtype=np.int64)
+    scores = np.zeros((len(ids), RELATED_MAX_K), dtype=np.float32)
+    step = QUERY_BLOCK * 8
+    for start in range(0, len(ids), step):
+        block = slice(start, start + step)
+        neighbors[block], scores[block] = top_neighbors(
+            vectors[block], vectors, ids[block], ids, RELATED_MAX_K,
+        )
+        if on_progress is not None:
+            on_progress(min(start + step, len(ids)), len(ids))
+    return neighbors, scores
+
+
+def _publish(arrays: dict[str, np.ndarray]) -> None:
+    """
+    Записывает новую версию индекса и переключает на неё манифест.
+
+    Предыдущая версия остаётся: процесс, который уже прочитал манифест,
+    но ещё не открыл массивы, должен их найти. Удаляются более старые
+    версии; уже отображённые в память файлы остаются доступны до
+    закрытия, unlink не трогает открытые отображения.
+    """
+    directory = index_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    previous = _manifest_version()
+    version = f'v{time.time_ns()}'
+    (directory / version).mkdir()
+    for name, array in arrays.items():
+        np.save(directory / version / f'{name}.npy', array)
+    temporary = directory / f'.{MANIFEST_NAME}.tmp'
+    temporary.write_text(json.dumps({'version': version}))
+    os.replace(temporary, directory / MANIFEST_NAME)
+    for path in directory.iterdir():
+        if path.is_dir() and path.name not in (version, previous):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _manifest_version() -> str | None:
+    """Возвращает версию из манифеста или None, если индекс не собран."""
+    try:
+        return json.loads((index_dir() / MANIFEST_NAME).read_text())['version']
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+class RelatedIndex:
+    """Собранный индекс, массивы которого отображены в память."""
+
+    _cached: tuple[str, 'RelatedIndex'] | None = None
+    _lock = threading.Lock()
+
+    def __init__(self, directory: Path):
+        for name in ARRAYS:
+            setattr(self, name, np.load(directory / f'{name}.npy', mmap_mode='r'))
+
+    @classmethod
+    def current(cls) -> 'RelatedIndex | None':
+        """
+        Возвращает текущую версию индекса.
+
+        :return: Индекс или None, если он ещё не собран.
+        """
+        version = _manifest_version()
+        if version is None:
+            return None
+        directory = index_dir() / version
+        with cls._lock:
+            if cls._cached is None or cls._cached[0] != str(directory):
+                cls._cached = (str(directory), cls(directory))
+            return cls._cached[1]
+
+    def related_ids(self, question_id: int, k: int) -> list[int] | None:
+        """
+        Возвращает id похожих вопросов.
+
+        :param question_id: Идентификатор вопроса.
+        :param k: Число рекомендаций (не больше RELATED_MAX_K).
+        :return: id соседей или None, если вопроса нет в индексе.
+        """
+        position = int(np.searchsorted(self.ids, question_id))
+        if position == len(self.ids) or self.ids[position] != question_id:
+            return None
+        return [int(pk) for pk in self.neighbors[position, :k] if pk]
+
+
+def related_question_ids(question_id: int, k: int) -> list[int]:
+    """
+    Возвращает id вопросов, похожих на данный.
+
+    :param question_id: Идентификатор вопроса.
+    :param k: Число рекомендаций.
+    :return: id соседей по убыванию сходства; пусто, если индекс не
+        собран или вопрос добавлен после последнего обновления индекса.
+    """
+    index = RelatedIndex.current()
+    if index is None:
+        return []
+    return index.related_ids(question_id, k) or []
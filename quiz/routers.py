@@ -0,0 +1,140 @@
+"""
+Роутеры баз данных: шарды квизов и реплики для чтения.
+
+Чтения моделей приложения quiz распределяются по QUIZ_READ_REPLICAS,
+записи идут в основную базу. После первой записи запрос до конца
+читает из основной базы (read-your-writes), а клиент получает cookie,
+по которой следующие QUIZ_REPLICA_PIN_SECONDS секунд тоже читает из
+основной базы, пока реплики не догонят.
+
+ShardRouter отправляет запросы связанных объектов в шард, из которого
+загружен исходный объект; явный выбор шарда делают сервисы (см.
+quiz.sharding).
+"""
+
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from quiz.sharding import QUIZ_APP_LABEL, REPLICATED_MODELS, SHARDED_MODELS
+
+# Модели, которые всегда читаются из основной базы.
+PRIMARY_ONLY_MODELS = frozenset({'job', 'changelog', 'duplicatecluster'})
+
+# Причина привязки к основной базе: запись в этом запросе или cookie.
+PIN_WRITE = 'write'
+PIN_STICKY = 'sticky'
+
+_pinned_to_primary: ContextVar[str] = ContextVar(
+    'quiz_pinned_to_primary',
+    default='',
+)
+
+
+def pin_to_primary(reason: str = PIN_WRITE) -> None:
+    """
+    Направляет все последующие чтения текущего контекста в основную базу.
+
+    :param reason: PIN_WRITE после записи или PIN_STICKY по cookie.
+    """
+    if _pinned_to_primary.get() != PIN_WRITE:
+        _pinned_to_primary.set(reason)
+
+
+def is_pinned_to_primary() -> bool:
+    """Возвращает True, если чтения текущего контекста идут в основную базу."""
+    return bool(_pinned_to_primary.get())
+
+
+def has_written() -> bool:
+    """Возвращает True, если в текущем контексте была запись."""
+    return _pinned_to_primary.get() == PIN_WRITE
+
+
+def reset_pinning() -> object:
+    """
+    Сбрасывает привязку к основной базе в начале запроса.
+
+    :return: Токен для восстановления предыдущего значения.
+    """
+    return _pinned_to_primary.set('')
+
+
+def restore_pinning(token: object) -> None:
+    """Восстанавливает привязку, действовавшую до запроса."""
+    _pinned_to_primary.reset(token)
+
+
+class ShardRouter:
+    """Роутер: объекты, загруженные из шарда, остаются в своём шарде."""
+
+    def db_for_read(self, model, **hints) -> str | None:
+        """Выбирает шард объекта, от которого строится запрос."""
+        return _instance_shard(hints)
+
+    def db_for_write(self, model, **hints) -> str | None:
+        """Сохраняет объект в шард, из которого он загружен."""
+        return _instance_shard(hints)
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool | None:
+        """Запрещает связи между объектами разных шардов."""
+        shards = settings.QUIZ_SHARDS
+        if obj1._state.db not in shards and obj2._state.db not in shards:
+            return None
+        replicated = {
+            obj._meta.model_name for obj in (obj1, obj2)
+        } & REPLICATED_MODELS
+        return bool(replicated) or obj1._state.db == obj2._state.db
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool | None:
+        """В шардах создаются только таблицы квизов, вопросов и категорий."""
+        if db not in settings.QUIZ_SHARDS:
+            return None
+        return app_label == QUIZ_APP_LABEL and (
+            model_name in SHARDED_MODELS or model_name in REPLICATED_MODELS
+        )
+
+
+def _instance_shard(hints: dict) -> str | None:
+    """Возвращает шард объекта из подсказки instance, если он есть."""
+    instance = hints.get('instance')
+    if instance is not None and instance._state.db in settings.QUIZ_SHARDS:
+        return instance._state.db
+    return None
+
+
+class ReadWriteRouter:
+    """Роутер: записи — в default, чтения quiz — в реплики."""
+
+    def db_for_read(self, model, **hints) -> str | None:
+        """Выбирает реплику для чтения моделей quiz."""
+        replicas = settings.QUIZ_READ_REPLICAS
+        if (
+            not replicas
+            or model._meta.app_label != QUIZ_APP_LABEL
+            or model._meta.model_name in PRIMARY_ONLY_MODELS
+            or is_pinned_to_primary()
+        ):
+            return None
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints) -> str:
+        """Отправляет запись в основную базу и закрепляет за ней чтения."""
+        if model._meta.app_label == QUIZ_APP_LABEL:
+            pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool | None:
+        """Разрешает связи между объектами из основной базы и реплик."""
+        databases = {DEFAULT_DB_ALIAS, *settings.QUIZ_READ_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool | None:
+        """Схема создаётся только в основной базе: реплики — её копии."""
+        if db in settings.QUIZ_READ_REPLICAS:
+            return False
+        return None
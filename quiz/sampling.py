@@ -0,0 +1,126 @@
+"""
+Выборка случайных вопросов без повторений.
+
+Пулы — отсортированные массивы id (например, вопросы квиза одной
+сложности). Выборка не объединяет пулы: случайные позиции берутся из
+range(общий размер) через random.sample, который для больших
+диапазонов работает за O(k), и переводятся в id бинарным поиском по
+границам пулов.
+
+Стратифицированная выборка делит число вопросов между слоями
+(сложностями) по долям методом наибольших остатков и выбирает вопросы
+каждого слоя из его пулов.
+"""
+
+import bisect
+import random
+from collections.abc import Sequence
+from itertools import accumulate
+from math import floor
+
+from quiz.models import Difficulty
+
+# Допуск при сравнении суммы долей сложностей с единицей.
+SHARE_TOLERANCE = 1e-9
+
+
+def sample_from_pools(
+    pools: Sequence[Sequence[int]],
+    k: int,
+    rng: random.Random | None = None,
+) -> list[int]:
+    """
+    Выбирает до k различных id из объединения пулов.
+
+    :param pools: Непересекающиеся последовательности id.
+    :param k: Сколько id выбрать.
+    :param rng: Генератор случайных чисел (по умолчанию модуль random).
+    :return: Выбранные id в случайном порядке; все id, если их не
+        больше k.
+    """
+    ends = list(accumulate(len(pool) for pool in pools))
+    total = ends[-1] if ends else 0
+    positions = (rng or random).sample(range(total), min(k, total))
+    result = []
+    for position in positions:
+        index = bisect.bisect_right(ends, position)
+        start = ends[index - 1] if index else 0
+        result.append(pools[index][position - start])
+    return result
+
+
+def allocate(count: int, weights: Sequence[float]) -> list[int]:
+    """
+    Делит count на целые части пропорционально весам.
+
+    Части округляются вниз, остаток раздаётся частям с наибольшей
+    дробной частью (при равенстве — первым).
+
+    :param count: Что делить.
+    :param weights: Неотрицательные веса, хотя бы один положительный.
+    :return: Части в порядке весов, в сумме count.
+    """
+    total = sum(weights)
+    exact = [count * weight / total for weight in weights]
+    parts = [floor(value) for value in exact]
+    by_remainder = sorted(
+        range(len(weights)),
+        key=lambda index: parts[index] - exact[index],
+    )
+    for index in by_remainder[:count - sum(parts)]:
+        parts[index] += 1
+    return parts
+
+
+def stratified_sample(
+    strata: Sequence[tuple[float, Sequence[Sequence[int]]]],
+    count: int,
+    rng: random.Random | None = None,
+) -> list[int]:
+    """
+    Выбирает count различных id, деля их между слоями по долям.
+
+    Если в слое меньше вопросов, чем ему причитается, берутся все его
+    вопросы: доли других слоёв не увеличиваются.
+
+    :param strata: Пары (доля слоя, пулы слоя); пулы всех слоёв не
+        пересекаются.
+    :param count: Сколько id выбрать.
+    :param rng: Генератор случайных чисел (по умолчанию модуль random).
+    :return: Выбранные id в случайном порядке.
+    """
+    rng = rng or random
+    quotas = allocate(count, [share for share, _ in strata])
+    result = []
+    for (_, pools), quota in zip(strata, quotas, strict=True):
+        result.extend(sample_from_pools(pools, quota, rng))
+    rng.shuffle(result)
+    return result
+
+
+def difficulty_strata(
+    shares: dict[str, float] | None = None,
+) -> list[tuple[float, tuple[str, ...]]]:
+    """
+    Делит сложности на слои по заданным долям.
+
+    Каждая сложность с долей — отдельный слой. Сложности без доли
+    образуют общий слой с оставшейся долей; если доли заданы для всех
+    сложностей, они считаются относительными весами.
+
+    :param shares: Сложность → доля (от 0 до 1, в сумме не больше 1).
+    :return: Пары (доля, сложности слоя) с положительной долей.
+    """
+    if not shares:
+        return [(1.0, tuple(Difficulty.values))]
+    strata = [
+        (share, (difficulty,))
+        for difficulty, share in sorted(shares.items())
+    ]
+    rest = tuple(
+        difficulty for difficulty in Difficulty.values if difficulty not in shares
+    )
+    remainder = 1.0 - sum(shares.values())
+    if rest and remainder > SHARE_TOLERANCE:
+        strata.append((remainder, rest))
+    return [stratum for stratum in strata if stratum[0] > 0]
@@ -0,0 +1,147 @@
+"""
+Модуль с предсобранной OpenAPI-схемой API.
+
+Схема генерируется один раз (при первом обращении или командой
+manage.py build_schema), хранится в памяти в виде готовых байтов и
+сохраняется в файл QUIZ_SCHEMA_PATH. Файл переиспользуется, пока не
+изменился код приложения: в схему записывается отпечаток исходников.
+"""
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+
+from django.conf import settings
+
+SCHEMA_TITLE = 'Quiz API'
+SCHEMA_VERSION = 'v1'
+SCHEMA_DESCRIPTION = 'Quiz and questions API'
+FINGERPRINT_KEY = 'x-code-fingerprint'
+SOURCE_PACKAGES = ('quiz', 'project')
+
+
+@dataclass(frozen=True)
+class SchemaArtifact:
+    """Готовая схема: JSON-байты, ETag и отпечаток кода."""
+
+    content: bytes
+    fingerprint: str
+
+    @cached_property
+    def etag(self) -> str:
+        """ETag, вычисленный по содержимому схемы."""
+        return hashlib.sha256(self.content).hexdigest()[:32]
+
+    @cached_property
+    def spec(self) -> dict:
+        """Схема в виде словаря."""
+        return json.loads(self.content)
+
+    @cached_property
+    def yaml_content(self) -> bytes:
+        """Схема в формате YAML (строится при первом запросе)."""
+        from drf_yasg.codecs import yaml_sane_dump
+
+        return yaml_sane_dump(self.spec, binary=True)
+
+
+_artifact: SchemaArtifact | None = None
+_lock = threading.Lock()
+
+
+def code_fingerprint() -> str:
+    """
+    Вычисляет отпечаток исходного кода, от которого зависит схема.
+
+    :return: Хэш содержимого .py-файлов приложения и версии drf_yasg.
+    """
+    from drf_yasg import __version__ as drf_yasg_version
+
+    digest = hashlib.sha256(drf_yasg_version.encode())
+    for package in SOURCE_PACKAGES:
+        root = Path(settings.BASE_DIR) / package
+        for path in sorted(root.rglob('*.py')):
+            digest.update(str(path.relative_to(settings.BASE_DIR)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def generate_schema(fingerprint: str) -> SchemaArtifact:
+    """
+    Генерирует схему, обходя все представления и сериализаторы.
+
+    :param fingerprint: Отпечаток кода, который записывается в схему.
+    :return: Новая схема.
+    """
+    from drf_yasg import openapi
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    generator = OpenAPISchemaGenerator(
+        info=openapi.Info(
+            title=SCHEMA_TITLE,
+            default_version=SCHEMA_VERSION,
+            description=SCHEMA_DESCRIPTION,
+        ),
+    )
+    swagger = generator.get_schema(request=None, public=True)
+    swagger[FINGERPRINT_KEY] = fingerprint
+    content = OpenAPICodecJson(validators=[]).encode(swagger)
+    return SchemaArtifact(content, fingerprint)
+
+
+def load_schema(path: Path, fingerprint: str) -> SchemaArtifact | None:
+    """
+    Загружает сохранённую схему, если она собрана из текущего кода.
+
+    :param path: Путь к файлу схемы.
+    :param fingerprint: Ожидаемый отпечаток кода.
+    :return: Схема или None, если файла нет или он устарел.
+    """
+    try:
+        content = path.read_bytes()
+        spec = json.loads(content)
+    except (OSError, ValueError):
+        return None
+    if spec.get(FINGERPRINT_KEY) != fingerprint:
+        return None
+    return SchemaArtifact(content, fingerprint)
+
+
+def build_schema(force: bool = False) -> SchemaArtifact:
+    """
+    Собирает схему и сохраняет её в файл и в память процесса.
+
+    :param force: Пересобрать схему, даже если файл актуален.
+    :return: Актуальная схема.
+    """
+    global _artifact
+
+    path = Path(settings.QUIZ_SCHEMA_PATH)
+    fingerprint = code_fingerprint()
+    artifact = None if force else load_schema(path, fingerprint)
+    if artifact is None:
+        artifact = generate_schema(fingerprint)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(artifact.content)
+        except OSError:
+            pass
+    _artifact = artifact
+    return artifact
+
+
+def get_schema() -> SchemaArtifact:
+    """
+    Возвращает схему из памяти процесса, собирая её при первом вызове.
+
+    :return: Актуальная схема.
+    """
+    if _artifact is None:
+        with _lock:
+            if _artifact is None:
+                build_schema()
+    return _artifact
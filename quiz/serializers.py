@@ -1,11 +1,71 @@
 """Сериализаторы для моделей приложения quiz."""
 
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import Http404
 from rest_framework import serializers
 
-from quiz.models import Category, Question, Quiz
+from quiz.answers import MatchPolicy
+from quiz.autocomplete import AUTOCOMPLETE_QUIZ, AUTOCOMPLETE_TYPES
+from quiz.constants import (
+    AUTOCOMPLETE_DEFAULT_LIMIT,
+    AUTOCOMPLETE_MAX_LIMIT,
+    MAX_AUTOCOMPLETE_QUERY_LENGTH,
+    MAX_BULK_CATEGORY_TITLES,
+    MAX_BULK_QUESTION_IDS,
+    MAX_CATEGORY_TITLE_LENGTH,
+    PRACTICE_SET_MAX_CATEGORIES,
+    PRACTICE_SET_MAX_COUNT,
+    RANDOM_QUESTIONS_DEFAULT_K,
+    RANDOM_QUESTIONS_MAX_K,
+    RELATED_DEFAULT_K,
+    RELATED_MAX_K,
+)
+from quiz.models import Category, Difficulty, Job, Question, Quiz
+from quiz.sampling import SHARE_TOLERANCE
+from quiz.sharding import is_sharded, shard_for_id
+from quiz.validators import validate_numeric_answers
 
+COUNT_EXACT = 'exact'
+COUNT_ESTIMATED = 'estimated'
+# Поля вложенного представления раскрытой связи.
+EXPANDED_FIELDS = ('id', 'title')
 
-class CategorySerializer(serializers.ModelSerializer):
+
+class ShardedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Поле связи, которое ищет шардированный объект в его шарде."""
+
+    def to_internal_value(self, data):
+        """Загружает связанный объект из шарда, определяемого его id."""
+        queryset = self.get_queryset()
+        if self.pk_field is not None or not is_sharded(queryset.model):
+            return super().to_internal_value(data)
+        try:
+            return queryset.using(shard_for_id(data)).get(pk=data)
+        except (ObjectDoesNotExist, Http404):
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    Базовый сериализатор, умеющий отдавать только часть полей.
+
+    Принимает необязательный аргумент fields со списком имён полей,
+    которые нужно оставить в ответе.
+    """
+
+    serializer_related_field = ShardedPrimaryKeyRelatedField
+
+    def __init__(self, *args, fields: tuple[str, ...] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class CategorySerializer(DynamicFieldsModelSerializer):
     """Сериализатор для модели Category."""
 
     class Meta:
@@ -13,17 +73,264 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class QuestionSerializer(serializers.ModelSerializer):
-    """Сериализатор для модели Question."""
+class CategoryBulkSerializer(serializers.Serializer):
+    """Сериализатор списка названий для массового создания категорий."""
 
-    class Meta:
-        model = Question
-        fields = '__all__'
+    titles = serializers.ListField(
+        child=serializers.CharField(max_length=MAX_CATEGORY_TITLE_LENGTH),
+        allow_empty=False,
+        max_length=MAX_BULK_CATEGORY_TITLES,
+    )
 
 
-class QuizSerializer(serializers.ModelSerializer):
+class QuizSerializer(DynamicFieldsModelSerializer):
     """Сериализатор для модели Quiz."""
 
     class Meta:
         model = Quiz
         fields = '__all__'
+
+
+class QuestionSerializer(DynamicFieldsModelSerializer):
+    """
+    Сериализатор для модели Question.
+
+    Принимает необязательный аргумент expand: связи из него выводятся
+    вложенными объектами с полями EXPANDED_FIELDS вместо id.
+    """
+
+    expandable_fields = {
+        'category': CategorySerializer,
+        'quiz': QuizSerializer,
+    }
+
+    class Meta:
+        model = Question
+        # Вычисляемые в Question.save() поля не отдаются: search_text
+        # нужен только для поиска в админке, accepted_answers и
+        # content_hash — для проверки ответов и поиска дубликатов.
+        exclude = ('search_text', 'accepted_answers', 'content_hash')
+        # Другие принимаемые ответы раскрывали бы ответ на вопрос.
+        extra_kwargs = {'answer_aliases': {'write_only': True}}
+
+    def __init__(self, *args, expand: tuple[str, ...] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in expand:
+            if name in self.fields:
+                self.fields[name] = self.expandable_fields[name](
+                    read_only=True,
+                    fields=EXPANDED_FIELDS,
+                )
+
+    def validate(self, attrs):
+        """
+        Проверяет, что при числовой политике ответы — числа.
+
+        Поля, которых нет в запросе, берутся из изменяемого вопроса,
+        поэтому частичное обновление тоже не пропустит нечисловой ответ.
+        """
+        attrs = super().validate(attrs)
+
+        def value(field: str, default: object) -> object:
+            """Возвращает новое значение поля или значение вопроса."""
+            return attrs.get(field, getattr(self.instance, field, default))
+
+        try:
+            validate_numeric_answers(
+                value('match_policy', MatchPolicy.EXACT),
+                value('correct_answer', ''),
+                value('answer_aliases', []),
+            )
+        except DjangoValidationError as error:
+            raise serializers.ValidationError(error.message_dict) from error
+        return attrs
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Сериализатор для модели Job."""
+
+    class Meta:
+        model = Job
+        fields = '__all__'
+
+
+class QuestionFilterSerializer(serializers.Serializer):
+    """Сериализатор параметров фильтрации списка вопросов."""
+
+    quiz = serializers.IntegerField(
+        source='quiz_id',
+        required=False,
+        min_value=1,
+    )
+    category = serializers.IntegerField(
+        source='category_id',
+        required=False,
+        min_value=1,
+    )
+    difficulty = serializers.ChoiceField(
+        choices=Difficulty.choices,
+        required=False,
+    )
+    count = serializers.ChoiceField(
+        choices=(COUNT_EXACT, COUNT_ESTIMATED),
+        required=False,
+    )
+
+
+class QuestionSelectionFilterSerializer(QuestionFilterSerializer):
+    """Сериализатор фильтров, выбирающих вопросы для массовой операции."""
+
+    count = None
+
+
+class QuestionBulkDeleteSerializer(serializers.Serializer):
+    """Сериализатор выбора вопросов: списком id или фильтрами."""
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=MAX_BULK_QUESTION_IDS,
+    )
+    filter = QuestionSelectionFilterSerializer(required=False)
+
+    def validate(self, attrs):
+        """Проверяет, что задан ровно один непустой способ выбора."""
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError(
+                'Pass either "ids" or "filter".'
+            )
+        if 'filter' in attrs and not attrs['filter']:
+            raise serializers.ValidationError(
+                {'filter': ['At least one filter is required.']}
+            )
+        return attrs
+
+
+class QuestionBulkValuesSerializer(serializers.Serializer):
+    """Сериализатор новых значений полей для массового изменения."""
+
+    difficulty = serializers.ChoiceField(
+        choices=Difficulty.choices,
+        required=False,
+    )
+    category = serializers.PrimaryKeyRelatedField(
+        queryset=Category.objects.all(),
+        required=False,
+        allow_null=True,
+    )
+
+    def validate(self, attrs):
+        """Проверяет, что изменяется хотя бы одно поле."""
+        if not attrs:
+            raise serializers.ValidationError('Nothing to update.')
+        return attrs
+
+
+class QuestionBulkUpdateSerializer(QuestionBulkDeleteSerializer):
+    """Сериализатор массового изменения вопросов."""
+
+    set = QuestionBulkValuesSerializer()
+
+
+class PublishSerializer(serializers.Serializer):
+    """Сериализатор параметров публикации снимков квизов."""
+
+    force = serializers.BooleanField(default=False)
+
+
+class AutocompleteQuerySerializer(serializers.Serializer):
+    """Сериализатор параметров запроса подсказок."""
+
+    q = serializers.CharField(max_length=MAX_AUTOCOMPLETE_QUERY_LENGTH)
+    type = serializers.ChoiceField(
+        choices=AUTOCOMPLETE_TYPES,
+        default=AUTOCOMPLETE_QUIZ,
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=AUTOCOMPLETE_MAX_LIMIT,
+        default=AUTOCOMPLETE_DEFAULT_LIMIT,
+    )
+
+
+class SuggestionSerializer(serializers.Serializer):
+    """Сериализатор подсказки."""
+
+    id = serializers.IntegerField()
+    text = serializers.CharField()
+
+
+class RelatedQuerySerializer(serializers.Serializer):
+    """Сериализатор параметров запроса похожих вопросов."""
+
+    k = serializers.IntegerField(
+        min_value=1,
+        max_value=RELATED_MAX_K,
+        default=RELATED_DEFAULT_K,
+    )
+
+
+class RandomQuestionsQuerySerializer(serializers.Serializer):
+    """Сериализатор параметров запроса случайных вопросов квиза."""
+
+    k = serializers.IntegerField(
+        min_value=1,
+        max_value=RANDOM_QUESTIONS_MAX_K,
+        default=RANDOM_QUESTIONS_DEFAULT_K,
+    )
+    difficulty = serializers.MultipleChoiceField(
+        choices=Difficulty.choices,
+        required=False,
+    )
+
+
+class PracticeSetSerializer(serializers.Serializer):
+    """
+    Сериализатор параметров набора вопросов для тренировки.
+
+    difficulty задаёт доли сложностей, например {"medium": 0.5,
+    "hard": 0.3}; сложности без доли делят остаток.
+    """
+
+    categories = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=PRACTICE_SET_MAX_CATEGORIES,
+    )
+    count = serializers.IntegerField(min_value=1, max_value=PRACTICE_SET_MAX_COUNT)
+    difficulty = serializers.DictField(
+        child=serializers.FloatField(min_value=0, max_value=1),
+        required=False,
+    )
+    seed = serializers.IntegerField(
+        required=False,
+        min_value=0,
+        max_value=2 ** 63 - 1,
+    )
+
+    def validate_difficulty(self, value):
+        """Проверяет сложности и сумму долей."""
+        unknown = set(value) - set(Difficulty.values)
+        if unknown:
+            raise serializers.ValidationError(
+                f'Unknown difficulties: {", ".join(sorted(unknown))}.'
+            )
+        total = sum(value.values())
+        if value and total <= 0:
+            raise serializers.ValidationError('At least one share must be positive.')
+        if total > 1 + SHARE_TOLERANCE:
+            raise serializers.ValidationError('Shares must not add up to more than 1.')
+        return value
+
+
+class LiveRoundSerializer(serializers.Serializer):
+    """Сериализатор параметров создания живого раунда."""
+
+    quiz = serializers.IntegerField(min_value=1)
+
+
+class LiveAdvanceSerializer(serializers.Serializer):
+    """Сериализатор переключения вопроса раунда."""
+
+    question = serializers.IntegerField(min_value=1, required=False)
@@ -0,0 +1,60 @@
+"""
+Модуль выбора реализации сервисов.
+
+Реализация задаётся настройкой QUIZ_SERVICE_BACKEND: 'db' — сервисы
+поверх ORM, 'memory' — сервисы поверх банка вопросов в памяти.
+"""
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from quiz.dao import (
+    AbstractCategoryService,
+    AbstractQuestionService,
+    AbstractQuizService,
+)
+
+SERVICE_BACKENDS = {
+    'db': {
+        'category': 'quiz.services.category.CategoryService',
+        'question': 'quiz.services.question.QuestionService',
+        'quiz': 'quiz.services.quiz.QuizService',
+    },
+    'memory': {
+        'category': 'quiz.services.memory.MemoryCategoryService',
+        'question': 'quiz.services.memory.MemoryQuestionService',
+        'quiz': 'quiz.services.memory.MemoryQuizService',
+    },
+}
+
+
+def _service_class(kind: str) -> type:
+    """
+    Возвращает класс сервиса выбранной реализации.
+
+    :param kind: 'category', 'question' или 'quiz'.
+    :return: Класс сервиса.
+    :raises ImproperlyConfigured: Если реализация неизвестна.
+    """
+    backend = SERVICE_BACKENDS.get(settings.QUIZ_SERVICE_BACKEND)
+    if backend is None:
+        raise ImproperlyConfigured(
+            f'Unknown QUIZ_SERVICE_BACKEND: {settings.QUIZ_SERVICE_BACKEND!r}'
+        )
+    return import_string(backend[kind])
+
+
+def get_category_service() -> AbstractCategoryService:
+    """Создаёт сервис категорий выбранной реализации."""
+    return _service_class('category')()
+
+
+def get_question_service() -> AbstractQuestionService:
+    """Создаёт сервис вопросов выбранной реализации."""
+    return _service_class('question')()
+
+
+def get_quiz_service() -> AbstractQuizService:
+    """Создаёт сервис квизов выбранной реализации."""
+    return _service_class('quiz')()
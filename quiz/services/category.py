@@ -1,41 +1,89 @@
 """Модуль с реализацией сервиса категорий"""
+from collections.abc import Callable
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
 from rest_framework.generics import get_object_or_404
 
-from quiz.dao import AbstractCategoryService
-from quiz.models import Category
-from quiz.utils import update_object
+from quiz.dao import AbstractCategoryService, Fields
+from quiz.metrics import ROWS_PROCESSED
+from quiz.models import Category, Question
+from quiz.sharding import delete_replicas, replicate, shard_aliases, write_alias
+from quiz.signals import log_changes, touch_quizzes
+from quiz.utils import nullify_in_chunks, only_fields, update_object
 
 
 class CategoryService(AbstractCategoryService):
     """Реализация сервиса для категорий"""
 
-    def list_categories(self) -> list[Category]:
+    def list_categories(self, fields: Fields = None) -> list[Category]:
         """
         Возвращает список всех категорий.
 
+        :param fields: Поля, которые нужно загрузить (None — все поля).
         :return: Список объектов Category.
         """
-        return list(Category.objects.all())
+        return list(only_fields(Category.objects.all(), fields))
 
-    def get_category(self, category_id: int) -> Category | None:
+    def get_category(self, category_id: int, fields: Fields = None) -> Category | None:
         """
         Возвращает категорию по идентификатору.
 
         :param category_id: Идентификатор категории.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
         :return: Объект Category или None, если категория не найдена.
         """
-        return get_object_or_404(Category, pk=category_id)
+        return get_object_or_404(
+            only_fields(Category.objects.all(), fields),
+            pk=category_id
+        )
 
     def create_category(self, title: str) -> Category:
         """
         Создаёт новую категорию.
 
+        Категория хранится в основной базе и копируется во все шарды.
+
         :param title: Название категории.
-        :return: Созданный объект Category.
+        :return: Созданный объект Category (или существующий с тем же
+            названием).
         """
-        category, _ = Category.objects.get_or_create(title=title)
+        [category] = self.get_or_create_categories([title])
         return category
 
+    def get_or_create_categories(self, titles: list[str]) -> list[Category]:
+        """
+        Находит или создаёт категории по названиям.
+
+        Существующие категории читаются из основной базы одним запросом,
+        недостающие вставляются командой INSERT ... ON CONFLICT DO
+        NOTHING и перечитываются: она не гоняется с параллельными
+        вставками и не перезаписывает существующие строки. Новые
+        категории копируются во все шарды.
+
+        :param titles: Названия категорий.
+        :return: Категории в порядке первых вхождений названий.
+        """
+        titles = list(dict.fromkeys(titles))
+        primary = Category.objects.using(DEFAULT_DB_ALIAS)
+        by_title = {
+            category.title: category
+            for category in primary.filter(title__in=titles)
+        }
+        missing = [title for title in titles if title not in by_title]
+        if missing:
+            primary.bulk_create(
+                [Category(title=title) for title in missing],
+                ignore_conflicts=True,
+            )
+            created = list(primary.filter(title__in=missing))
+            by_title.update((category.title, category) for category in created)
+            for alias in settings.QUIZ_SHARDS:
+                _replicate_new(alias, created)
+            log_changes(Category, (category.pk for category in created))
+        ROWS_PROCESSED.inc(len(missing), operation='category_bulk_upsert')
+        return [by_title[title] for title in titles]
+
     def update_category(self, category_id: int, data: dict) -> Category:
         """
         Обновляет существующую категорию.
@@ -44,12 +92,86 @@ class CategoryService(AbstractCategoryService):
         :param data: Словарь с полями для обновления.
         :return: Обновлённый объект Category или None, если категории нет.
         """
-        return update_object(Category, category_id, data)
+        category = update_object(Category, category_id, data)
+        replicate(category)
+        return category
 
-    def delete_category(self, category_id: int) -> None:
+    def delete_category(
+        self,
+        category_id: int,
+        on_chunk: Callable[[int], None] | None = None,
+    ) -> int:
         """
         Удаляет категорию по идентификатору.
 
+        Связь вопросов с категорией обнуляется порциями отдельными
+        командами UPDATE вместо одного долгого SET_NULL.
+
         :param category_id: Идентификатор категории.
+        :param on_chunk: Вызывается после каждой порции с числом обновлённых.
+        :return: Количество вопросов, отвязанных от категории.
         """
+        updated = 0
+        for alias in shard_aliases():
+            touch_quizzes(
+                Question.objects.using(alias)
+                .filter(category_id=category_id)
+                .values_list('quiz_id', flat=True)
+                .distinct(),
+                alias
+            )
+            updated += nullify_in_chunks(
+                Question,
+                'category_id',
+                category_id,
+                settings.QUIZ_DELETE_CHUNK_SIZE,
+                using=write_alias(alias),
+                on_chunk=on_chunk and (
+                    lambda done, before=updated: on_chunk(before + done)
+                )
+            )
+        delete_replicas(Category, category_id)
         Category.objects.filter(pk=category_id).delete()
+        return updated
+
+
+def _replicate_new(alias: str, categories: list[Category]) -> None:
+    """
+    Копирует новые категории в шард.
+
+    Строка шарда с тем же названием, но другим id осталась от прежней
+    категории: её вопросы переносятся на новую категорию, а сама строка
+    удаляется без сигналов — в основной базе этот id может принадлежать
+    другой категории.
+
+    :param alias: Алиас шарда.
+    :param categories: Категории из основной базы.
+    """
+    ids = {category.title: category.pk for category in categories}
+    shard = Category.objects.using(alias)
+    stale = dict(
+        shard.filter(title__in=ids)
+        .exclude(pk__in=ids.values())
+        .values_list('pk', 'title')
+    )
+    with transaction.atomic(using=alias):
+        for stale_id, title in stale.items():
+            Question.objects.using(alias).filter(category_id=stale_id).update(
+                category_id=ids[title],
+            )
+        if stale:
+            connection = connections[alias]
+            quote = connection.ops.quote_name
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {quote(Category._meta.db_table)} '
+                    f'WHERE {quote(Category._meta.pk.column)} IN '
+                    f'({", ".join(["%s"] * len(stale))})',
+                    list(stale),
+                )
+        shard.bulk_create(
+            [Category(pk=category.pk, title=category.title) for category in categories],
+            update_conflicts=True,
+            unique_fields=('id',),
+            update_fields=('title',),
+        )
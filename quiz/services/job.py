@@ -0,0 +1,30 @@
+"""Модуль с реализацией сервиса фоновых задач"""
+from django.shortcuts import get_object_or_404
+
+from quiz import jobs
+from quiz.models import Job
+
+
+class JobService:
+    """Сервис для просмотра и отмены фоновых задач"""
+
+    def get_job(self, job_id: int) -> Job:
+        """
+        Возвращает задачу по идентификатору.
+
+        :param job_id: Идентификатор задачи.
+        :return: Объект Job.
+        :raises Http404: Если задача не найдена.
+        """
+        return get_object_or_404(Job, pk=job_id)
+
+    def cancel_job(self, job_id: int) -> Job:
+        """
+        Запрашивает отмену задачи.
+
+        :param job_id: Идентификатор задачи.
+        :return: Обновлённый объект Job.
+        :raises Http404: Если задача не найдена.
+        """
+        self.get_job(job_id)
+        return jobs.cancel(job_id)
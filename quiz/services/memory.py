@@ -0,0 +1,298 @@
+"""
+Модуль с реализацией сервисов поверх банка вопросов в памяти.
+
+Чтения обслуживаются quiz.bank без запросов к таблицам квизов, вопросов
+и категорий. Записи выполняются сервисами БД, после чего банк сразу
+применяет изменения из журнала, так что процесс видит свои записи.
+Параметр fields на чтении не влияет: объекты собираются из памяти целиком.
+"""
+
+from collections.abc import Callable
+
+from django.http import Http404
+
+from quiz.bank import QuestionBank, get_bank
+from quiz.dao import (
+    AbstractCategoryService,
+    AbstractQuestionService,
+    AbstractQuizService,
+    Expand,
+    Fields,
+)
+from quiz.models import Category, Question, Quiz
+from quiz.services.category import CategoryService
+from quiz.services.question import QuestionService
+from quiz.services.quiz import QuizService
+
+
+class MemoryCategoryService(AbstractCategoryService):
+    """Сервис категорий, читающий из банка в памяти"""
+
+    def __init__(self, bank: QuestionBank | None = None):
+        self.bank = bank or get_bank()
+        self.db_service = CategoryService()
+
+    def list_categories(self, fields: Fields = None) -> list[Category]:
+        """Возвращает список всех категорий."""
+        return self.bank.categories()
+
+    def get_category(self, category_id: int, fields: Fields = None) -> Category:
+        """
+        Возвращает категорию по идентификатору.
+
+        :raises Http404: Если категория не найдена.
+        """
+        return _found(self.bank.category(category_id))
+
+    def create_category(self, title: str) -> Category:
+        """Создаёт категорию в БД."""
+        category = self.db_service.create_category(title)
+        self.bank.refresh(force=True)
+        return category
+
+    def get_or_create_categories(self, titles: list[str]) -> list[Category]:
+        """Находит или создаёт категории в БД."""
+        categories = self.db_service.get_or_create_categories(titles)
+        self.bank.refresh(force=True)
+        return categories
+
+    def update_category(self, category_id: int, data: dict) -> Category:
+        """Обновляет категорию в БД."""
+        category = self.db_service.update_category(category_id, data)
+        self.bank.refresh(force=True)
+        return category
+
+    def delete_category(
+        self,
+        category_id: int,
+        on_chunk: Callable[[int], None] | None = None,
+    ) -> int:
+        """Удаляет категорию из БД."""
+        updated = self.db_service.delete_category(category_id, on_chunk)
+        self.bank.refresh(force=True)
+        return updated
+
+
+class MemoryQuizService(AbstractQuizService):
+    """Сервис квизов, читающий из банка в памяти"""
+
+    def __init__(self, bank: QuestionBank | None = None):
+        self.bank = bank or get_bank()
+        self.db_service = QuizService()
+
+    def list_quizzes(self, fields: Fields = None) -> list[Quiz]:
+        """Возвращает список всех квизов."""
+        return self.bank.quizzes()
+
+    def get_quiz(self, quiz_id: int, fields: Fields = None) -> Quiz:
+        """
+        Возвращает квиз по идентификатору.
+
+        :raises Http404: Если квиз не найден.
+        """
+        return _found(self.bank.quiz(quiz_id))
+
+    def get_quizes_by_title(self, title: str, fields: Fields = None) -> list[Quiz]:
+        """Возвращает квизы, название которых содержит подстроку."""
+        return self.bank.quizzes(title)
+
+    def get_quizzes_by_title(self, title: str, fields: Fields = None) -> list[Quiz]:
+        """Alias для совместимости с view."""
+        return self.get_quizes_by_title(title, fields)
+
+    def create_quiz(self, data: dict) -> Quiz:
+        """Создаёт квиз в БД."""
+        quiz = self.db_service.create_quiz(data)
+        self.bank.refresh(force=True)
+        return quiz
+
+    def update_quiz(self, quiz_id: int, data: dict) -> Quiz:
+        """Обновляет квиз в БД."""
+        quiz = self.db_service.update_quiz(quiz_id, data)
+        self.bank.refresh(force=True)
+        return quiz
+
+    def delete_quiz(
+        self,
+        quiz_id: int,
+        on_chunk: Callable[[int], None] | None = None,
+    ) -> int:
+        """Удаляет квиз из БД."""
+        deleted = self.db_service.delete_quiz(quiz_id, on_chunk)
+        self.bank.refresh(force=True)
+        return deleted
+
+
+class MemoryQuestionService(AbstractQuestionService):
+    """Сервис вопросов, читающий из банка в памяти"""
+
+    def __init__(self, bank: QuestionBank | None = None):
+        self.bank = bank or get_bank()
+        self.db_service = QuestionService()
+
+    def list_questions(
+        self,
+        fields: Fields = None,
+        filters: dict | None = None,
+        expand: Expand = (),
+    ) -> list[Question]:
+        """Возвращает вопросы, подходящие под фильтры."""
+        return self.bank.attach_related(
+            self.bank.questions(**_bank_filters(filters)),
+            expand,
+        )
+
+    def count_questions(
+        self,
+        filters: dict | None = None,
+        estimated: bool = False,
+    ) -> int:
+        """Возвращает точное количество вопросов: оценка не нужна."""
+        return self.bank.count_questions(**_bank_filters(filters))
+
+    def get_question(
+        self,
+        question_id: int,
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> Question:
+        """
+        Возвращает вопрос по идентификатору.
+
+        :raises Http404: Если вопрос не найден.
+        """
+        question = _found(self.bank.question(question_id))
+        return self.bank.attach_related([question], expand)[0]
+
+    def get_questions_by_ids(
+        self,
+        question_ids: list[int],
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> list[Question]:
+        """Возвращает найденные вопросы в порядке question_ids."""
+        return self.bank.attach_related(
+            self.bank.questions_by_ids(question_ids),
+            expand,
+        )
+
+    def get_questions_by_text(
+        self,
+        text: str,
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> list[Question]:
+        """Возвращает вопросы, текст которых содержит подстроку."""
+        return self.bank.attach_related(self.bank.search_questions(text), expand)
+
+    def get_questions_for_quiz(self, quiz_id: int, fields: Fields = None) -> list[Question]:
+        """Возвращает все вопросы квиза."""
+        return self.bank.questions(quiz_id=quiz_id)
+
+    def create_question(self, quiz_id: int, data: dict) -> Question:
+        """Создаёт вопрос в БД."""
+        question = self.db_service.create_question(quiz_id, data)
+        self.bank.refresh(force=True)
+        return question
+
+    def update_question(self, question_id: int, data: dict) -> Question:
+        """Обновляет вопрос в БД."""
+        question = self.db_service.update_question(question_id, data)
+        self.bank.refresh(force=True)
+        return question
+
+    def delete_question(self, question_id: int) -> None:
+        """Удаляет вопрос из БД."""
+        self.db_service.delete_question(question_id)
+        self.bank.refresh(force=True)
+
+    def bulk_update_questions(
+        self,
+        values: dict,
+        question_ids: list[int] | None = None,
+        filters: dict | None = None,
+    ) -> int:
+        """Изменяет вопросы в БД."""
+        updated = self.db_service.bulk_update_questions(values, question_ids, filters)
+        self.bank.refresh(force=True)
+        return updated
+
+    def bulk_delete_questions(
+        self,
+        question_ids: list[int] | None = None,
+        filters: dict | None = None,
+    ) -> int:
+        """Удаляет вопросы из БД."""
+        deleted = self.db_service.bulk_delete_questions(question_ids, filters)
+        self.bank.refresh(force=True)
+        return deleted
+
+    def check_answer(self, question_id: int, answer: str) -> bool:
+        """
+        Проверяет ответ по принятым формам ответа из памяти.
+
+        :raises Http404: Если вопрос не найден.
+        """
+        return _found(self.bank.answer_key(question_id)).matches(answer)
+
+    def random_question_from_quiz(
+        self,
+        quiz_id: int,
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> Question:
+        """
+        Возвращает случайный вопрос квиза.
+
+        :raises ValueError: Если в квизе нет вопросов.
+        """
+        question = self.bank.random_question(quiz_id)
+        if question is None:
+            raise ValueError('No questions found')
+        return self.bank.attach_related([question], expand)[0]
+
+    def practice_set(
+        self,
+        category_ids: list[int],
+        count: int,
+        shares: dict[str, float] | None = None,
+        seed: int | None = None,
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> list[Question]:
+        """Собирает набор вопросов из категорий по долям сложностей."""
+        return self.bank.attach_related(
+            self.bank.practice_set(category_ids, count, shares, seed),
+            expand,
+        )
+
+    def random_questions_from_quiz(
+        self,
+        quiz_id: int,
+        k: int,
+        difficulties: tuple[str, ...] = (),
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> list[Question]:
+        """Возвращает до k различных случайных вопросов квиза."""
+        return self.bank.attach_related(
+            self.bank.random_questions(quiz_id, k, difficulties),
+            expand,
+        )
+
+
+def _bank_filters(filters: dict | None) -> dict:
+    """Переводит фильтры сервиса в аргументы банка."""
+    filters = filters or {}
+    return {
+        'quiz_id': filters.get('quiz_id'),
+        'category_id': filters.get('category_id'),
+        'difficulty': filters.get('difficulty'),
+    }
+
+
+def _found(value):
+    """Возвращает значение или выбрасывает Http404, если его нет."""
+    if value is None:
+        raise Http404
+    return value
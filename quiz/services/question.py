@@ -1,49 +1,228 @@
 """Модуль с реализацией сервиса вопросов"""
 
 import random
+from collections.abc import Callable, Iterable
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from quiz.dao import AbstractQuestionService
-from quiz.models import Question
-from quiz.utils import update_object
+from rest_framework.exceptions import ValidationError
+from quiz.constants import (
+    QUESTION_CATEGORY_DIFFICULTY_INDEX,
+    QUESTION_DIFFICULTY_INDEX,
+    QUESTION_QUIZ_DIFFICULTY_INDEX,
+)
+from quiz import sharedcache
+from quiz.answers import AnswerKey
+from quiz.dao import AbstractQuestionService, Expand, Fields
+from quiz.metrics import ROWS_PROCESSED
+from quiz.models import ChangeOperation, Question
+from quiz.sampling import (
+    difficulty_strata,
+    sample_from_pools,
+    stratified_sample,
+)
+from quiz.sharding import (
+    create_on_shard,
+    fan_out,
+    shard_aliases,
+    shard_for_id,
+    shards_for_quiz,
+    write_alias,
+)
+from quiz.signals import (
+    QuestionRow,
+    adjust_question_counts,
+    log_changes,
+    touch_quizzes,
+)
+from quiz.utils import estimate_count_from_stats, only_fields, update_object
+
+QUESTION_FILTERS = ('quiz_id', 'category_id', 'difficulty')
+# Колонки порции массовой операции: id и строка вопроса для счётчиков.
+BULK_ROW_FIELDS = ('pk', 'quiz_id', 'category_id', 'difficulty')
+
+# Какой индекс и префикс какой длины обслуживает набор фильтров.
+COUNT_ESTIMATE_INDEXES = {
+    frozenset(): (None, 0),
+    frozenset({'quiz_id'}): (QUESTION_QUIZ_DIFFICULTY_INDEX, 1),
+    frozenset({'quiz_id', 'difficulty'}): (QUESTION_QUIZ_DIFFICULTY_INDEX, 2),
+    frozenset({'category_id'}): (QUESTION_CATEGORY_DIFFICULTY_INDEX, 1),
+    frozenset({'category_id', 'difficulty'}): (
+        QUESTION_CATEGORY_DIFFICULTY_INDEX,
+        2,
+    ),
+    frozenset({'difficulty'}): (QUESTION_DIFFICULTY_INDEX, 1),
+}
 
 
 class QuestionService(AbstractQuestionService):
     """Реализация сервиса для вопросов"""
 
-    def list_questions(self) -> list[Question]:
+    def list_questions(
+        self,
+        fields: Fields = None,
+        filters: dict | None = None,
+        expand: Expand = (),
+    ) -> list[Question]:
         """
-        Возвращает список всех вопросов.
+        Возвращает список вопросов, подходящих под фильтры.
 
+        С фильтром по квизу запрос идёт в один шард, иначе — во все.
+
+        :param fields: Поля, которые нужно загрузить (None — все поля).
+        :param filters: Фильтры quiz_id, category_id, difficulty.
+        :param expand: Связи (category, quiz), которые нужно загрузить
+            вместе с вопросами.
         :return: Список объектов Question.
         """
-        return list(Question.objects.all())
+        return fan_out(
+            only_fields(self._filter_questions(filters), fields, expand),
+            shards_for_quiz((filters or {}).get('quiz_id')),
+        )
 
-    def get_question(self, question_id: int) -> Question | None:
+    def count_questions(
+        self,
+        filters: dict | None = None,
+        estimated: bool = False,
+    ) -> int:
+        """
+        Возвращает количество вопросов, подходящих под фильтры.
+
+        Приблизительная оценка берётся из статистики индекса и не
+        требует сканирования; если статистики нет, считается точно.
+
+        :param filters: Фильтры quiz_id, category_id, difficulty.
+        :param estimated: Разрешить приблизительную оценку по статистике БД.
+        :return: Количество вопросов.
+        """
+        queryset = self._filter_questions(filters)
+        index = None
+        if estimated:
+            used = frozenset(
+                key for key, value in (filters or {}).items()
+                if value is not None
+            )
+            index = COUNT_ESTIMATE_INDEXES.get(used)
+        total = 0
+        for alias in shards_for_quiz((filters or {}).get('quiz_id')):
+            estimate = None
+            if index is not None:
+                estimate = estimate_count_from_stats(
+                    Question,
+                    *index,
+                    using=write_alias(alias)
+                )
+            if estimate is None:
+                estimate = queryset.using(alias).count()
+            total += estimate
+        return total
+
+    @staticmethod
+    def _filter_questions(filters: dict | None) -> QuerySet:
+        """
+        Строит QuerySet вопросов с фильтрами по индексированным колонкам.
+
+        :param filters: Фильтры quiz_id, category_id, difficulty.
+        :return: Отфильтрованный QuerySet.
+        """
+        queryset = Question.objects.all()
+        if filters:
+            queryset = queryset.filter(**{
+                key: value for key, value in filters.items()
+                if key in QUESTION_FILTERS and value is not None
+            })
+        return queryset
+
+    def get_question(
+        self,
+        question_id: int,
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> Question | None:
         """
         Возвращает вопрос по идентификатору.
 
         :param question_id: Идентификатор вопроса.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
+        :param expand: Связи (category, quiz), которые нужно загрузить
+            вместе с вопросами.
         :return: Объект Question или None, если вопрос не найден.
         """
-        return get_object_or_404(Question, pk=question_id)
+        return get_object_or_404(
+            only_fields(
+                Question.objects.using(shard_for_id(question_id)),
+                fields,
+                expand,
+            ),
+            pk=question_id
+        )
+
+    def get_questions_by_ids(
+        self,
+        question_ids: list[int],
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> list[Question]:
+        """
+        Возвращает вопросы по списку идентификаторов.
+
+        В каждый шард уходит один запрос id__in.
+
+        :param question_ids: Идентификаторы вопросов.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
+        :param expand: Связи (category, quiz), которые нужно загрузить
+            вместе с вопросами.
+        :return: Найденные вопросы в порядке question_ids.
+        """
+        by_alias: dict[str | None, list[int]] = {}
+        for question_id in question_ids:
+            by_alias.setdefault(shard_for_id(question_id), []).append(question_id)
+        found = {
+            question.pk: question
+            for alias, ids in by_alias.items()
+            for question in only_fields(
+                Question.objects.using(alias).filter(pk__in=ids),
+                fields,
+                expand,
+            )
+        }
+        return [found[pk] for pk in question_ids if pk in found]
 
-    def get_questions_by_text(self, text: str) -> list[Question]:
+    def get_questions_by_text(
+        self,
+        text: str,
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> list[Question]:
         """
         Возвращает вопросы, текст которых содержит указанную подстроку.
 
         :param text: Текст для поиска.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
+        :param expand: Связи (category, quiz), которые нужно загрузить
+            вместе с вопросами.
         :return: Список подходящих вопросов.
         """
-        return list(Question.objects.filter(text__icontains=text))
+        return fan_out(only_fields(
+            Question.objects.filter(text__icontains=text),
+            fields,
+            expand,
+        ))
 
-    def get_questions_for_quiz(self, quiz_id: int) -> list[Question]:
+    def get_questions_for_quiz(self, quiz_id: int, fields: Fields = None) -> list[Question]:
         """
         Возвращает все вопросы, относящиеся к указанному квизу.
 
         :param quiz_id: Идентификатор квиза.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
         :return: Список вопросов квиза.
         """
-        return list(Question.objects.filter(quiz_id=quiz_id))
+        return fan_out(
+            only_fields(Question.objects.filter(quiz_id=quiz_id), fields),
+            shards_for_quiz(quiz_id),
+        )
 
     def create_question(self, quiz_id: int, data: dict) -> Question:
         """
@@ -52,9 +231,16 @@ class QuestionService(AbstractQuestionService):
         :param quiz_id: Идентификатор квиза.
         :param data: Словарь с полями вопроса (без поля quiz).
         :return: Созданный объект Question.
+        :raises ValidationError: Если в квизе уже есть вопрос с тем же
+            нормализованным текстом и вариантами ответов.
         """
+        alias = shard_for_id(quiz_id)
+        _check_duplicate(
+            Question(quiz_id=quiz_id, text=data['text'], options=data['options']),
+            alias,
+        )
         data['quiz_id'] = quiz_id
-        return Question.objects.create(**data)
+        return create_on_shard(Question, alias, **data)
 
     def update_question(self, question_id: int, data: dict) -> Question | None:
         """
@@ -63,8 +249,28 @@ class QuestionService(AbstractQuestionService):
         :param question_id: Идентификатор вопроса.
         :param data: Словарь с полями для обновления.
         :return: Обновлённый объект Question или None, если вопрос не найден.
+        :raises ValidationError: Если новый квиз находится в другом шарде
+            или в квизе уже есть вопрос с тем же содержимым.
         """
-        return update_object(Question, question_id, data)
+        alias = shard_for_id(question_id)
+        quiz = data.get('quiz')
+        if alias is not None and quiz is not None and shard_for_id(quiz.pk) != alias:
+            raise ValidationError(
+                {'quiz': ['Cannot move a question to a quiz on another shard.']}
+            )
+        if {'quiz', 'text', 'options'} & data.keys():
+            question = (
+                Question.objects.using(write_alias(alias))
+                .only('quiz_id', 'text', 'options')
+                .filter(pk=question_id)
+                .first()
+            )
+            if question is not None:
+                for field in ('quiz', 'text', 'options'):
+                    if field in data:
+                        setattr(question, field, data[field])
+                _check_duplicate(question, alias)
+        return update_object(Question, question_id, data, using=alias)
 
     def delete_question(self, question_id: int) -> None:
         """
@@ -72,7 +278,163 @@ class QuestionService(AbstractQuestionService):
 
         :param question_id: Идентификатор вопроса.
         """
-        Question.objects.filter(pk=question_id).delete()
+        alias = shard_for_id(question_id)
+        questions = Question.objects.using(alias).filter(pk=question_id)
+        with transaction.atomic(using=write_alias(alias)):
+            rows = list(
+                questions.values_list('quiz_id', 'category_id', 'difficulty')
+            )
+            questions.delete()
+            adjust_question_counts(removed=rows, using=alias)
+        log_changes(Question, (question_id,), ChangeOperation.DELETE)
+        touch_quizzes([quiz_id for quiz_id, _, _ in rows], alias)
+
+    def bulk_update_questions(
+        self,
+        values: dict,
+        question_ids: list[int] | None = None,
+        filters: dict | None = None,
+    ) -> int:
+        """
+        Изменяет поля многих вопросов командами UPDATE ... WHERE id IN.
+
+        :param values: Новые значения полей difficulty и category.
+        :param question_ids: Идентификаторы вопросов.
+        :param filters: Фильтры, если id не переданы.
+        :return: Количество изменённых вопросов.
+        """
+        category = values.get('category', ...)
+        category_id = getattr(category, 'pk', category)
+        difficulty = values.get('difficulty', ...)
+
+        def moved(row: QuestionRow) -> QuestionRow:
+            quiz_id, old_category_id, old_difficulty = row
+            return (
+                quiz_id,
+                old_category_id if category_id is ... else category_id,
+                old_difficulty if difficulty is ... else difficulty,
+            )
+
+        updated = self._apply_in_chunks(
+            lambda queryset: queryset.update(**values),
+            ChangeOperation.UPSERT,
+            question_ids,
+            filters,
+            moved,
+        )
+        ROWS_PROCESSED.inc(updated, operation='question_bulk_update')
+        return updated
+
+    def bulk_delete_questions(
+        self,
+        question_ids: list[int] | None = None,
+        filters: dict | None = None,
+    ) -> int:
+        """
+        Удаляет многие вопросы командами DELETE ... WHERE id IN.
+
+        :param question_ids: Идентификаторы вопросов.
+        :param filters: Фильтры, если id не переданы.
+        :return: Количество удалённых вопросов.
+        """
+        deleted = self._apply_in_chunks(
+            lambda queryset: queryset.delete()[0],
+            ChangeOperation.DELETE,
+            question_ids,
+            filters,
+        )
+        ROWS_PROCESSED.inc(deleted, operation='question_bulk_delete')
+        return deleted
+
+    def _apply_in_chunks(
+        self,
+        apply: Callable[[QuerySet], int],
+        operation: str,
+        question_ids: list[int] | None,
+        filters: dict | None,
+        moved: Callable[[QuestionRow], QuestionRow] | None = None,
+    ) -> int:
+        """
+        Выполняет команду над выбранными вопросами порциями.
+
+        Каждая порция — одна короткая транзакция: выборка вопросов,
+        команда над ними, сдвиг счётчиков квизов и категорий и запись в
+        журнал изменений. Квизы каждого шарда отмечаются изменёнными
+        один раз в конце.
+
+        :param apply: Выполняет команду над QuerySet порции и возвращает
+            число затронутых строк.
+        :param operation: Операция для журнала изменений.
+        :param question_ids: Идентификаторы вопросов.
+        :param filters: Фильтры, если id не переданы.
+        :param moved: Возвращает строку вопроса после команды; None —
+            команда удаляет вопросы.
+        :return: Суммарное число затронутых строк.
+        """
+        affected = 0
+        touched: dict[str | None, set[int]] = {}
+        for alias, rows in self._bulk_chunks(question_ids, filters):
+            ids = [row[0] for row in rows]
+            removed = [row[1:] for row in rows]
+            added = [moved(row) for row in removed] if moved is not None else ()
+            with transaction.atomic(using=write_alias(alias)):
+                affected += apply(
+                    Question.objects.using(write_alias(alias)).filter(pk__in=ids)
+                )
+                adjust_question_counts(removed, added, alias)
+                log_changes(Question, ids, operation)
+            touched.setdefault(alias, set()).update(row[1] for row in rows)
+        for alias, quiz_ids in touched.items():
+            touch_quizzes(quiz_ids, alias)
+        return affected
+
+    def _bulk_chunks(
+        self,
+        question_ids: list[int] | None,
+        filters: dict | None,
+    ) -> Iterable[tuple[str | None, list[tuple]]]:
+        """
+        Делит выбранные вопросы на порции по шардам.
+
+        Порции по фильтрам выбираются по возрастанию id от конца
+        предыдущей, поэтому изменение отфильтрованной колонки не
+        приводит к повторной обработке строк.
+
+        :return: Пары (шард, строки с колонками BULK_ROW_FIELDS).
+        """
+        chunk_size = settings.QUIZ_DELETE_CHUNK_SIZE
+        if question_ids is not None:
+            by_alias: dict[str | None, list[int]] = {}
+            for question_id in dict.fromkeys(question_ids):
+                try:
+                    alias = shard_for_id(question_id)
+                except Http404:
+                    # Вне диапазонов шардов вопросов нет.
+                    continue
+                by_alias.setdefault(alias, []).append(question_id)
+            for alias, ids in by_alias.items():
+                for start in range(0, len(ids), chunk_size):
+                    rows = list(
+                        Question.objects.using(write_alias(alias))
+                        .filter(pk__in=ids[start:start + chunk_size])
+                        .values_list(*BULK_ROW_FIELDS)
+                    )
+                    if rows:
+                        yield alias, rows
+            return
+        queryset = self._filter_questions(filters).order_by('pk')
+        for alias in shards_for_quiz((filters or {}).get('quiz_id')):
+            last_id = 0
+            while True:
+                rows = list(
+                    queryset.using(write_alias(alias))
+                    .filter(pk__gt=last_id)
+                    .values_list(*BULK_ROW_FIELDS)[:chunk_size]
+                )
+                if not rows:
+                    break
+                yield alias, rows
+                last_id = rows[-1][0]
 
     def check_answer(self, question_id: int, answer: str) -> bool:
         """
@@ -80,20 +442,155 @@ class QuestionService(AbstractQuestionService):
 
         :param question_id: Идентификатор вопроса.
         :param answer: Ответ пользователя.
-        :return: True, если ответ совпадает с правильным, иначе False.
+        :return: True, если ответ принимается политикой вопроса, иначе False.
         """
-        question = get_object_or_404(Question, pk=question_id)
-        return question.correct_answer.strip() == answer.strip()
+        return sharedcache.answer_key(
+            question_id,
+            lambda: AnswerKey.from_values(*get_object_or_404(
+                Question.objects.using(shard_for_id(question_id)).values_list(
+                    'match_policy',
+                    'accepted_answers',
+                    'answer_tolerance',
+                ),
+                pk=question_id
+            )),
+        ).matches(answer)
 
-    def random_question_from_quiz(self, quiz_id: int) -> Question:
+    def random_question_from_quiz(
+        self,
+        quiz_id: int,
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> Question:
         """
         Возвращает случайный вопрос из указанного квиза.
 
+        Выбирается случайный id из списка id вопросов квиза (он
+        кэшируется в общем кэше), затем загружается один вопрос.
+
         :param quiz_id: Идентификатор квиза.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
+        :param expand: Связи (category, quiz), которые нужно загрузить
+            вместе с вопросами.
         :return: Случайный объект Question.
         :raises ValueError: Если в квизе нет вопросов.
         """
-        questions = self.get_questions_for_quiz(quiz_id)
-        if not questions:
+        question_ids = sharedcache.quiz_question_ids(
+            quiz_id,
+            lambda: Question.objects.using(shard_for_id(quiz_id)).filter(
+                quiz_id=quiz_id
+            ).values_list('pk', flat=True),
+        )
+        if not question_ids:
             raise ValueError('No questions found')
-        return random.choice(questions)
+        return self.get_question(random.choice(question_ids), fields, expand)
+
+    def practice_set(
+        self,
+        category_ids: list[int],
+        count: int,
+        shares: dict[str, float] | None = None,
+        seed: int | None = None,
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> list[Question]:
+        """
+        Собирает набор вопросов из категорий по долям сложностей.
+
+        Пулы id по (категория, сложность) берутся из общего кэша;
+        недостающие загружаются одним запросом в каждый шард. Выбранные
+        вопросы загружаются одним запросом id__in в каждый шард.
+
+        :param category_ids: Идентификаторы категорий.
+        :param count: Сколько вопросов выбрать.
+        :param shares: Сложность → доля вопросов.
+        :param seed: Зерно генератора.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
+        :param expand: Связи (category, quiz), которые нужно загрузить
+            вместе с вопросами.
+        :return: Вопросы в случайном порядке.
+        """
+        pools = sharedcache.category_questions_by_difficulty(
+            category_ids,
+            lambda missing: [
+                row
+                for alias in shard_aliases()
+                for row in Question.objects.using(alias)
+                .filter(category_id__in=missing)
+                .values_list('category_id', 'difficulty', 'pk')
+            ],
+        )
+        strata = [
+            (share, [
+                pools[category_id][difficulty]
+                for category_id in sorted(pools)
+                for difficulty in difficulties
+            ])
+            for share, difficulties in difficulty_strata(shares)
+        ]
+        return self.get_questions_by_ids(
+            stratified_sample(strata, count, random.Random(seed)),
+            fields,
+            expand,
+        )
+
+    def random_questions_from_quiz(
+        self,
+        quiz_id: int,
+        k: int,
+        difficulties: tuple[str, ...] = (),
+        fields: Fields = None,
+        expand: Expand = (),
+    ) -> list[Question]:
+        """
+        Возвращает до k различных случайных вопросов квиза.
+
+        id выбираются без повторений из закэшированных массивов id
+        вопросов квиза (по сложностям, если они заданы), затем вопросы
+        загружаются одним запросом id__in.
+
+        :param quiz_id: Идентификатор квиза.
+        :param k: Сколько вопросов выбрать.
+        :param difficulties: Допустимые сложности (пусто — любые).
+        :param fields: Поля, которые нужно загрузить (None — все поля).
+        :param expand: Связи (category, quiz), которые нужно загрузить
+            вместе с вопросами.
+        :return: Вопросы в случайном порядке.
+        """
+        questions = Question.objects.using(shard_for_id(quiz_id)).filter(
+            quiz_id=quiz_id
+        )
+        if difficulties:
+            by_difficulty = sharedcache.quiz_questions_by_difficulty(
+                quiz_id,
+                lambda: questions.values_list('difficulty', 'pk'),
+            )
+            pools = [
+                by_difficulty[difficulty]
+                for difficulty in dict.fromkeys(difficulties)
+            ]
+        else:
+            pools = [sharedcache.quiz_question_ids(
+                quiz_id,
+                lambda: questions.values_list('pk', flat=True),
+            )]
+        return self.get_questions_by_ids(
+            sample_from_pools(pools, k),
+            fields,
+            expand,
+        )
+
+
+def _check_duplicate(question: Question, alias: str | None) -> None:
+    """
+    Проверяет, что в квизе вопроса нет другого с тем же содержимым.
+
+    :param question: Новый или изменённый (ещё не сохранённый) вопрос.
+    :param alias: Шард вопроса; проверка читает из базы для записи.
+    :raises ValidationError: Если дубликат найден.
+    """
+    duplicate_id = question.find_duplicate(write_alias(alias))
+    if duplicate_id is not None:
+        raise ValidationError({'non_field_errors': [
+            f'Duplicate of question {duplicate_id} in this quiz.'
+        ]})
@@ -1,42 +1,73 @@
 """Модуль с реализацией сервиса квизов"""
+from collections.abc import Callable
+
+from django.conf import settings
 from django.shortcuts import get_object_or_404
-from quiz.dao import AbstractQuizService
-from quiz.models import Quiz
-from quiz.utils import update_object
+from quiz import sharedcache
+from quiz.dao import AbstractQuizService, Fields
+from quiz.models import Question, Quiz
+from quiz.sharding import (
+    create_on_shard,
+    ensure_unique,
+    fan_out,
+    shard_for_id,
+    shard_for_new_quiz,
+    write_alias,
+)
+from quiz.signals import release_quiz_questions
+from quiz.utils import delete_in_chunks, only_fields, update_object
 
 
 class QuizService(AbstractQuizService):
     """Реализация сервиса для квиза"""
 
-    def list_quizzes(self) -> list[Quiz]:
+    def list_quizzes(self, fields: Fields = None) -> list[Quiz]:
         """
-        Возвращает список всех квизов.
+        Возвращает список всех квизов (из всех шардов).
 
+        :param fields: Поля, которые нужно загрузить (None — все поля).
         :return: Список объектов Quiz.
         """
-        return list(Quiz.objects.all())
+        return fan_out(only_fields(Quiz.objects.all(), fields))
 
-    def get_quiz(self, quiz_id: int) -> Quiz | None:
+    def get_quiz(self, quiz_id: int, fields: Fields = None) -> Quiz | None:
         """
         Возвращает квиз по идентификатору.
 
         :param quiz_id: Идентификатор квиза.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
         :return: Объект Quiz или None, если квиз не найден.
+            Из общего кэша квиз возвращается со всеми полями.
         """
-        return get_object_or_404(Quiz, pk=quiz_id)
+        if settings.QUIZ_SHARED_CACHE_PATH:
+            return sharedcache.quiz_row(
+                quiz_id,
+                lambda: get_object_or_404(
+                    Quiz.objects.using(shard_for_id(quiz_id)),
+                    pk=quiz_id
+                ),
+            )
+        return get_object_or_404(
+            only_fields(Quiz.objects.using(shard_for_id(quiz_id)), fields),
+            pk=quiz_id
+        )
 
-    def get_quizes_by_title(self, title: str) -> list[Quiz]:
+    def get_quizes_by_title(self, title: str, fields: Fields = None) -> list[Quiz]:
         """
         Возвращает квизы, название которых содержит указанную подстроку.
 
         :param title: Подстрока для поиска.
+        :param fields: Поля, которые нужно загрузить (None — все поля).
         :return: Список подходящих квизов.
         """
-        return list(Quiz.objects.filter(title__icontains=title))
+        return fan_out(only_fields(
+            Quiz.objects.filter(title__icontains=title),
+            fields
+        ))
 
-    def get_quizzes_by_title(self, title: str) -> list[Quiz]:
+    def get_quizzes_by_title(self, title: str, fields: Fields = None) -> list[Quiz]:
         """Alias для совместимости с view."""
-        return self.get_quizes_by_title(title)
+        return self.get_quizes_by_title(title, fields)
 
     def create_quiz(self, data: dict) -> Quiz:
         """
@@ -45,7 +76,10 @@ class QuizService(AbstractQuizService):
         :param data: Словарь с данными квиза.
         :return: Созданный объект Quiz.
         """
-        return Quiz.objects.create(**data)
+        alias = shard_for_new_quiz(data['title'])
+        if alias is not None:
+            ensure_unique(Quiz, 'title', data['title'])
+        return create_on_shard(Quiz, alias, **data)
 
     def update_quiz(self, quiz_id: int, data: dict) -> Quiz | None:
         """
@@ -55,12 +89,37 @@ class QuizService(AbstractQuizService):
         :param data: Словарь с полями для обновления.
         :return: Обновлённый объект Quiz или None, если квиз не найден.
         """
-        return update_object(Quiz, quiz_id, data)
+        alias = shard_for_id(quiz_id)
+        if alias is not None and 'title' in data:
+            ensure_unique(Quiz, 'title', data['title'], exclude_pk=quiz_id)
+        return update_object(Quiz, quiz_id, data, using=alias)
 
-    def delete_quiz(self, quiz_id: int) -> None:
+    def delete_quiz(
+        self,
+        quiz_id: int,
+        on_chunk: Callable[[int], None] | None = None,
+    ) -> int:
         """
         Удаляет квиз по идентификатору.
 
+        Вопросы квиза удаляются порциями отдельными командами DELETE,
+        чтобы не загружать их в память и не держать долгую транзакцию.
+        Счётчики категорий уменьшаются заранее одной командой на группу;
+        если удаление прервётся, их восстановит manage.py recount.
+
         :param quiz_id: Идентификатор квиза.
+        :param on_chunk: Вызывается после каждой порции с числом удалённых.
+        :return: Количество удалённых вопросов.
         """
-        Quiz.objects.filter(pk=quiz_id).delete()
+        alias = shard_for_id(quiz_id)
+        release_quiz_questions(quiz_id, write_alias(alias))
+        deleted = delete_in_chunks(
+            Question,
+            'quiz_id',
+            quiz_id,
+            settings.QUIZ_DELETE_CHUNK_SIZE,
+            using=write_alias(alias),
+            on_chunk=on_chunk
+        )
+        Quiz.objects.using(alias).filter(pk=quiz_id).delete()
+        return deleted
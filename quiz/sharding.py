@@ -0,0 +1,206 @@
+"""
+Модуль шардирования квизов.
+
+Если задан QUIZ_SHARDS, квизы и их вопросы хранятся в нескольких базах.
+Каждому шарду принадлежит свой диапазон идентификаторов размером
+QUIZ_SHARD_ID_SPAN, поэтому шард объекта определяется по его id без
+обращения к базе. Новый квиз попадает в шард по хэшу названия: так
+уникальность названия проверяет сама база этого шарда. Категории
+хранятся в основной базе и копируются во все шарды, чтобы внешние
+ключи вопросов оставались целостными.
+
+Без QUIZ_SHARDS все функции модуля возвращают поведение одной базы.
+"""
+
+import heapq
+import zlib
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, models
+from django.db.models import QuerySet
+from django.http import Http404
+from rest_framework.exceptions import ValidationError
+
+QUIZ_APP_LABEL = 'quiz'
+# Модели, строки которых распределяются по шардам.
+SHARDED_MODELS = frozenset({'quiz', 'question'})
+# Модели, которые копируются во все шарды.
+REPLICATED_MODELS = frozenset({'category'})
+
+
+def is_sharded(model: type[models.Model]) -> bool:
+    """Возвращает True, если строки модели распределяются по шардам."""
+    return bool(settings.QUIZ_SHARDS) and (
+        model._meta.app_label == QUIZ_APP_LABEL
+        and model._meta.model_name in SHARDED_MODELS
+    )
+
+
+def shard_aliases() -> tuple[str | None, ...]:
+    """
+    Возвращает алиасы всех шардов.
+
+    :return: Алиасы шардов или (None,), если шардирование выключено:
+        None оставляет выбор базы роутерам.
+    """
+    return tuple(settings.QUIZ_SHARDS) or (None,)
+
+
+def shard_for_id(object_id: int) -> str | None:
+    """
+    Определяет шард квиза или вопроса по идентификатору.
+
+    :param object_id: Идентификатор квиза или вопроса.
+    :return: Алиас шарда или None, если шардирование выключено.
+    :raises Http404: Если id не попадает ни в один шард.
+    """
+    shards = settings.QUIZ_SHARDS
+    if not shards:
+        return None
+    index = (int(object_id) - 1) // settings.QUIZ_SHARD_ID_SPAN
+    if not 0 <= index < len(shards):
+        raise Http404
+    return shards[index]
+
+
+def shards_for_quiz(quiz_id: int | None) -> tuple[str | None, ...]:
+    """
+    Возвращает шарды, в которых нужно искать вопросы.
+
+    :param quiz_id: Идентификатор квиза или None для поиска везде.
+    :return: Алиасы шардов.
+    """
+    if quiz_id is None:
+        return shard_aliases()
+    return (shard_for_id(quiz_id),)
+
+
+def shard_for_new_quiz(title: str) -> str | None:
+    """
+    Выбирает шард для нового квиза по хэшу названия.
+
+    :param title: Название квиза.
+    :return: Алиас шарда или None, если шардирование выключено.
+    """
+    shards = settings.QUIZ_SHARDS
+    if not shards:
+        return None
+    return shards[zlib.crc32(title.encode()) % len(shards)]
+
+
+def write_alias(alias: str | None) -> str:
+    """Возвращает базу для прямых SQL-команд: шард или основную базу."""
+    return alias or DEFAULT_DB_ALIAS
+
+
+def create_on_shard(
+    model: type[models.Model],
+    alias: str | None,
+    **fields,
+) -> models.Model:
+    """
+    Создаёт объект в шарде с идентификатором из диапазона шарда.
+
+    Первой строке модели в шарде id назначается явно, дальше
+    автоинкремент базы продолжает нумерацию внутри диапазона.
+
+    :param model: Класс модели.
+    :param alias: Алиас шарда или None, если шардирование выключено.
+    :param fields: Значения полей объекта.
+    :return: Созданный объект.
+    """
+    manager = model._default_manager.db_manager(alias)
+    if alias is None:
+        return manager.create(**fields)
+    if not manager.exists():
+        index = settings.QUIZ_SHARDS.index(alias)
+        fields.setdefault('pk', index * settings.QUIZ_SHARD_ID_SPAN + 1)
+    return manager.create(**fields)
+
+
+def fan_out(
+    queryset: QuerySet,
+    aliases: tuple[str | None, ...] | None = None,
+) -> list:
+    """
+    Выполняет запрос во всех шардах и сливает отсортированные результаты.
+
+    Каждый шард возвращает строки в порядке сортировки модели, поэтому
+    результаты сливаются без общей пересортировки.
+
+    :param queryset: Запрос без привязки к базе.
+    :param aliases: Шарды для запроса (по умолчанию все).
+    :return: Объединённый список объектов.
+    """
+    aliases = aliases or shard_aliases()
+    if len(aliases) == 1:
+        return list(queryset.using(aliases[0]))
+
+    ordering = tuple(
+        name for name in (queryset.query.order_by or queryset.model._meta.ordering)
+        if not name.startswith('-')
+    ) or ('pk',)
+    loaded, deferred = queryset.query.deferred_loading
+    if loaded and not deferred:
+        queryset = queryset.only(*loaded, *ordering)
+    return list(heapq.merge(
+        *(queryset.using(alias) for alias in aliases),
+        key=attrgetter(*ordering),
+    ))
+
+
+def ensure_unique(
+    model: type[models.Model],
+    field_name: str,
+    value: object,
+    exclude_pk: int | None = None,
+) -> None:
+    """
+    Проверяет уникальность значения поля во всех шардах.
+
+    :param model: Шардированная модель.
+    :param field_name: Имя уникального поля.
+    :param value: Проверяемое значение.
+    :param exclude_pk: Идентификатор обновляемого объекта.
+    :raises ValidationError: Если значение уже занято.
+    """
+    queryset = model._default_manager.filter(**{field_name: value})
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    if any(queryset.using(alias).exists() for alias in shard_aliases()):
+        field = model._meta.get_field(field_name)
+        raise ValidationError({field_name: [
+            f'{model._meta.verbose_name} with this {field.verbose_name} '
+            'already exists.'
+        ]})
+
+
+def replicate(instance: models.Model) -> None:
+    """
+    Копирует объект из основной базы во все шарды.
+
+    :param instance: Сохранённый объект реплицируемой модели.
+    """
+    model = type(instance)
+    values = {
+        field.attname: getattr(instance, field.attname)
+        for field in model._meta.concrete_fields
+        if not field.primary_key
+    }
+    for alias in settings.QUIZ_SHARDS:
+        model._default_manager.using(alias).update_or_create(
+            pk=instance.pk,
+            defaults=values,
+        )
+
+
+def delete_replicas(model: type[models.Model], object_id: int) -> None:
+    """
+    Удаляет копии объекта из всех шардов.
+
+    :param model: Реплицируемая модель.
+    :param object_id: Идентификатор объекта.
+    """
+    for alias in settings.QUIZ_SHARDS:
+        model._default_manager.using(alias).filter(pk=object_id).delete()
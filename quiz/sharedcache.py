@@ -0,0 +1,511 @@
+"""
+Общий для всех процессов кэш в разделяемой памяти.
+
+Кэш — файл QUIZ_SHARED_CACHE_PATH, отображённый в память (mmap) каждым
+воркером. Раскладка фиксированная: заголовок, хэш-таблица слотов с
+открытой адресацией и область данных, в которую значения дописываются
+подряд. В кэше лежат правильные ответы, массивы id вопросов квизов
+(всех и по сложностям), id вопросов категорий по сложностям и строки
+квизов.
+
+Чтение не берёт блокировок: каждый слот защищён счётчиком seq (seqlock),
+нечётный seq означает, что слот сейчас пишется. Читатель копирует слот и
+данные и проверяет, что seq и эпоха кэша не изменились; иначе повторяет.
+Писатель в каждый момент один: запись и сброс идут под flock.
+
+Счётчик поколений в заголовке увеличивается при каждом сбросе записей.
+Значение, загруженное из БД, попадает в кэш, только если за время
+загрузки поколение не изменилось, поэтому данные, прочитанные до
+параллельного изменения, не перезапишут сброс. Эпоха увеличивается при
+полной очистке: слоты старой эпохи считаются пустыми, а область данных
+начинается заново.
+"""
+
+import fcntl
+import json
+import mmap
+import os
+import struct
+import threading
+from array import array
+from collections.abc import Callable, Iterable
+from datetime import datetime
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from quiz.answers import AnswerKey
+from quiz.metrics import CACHE_REQUESTS
+from quiz.models import Difficulty, Quiz
+from quiz.sharding import shard_for_id
+
+MAGIC = b'QUIZSHM1'
+# magic, число слотов, размер области данных, поколение, эпоха, занято.
+HEADER = struct.Struct('<8sQQQQQ')
+HEADER_SIZE = 64
+GENERATION_OFFSET = 24
+EPOCH_OFFSET = 32
+# seq, ключ, эпоха, смещение данных, длина данных, состояние.
+SLOT = struct.Struct('<QQQQII')
+SEQ = struct.Struct('<Q')
+EMPTY, USED, DELETED = 0, 1, 2
+MAX_PROBES = 32
+READ_RETRIES = 8
+
+# Виды значений: часть ключа слота.
+ANSWER_KEY = 1
+QUIZ_QUESTIONS = 2
+QUIZ_ROW = 3
+QUIZ_DIFFICULTY_QUESTIONS = 4
+CATEGORY_DIFFICULTY_QUESTIONS = 5
+# Имена видов значений в метриках.
+KIND_NAMES = {
+    ANSWER_KEY: 'answer_key',
+    QUIZ_QUESTIONS: 'quiz_questions',
+    QUIZ_ROW: 'quiz_row',
+    QUIZ_DIFFICULTY_QUESTIONS: 'quiz_difficulty_questions',
+    CATEGORY_DIFFICULTY_QUESTIONS: 'category_difficulty_questions',
+}
+KIND_SHIFT = 56
+
+QUIZ_FIELDS = tuple(field.attname for field in Quiz._meta.concrete_fields)
+
+
+class SharedCache:
+    """Хэш-таблица фиксированной раскладки в файле, отображённом в память."""
+
+    def __init__(self, path: str, slots: int, arena_size: int):
+        if slots & (slots - 1):
+            raise ValueError('Number of slots must be a power of two')
+        self.path = str(path)
+        self.lock_path = f'{self.path}.lock'
+        self.slots = slots
+        self.arena_size = arena_size
+        self.arena_offset = HEADER_SIZE + slots * SLOT.size
+        self._bits = slots.bit_length() - 1
+        with self._writing():
+            self._mm = self._open()
+
+    def _open(self) -> mmap.mmap:
+        """Отображает файл кэша, создавая или пересоздавая его при смене раскладки."""
+        size = self.arena_offset + self.arena_size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            header = os.pread(fd, HEADER.size, 0)
+            expected = (MAGIC, self.slots, self.arena_size)
+            if os.fstat(fd).st_size != size or (
+                len(header) < HEADER.size
+                or HEADER.unpack(header)[:3] != expected
+            ):
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+                os.pwrite(fd, HEADER.pack(*expected, 1, 1, 0), 0)
+            return mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    def _writing(self) -> '_WriterLock':
+        """Возвращает межпроцессную блокировку писателя."""
+        return _WriterLock(self.lock_path)
+
+    def generation(self) -> int:
+        """Возвращает текущее поколение кэша."""
+        return SEQ.unpack_from(self._mm, GENERATION_OFFSET)[0]
+
+    def get(self, kind: int, object_id: int) -> bytes | None:
+        """
+        Читает значение без блокировок.
+
+        :param kind: Вид значения (ANSWER_KEY, QUIZ_QUESTIONS, QUIZ_ROW,
+            QUIZ_DIFFICULTY_QUESTIONS, CATEGORY_DIFFICULTY_QUESTIONS).
+        :param object_id: Идентификатор объекта.
+        :return: Байты значения или None, если значения нет.
+        """
+        key = _key(kind, object_id)
+        for _ in range(READ_RETRIES):
+            epoch = SEQ.unpack_from(self._mm, EPOCH_OFFSET)[0]
+            found = self._read(key, epoch)
+            if found is not False:
+                return found
+        return None
+
+    def _read(self, key: int, epoch: int) -> bytes | bool | None:
+        """Проходит цепочку слотов; False — чтение пересеклось с записью."""
+        for position in self._probe(key):
+            seq, slot_key, slot_epoch, offset, length, state = SLOT.unpack_from(
+                self._mm,
+                position,
+            )
+            if seq & 1:
+                return False
+            if slot_epoch != epoch or state == EMPTY:
+                value = None
+            elif state == USED and slot_key == key:
+                start = self.arena_offset + offset
+                value = bytes(self._mm[start:start + length])
+            else:
+                continue
+            if (
+                SEQ.unpack_from(self._mm, position)[0] != seq
+                or SEQ.unpack_from(self._mm, EPOCH_OFFSET)[0] != epoch
+            ):
+                return False
+            return value
+        return None
+
+    def put(self, kind: int, object_id: int, value: bytes, generation: int) -> bool:
+        """
+        Записывает значение, если кэш не сбрасывался после его загрузки.
+
+        :param kind: Вид значения.
+        :param object_id: Идентификатор объекта.
+        :param value: Байты значения.
+        :param generation: Поколение, прочитанное до загрузки значения.
+        :return: True, если значение записано.
+        """
+        if len(value) > self.arena_size:
+            return False
+        key = _key(kind, object_id)
+        with self._writing():
+            _, _, _, current, epoch, used = HEADER.unpack_from(self._mm, 0)
+            if current != generation:
+                return False
+            if used + len(value) > self.arena_size:
+                epoch, used = self._reset(current)
+            position = self._find_slot(key, epoch)
+            if position is None:
+                epoch, used = self._reset(current)
+                position = self._find_slot(key, epoch)
+            start = self.arena_offset + used
+            self._mm[start:start + len(value)] = value
+            self._write_slot(position, key, epoch, used, len(value), USED)
+            self._set_header(current, epoch, used + len(value))
+            return True
+
+    def invalidate(self, keys: Iterable[tuple[int, int]]) -> None:
+        """
+        Удаляет значения и увеличивает поколение.
+
+        :param keys: Пары (вид значения, идентификатор объекта).
+        """
+        with self._writing():
+            _, _, _, generation, epoch, used = HEADER.unpack_from(self._mm, 0)
+            for kind, object_id in keys:
+                key = _key(kind, object_id)
+                for position in self._probe(key):
+                    _, slot_key, slot_epoch, _, _, state = SLOT.unpack_from(
+                        self._mm,
+                        position,
+                    )
+                    if slot_epoch != epoch or state == EMPTY:
+                        break
+                    if state == USED and slot_key == key:
+                        self._write_slot(position, 0, epoch, 0, 0, DELETED)
+                        break
+            self._set_header(generation + 1, epoch, used)
+
+    def clear(self) -> None:
+        """Удаляет все значения."""
+        with self._writing():
+            generation = HEADER.unpack_from(self._mm, 0)[3]
+            self._reset(generation + 1)
+
+    def _reset(self, generation: int) -> tuple[int, int]:
+        """Начинает новую эпоху: все слоты становятся пустыми."""
+        epoch = HEADER.unpack_from(self._mm, 0)[4] + 1
+        self._set_header(generation, epoch, 0)
+        return epoch, 0
+
+    def _find_slot(self, key: int, epoch: int) -> int | None:
+        """Находит слот ключа или первый свободный слот цепочки."""
+        free = None
+        for position in self._probe(key):
+            _, slot_key, slot_epoch, _, _, state = SLOT.unpack_from(
+                self._mm,
+                position,
+            )
+            if slot_epoch != epoch or state == EMPTY:
+                return position if free is None else free
+            if state == USED and slot_key == key:
+                return position
+            if state == DELETED and free is None:
+                free = position
+        return free
+
+    def _write_slot(
+        self,
+        position: int,
+        key: int,
+        epoch: int,
+        offset: int,
+        length: int,
+        state: int,
+    ) -> None:
+        """Перезаписывает слот, держа seq нечётным на время записи."""
+        seq = SEQ.unpack_from(self._mm, position)[0]
+        SEQ.pack_into(self._mm, position, seq + 1)
+        SLOT.pack_into(self._mm, position, seq + 1, key, epoch, offset, length, state)
+        SEQ.pack_into(self._mm, position, seq + 2)
+
+    def _set_header(self, generation: int, epoch: int, used: int) -> None:
+        """Записывает изменяемые поля заголовка."""
+        HEADER.pack_into(
+            self._mm,
+            0,
+            MAGIC,
+            self.slots,
+            self.arena_size,
+            generation,
+            epoch,
+            used,
+        )
+
+    def _probe(self, key: int) -> Iterable[int]:
+        """Возвращает смещения слотов цепочки линейного пробирования."""
+        start = ((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> (64 - self._bits)
+        for step in range(min(MAX_PROBES, self.slots)):
+            index = (start + step) & (self.slots - 1)
+            yield HEADER_SIZE + index * SLOT.size
+
+
+class _WriterLock:
+    """Эксклюзивный flock на файл блокировки кэша."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __enter__(self) -> None:
+        # Файл открывается заново: описатель, унаследованный после fork,
+        # делил бы блокировку с родителем.
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc_info) -> None:
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+
+
+def _key(kind: int, object_id: int) -> int:
+    """Упаковывает вид значения и id объекта в ключ слота."""
+    return (kind << KIND_SHIFT) | object_id
+
+
+_caches: dict[str, SharedCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_shared_cache() -> SharedCache | None:
+    """
+    Возвращает кэш процесса.
+
+    :return: Кэш или None, если QUIZ_SHARED_CACHE_PATH не задан.
+    """
+    path = settings.QUIZ_SHARED_CACHE_PATH
+    if not path:
+        return None
+    path = str(path)
+    cache = _caches.get(path)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(path)
+            if cache is None:
+                cache = _caches[path] = SharedCache(
+                    path,
+                    settings.QUIZ_SHARED_CACHE_SLOTS,
+                    settings.QUIZ_SHARED_CACHE_ARENA_SIZE,
+                )
+    return cache
+
+
+def get_or_load(kind: int, object_id: int, load: Callable[[], bytes]) -> bytes:
+    """
+    Возвращает значение из кэша или загружает и кэширует его.
+
+    :param kind: Вид значения.
+    :param object_id: Идентификатор объекта.
+    :param load: Загружает значение из БД.
+    :return: Байты значения.
+    """
+    cache = get_shared_cache()
+    if cache is None:
+        return load()
+    value = cache.get(kind, object_id)
+    CACHE_REQUESTS.inc(
+        cache=KIND_NAMES[kind],
+        result='miss' if value is None else 'hit',
+    )
+    if value is None:
+        generation = cache.generation()
+        value = load()
+        cache.put(kind, object_id, value, generation)
+    return value
+
+
+def get_many_or_load(
+    kind: int,
+    object_ids: Iterable[int],
+    load: Callable[[list[int]], dict[int, bytes]],
+) -> dict[int, bytes]:
+    """
+    Возвращает значения многих объектов, загружая недостающие разом.
+
+    :param kind: Вид значения.
+    :param object_ids: Идентификаторы объектов.
+    :param load: Загружает значения объектов по списку id.
+    :return: id объекта → байты значения.
+    """
+    object_ids = list(dict.fromkeys(object_ids))
+    cache = get_shared_cache()
+    if cache is None:
+        return load(object_ids)
+    values = {}
+    for object_id in object_ids:
+        value = cache.get(kind, object_id)
+        if value is not None:
+            values[object_id] = value
+    missing = [object_id for object_id in object_ids if object_id not in values]
+    CACHE_REQUESTS.inc(len(values), cache=KIND_NAMES[kind], result='hit')
+    CACHE_REQUESTS.inc(len(missing), cache=KIND_NAMES[kind], result='miss')
+    if missing:
+        generation = cache.generation()
+        loaded = load(missing)
+        for object_id, value in loaded.items():
+            cache.put(kind, object_id, value, generation)
+        values.update(loaded)
+    return values
+
+
+def answer_key(question_id: int, load: Callable[[], AnswerKey]) -> AnswerKey:
+    """Возвращает принятые формы ответа на вопрос."""
+    return AnswerKey.from_values(*json.loads(get_or_load(
+        ANSWER_KEY,
+        question_id,
+        lambda: json.dumps(load().to_list()).encode(),
+    )))
+
+
+def quiz_question_ids(quiz_id: int, load: Callable[[], Iterable[int]]) -> array:
+    """Возвращает отсортированный массив id вопросов квиза."""
+    ids = array('q')
+    ids.frombytes(get_or_load(
+        QUIZ_QUESTIONS,
+        quiz_id,
+        lambda: array('q', sorted(load())).tobytes(),
+    ))
+    return ids
+
+
+def quiz_questions_by_difficulty(
+    quiz_id: int,
+    load: Callable[[], Iterable[tuple[str, int]]],
+) -> dict[str, array]:
+    """
+    Возвращает отсортированные массивы id вопросов квиза по сложностям.
+
+    Значение хранится одним массивом: размеры групп в порядке
+    Difficulty, затем id групп подряд.
+
+    :param quiz_id: Идентификатор квиза.
+    :param load: Загружает пары (сложность, id вопроса).
+    :return: Сложность → массив id.
+    """
+    return _load_difficulty_ids(get_or_load(
+        QUIZ_DIFFICULTY_QUESTIONS,
+        quiz_id,
+        lambda: _dump_difficulty_ids(load()),
+    ))
+
+
+def category_questions_by_difficulty(
+    category_ids: Iterable[int],
+    load: Callable[[list[int]], Iterable[tuple[int, str, int]]],
+) -> dict[int, dict[str, array]]:
+    """
+    Возвращает отсортированные массивы id вопросов категорий по сложностям.
+
+    Значения хранятся так же, как в quiz_questions_by_difficulty;
+    недостающие загружаются одним вызовом load.
+
+    :param category_ids: Идентификаторы категорий.
+    :param load: Загружает тройки (id категории, сложность, id вопроса)
+        для списка категорий.
+    :return: id категории → сложность → массив id.
+    """
+    def load_many(missing: list[int]) -> dict[int, bytes]:
+        rows = {category_id: [] for category_id in missing}
+        for category_id, difficulty, question_id in load(missing):
+            rows[category_id].append((difficulty, question_id))
+        return {
+            category_id: _dump_difficulty_ids(category_rows)
+            for category_id, category_rows in rows.items()
+        }
+
+    return {
+        category_id: _load_difficulty_ids(value)
+        for category_id, value in get_many_or_load(
+            CATEGORY_DIFFICULTY_QUESTIONS,
+            category_ids,
+            load_many,
+        ).items()
+    }
+
+
+def _load_difficulty_ids(value: bytes) -> dict[str, array]:
+    """Распаковывает массив размеров и id по сложностям."""
+    values = array('q')
+    values.frombytes(value)
+    result = {}
+    start = len(Difficulty)
+    for difficulty, size in zip(Difficulty.values, values[:start], strict=True):
+        result[difficulty] = values[start:start + size]
+        start += size
+    return result
+
+
+def _dump_difficulty_ids(rows: Iterable[tuple[str, int]]) -> bytes:
+    """Упаковывает пары (сложность, id) в массив размеров и id."""
+    groups = {difficulty: [] for difficulty in Difficulty.values}
+    for difficulty, question_id in rows:
+        groups[difficulty].append(question_id)
+    values = array('q', (len(ids) for ids in groups.values()))
+    for ids in groups.values():
+        values.extend(sorted(ids))
+    return values.tobytes()
+
+
+def quiz_row(quiz_id: int, load: Callable[[], Quiz]) -> Quiz:
+    """Возвращает квиз со всеми полями."""
+    values = json.loads(get_or_load(
+        QUIZ_ROW,
+        quiz_id,
+        lambda: _dump_quiz(load()),
+    ))
+    values[QUIZ_FIELDS.index('updated_at')] = datetime.fromisoformat(
+        values[QUIZ_FIELDS.index('updated_at')]
+    )
+    return Quiz.from_db(
+        shard_for_id(quiz_id) or DEFAULT_DB_ALIAS,
+        QUIZ_FIELDS,
+        values,
+    )
+
+
+def _dump_quiz(quiz: Quiz) -> bytes:
+    """Сериализует колонки квиза в JSON."""
+    values = [getattr(quiz, name) for name in QUIZ_FIELDS]
+    values[QUIZ_FIELDS.index('updated_at')] = quiz.updated_at.isoformat()
+    return json.dumps(values, ensure_ascii=False).encode()
+
+
+def invalidate(keys: Iterable[tuple[int, int]]) -> None:
+    """Сбрасывает значения, если кэш включён."""
+    cache = get_shared_cache()
+    if cache is not None:
+        cache.invalidate(keys)
+
+
+def clear() -> None:
+    """Очищает кэш, если он включён."""
+    cache = get_shared_cache()
+    if cache is not None:
+        cache.clear()
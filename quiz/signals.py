@@ -0,0 +1,281 @@
+"""
+Обработчики сигналов моделей приложения quiz.
+
+Любое изменение вопроса обновляет Quiz.updated_at, по которому
+публикация снимков находит изменившиеся квизы. При QUIZ_CHANGE_LOG
+изменения квизов, вопросов и категорий записываются в ChangeLog, из
+которого обновляется банк вопросов в памяти (quiz.bank), а при
+QUIZ_SHARED_CACHE_PATH сбрасываются записи общего кэша (quiz.sharedcache).
+Сохранение вопроса также сдвигает счётчики вопросов (QuestionCounts)
+его квиза и категории. Удаления вопросов и массовые операции проходят
+мимо сигналов, поэтому вызывают touch_quizzes, log_changes и
+adjust_question_counts явно.
+"""
+
+from collections import Counter
+from collections.abc import Iterable
+from functools import partial
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from quiz import sharedcache
+from quiz.models import (
+    DIFFICULTY_COUNT_FIELDS,
+    Category,
+    ChangeLog,
+    ChangeOperation,
+    Question,
+    Quiz,
+)
+
+# Строка вопроса для счётчиков: (quiz_id, category_id, difficulty).
+QuestionRow = tuple[int, int | None, str]
+# Поля вопроса, от которых зависят счётчики: (имя, атрибут).
+COUNTED_FIELDS = (
+    ('quiz', 'quiz_id'),
+    ('category', 'category_id'),
+    ('difficulty', 'difficulty'),
+)
+# Изменения счётчиков: (модель, id) → сложность → приращение.
+CountDeltas = dict[tuple[type[models.Model], int], Counter]
+
+
+def invalidate_shared_cache(
+    model: type[models.Model],
+    object_ids: list[int],
+    operation: str = ChangeOperation.UPSERT,
+) -> None:
+    """
+    Сбрасывает записи общего кэша, зависящие от изменённых объектов.
+
+    Сброс повторяется после фиксации транзакции: иначе другой процесс
+    мог бы успеть закэшировать строки, прочитанные до фиксации.
+
+    :param model: Класс изменённой модели.
+    :param object_ids: Идентификаторы изменённых объектов.
+    :param operation: ChangeOperation.UPSERT или ChangeOperation.DELETE.
+    """
+    if not settings.QUIZ_SHARED_CACHE_PATH:
+        return
+    if model is Quiz and operation == ChangeOperation.DELETE:
+        # Каскад удалил вопросы квиза, их id здесь неизвестны.
+        invalidate = sharedcache.clear
+    elif model is Quiz:
+        invalidate = partial(sharedcache.invalidate, [
+            (kind, quiz_id)
+            for quiz_id in object_ids
+            for kind in (
+                sharedcache.QUIZ_ROW,
+                sharedcache.QUIZ_QUESTIONS,
+                sharedcache.QUIZ_DIFFICULTY_QUESTIONS,
+            )
+        ])
+    elif model is Question:
+        invalidate = partial(sharedcache.invalidate, [
+            (sharedcache.ANSWER_KEY, question_id) for question_id in object_ids
+        ])
+    elif model is Category:
+        # Состав категории меняется вместе с её счётчиками, которые
+        # записывают категорию в журнал (apply_count_deltas).
+        invalidate = partial(sharedcache.invalidate, [
+            (sharedcache.CATEGORY_DIFFICULTY_QUESTIONS, category_id)
+            for category_id in object_ids
+        ])
+    else:
+        return
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def log_changes(
+    model: type[models.Model],
+    object_ids: Iterable[int],
+    operation: str = ChangeOperation.UPSERT,
+) -> None:
+    """
+    Записывает изменения объектов в журнал, если он включён.
+
+    Заодно сбрасывает зависящие от объектов записи общего кэша.
+
+    :param model: Класс изменённой модели.
+    :param object_ids: Идентификаторы изменённых объектов.
+    :param operation: ChangeOperation.UPSERT или ChangeOperation.DELETE.
+    """
+    object_ids = list(object_ids)
+    invalidate_shared_cache(model, object_ids, operation)
+    if not settings.QUIZ_CHANGE_LOG:
+        return
+    ChangeLog.objects.bulk_create(
+        ChangeLog(
+            model_name=model._meta.model_name,
+            object_id=object_id,
+            operation=operation,
+        )
+        for object_id in object_ids
+    )
+
+
+def touch_quizzes(quiz_ids: Iterable[int], using: str | None = None) -> None:
+    """
+    Отмечает квизы как изменённые.
+
+    :param quiz_ids: Идентификаторы квизов или подзапрос, их выбирающий.
+    :param using: Алиас базы (шарда), в которой лежат квизы.
+    """
+    if settings.QUIZ_CHANGE_LOG or settings.QUIZ_SHARED_CACHE_PATH:
+        quiz_ids = set(quiz_ids)
+        log_changes(Quiz, quiz_ids)
+    Quiz.objects.using(using).filter(pk__in=quiz_ids).update(
+        updated_at=timezone.now()
+    )
+
+
+def adjust_question_counts(
+    removed: Iterable[QuestionRow] = (),
+    added: Iterable[QuestionRow] = (),
+    using: str | None = None,
+) -> None:
+    """
+    Сдвигает счётчики квизов и категорий на удалённые и добавленные вопросы.
+
+    :param removed: Строки вопросов, которые удалены или были до изменения.
+    :param added: Строки созданных вопросов или вопросов после изменения.
+    :param using: Алиас базы (шарда) квизов.
+    """
+    deltas: CountDeltas = {}
+    for sign, rows in ((-1, removed), (1, added)):
+        for quiz_id, category_id, difficulty in rows:
+            for model, object_id in ((Quiz, quiz_id), (Category, category_id)):
+                if object_id is not None:
+                    deltas.setdefault((model, object_id), Counter())[difficulty] += sign
+    apply_count_deltas(deltas, using)
+
+
+def apply_count_deltas(deltas: CountDeltas, using: str | None = None) -> None:
+    """
+    Применяет изменения счётчиков командами UPDATE ... SET n = n + d.
+
+    Объекты одной модели с одинаковыми изменениями обновляются одной
+    командой. Изменённые категории записываются в журнал изменений;
+    квизы отмечает touch_quizzes вызывающего кода.
+
+    :param deltas: Изменения счётчиков.
+    :param using: Алиас базы (шарда) квизов.
+    """
+    groups: dict[tuple[type[models.Model], tuple], list[int]] = {}
+    for (model, object_id), counter in deltas.items():
+        changes = tuple(sorted(
+            (difficulty, delta) for difficulty, delta in counter.items() if delta
+        ))
+        if changes:
+            groups.setdefault((model, changes), []).append(object_id)
+    changed_categories = []
+    for (model, changes), object_ids in groups.items():
+        values = {
+            DIFFICULTY_COUNT_FIELDS[difficulty]: (
+                F(DIFFICULTY_COUNT_FIELDS[difficulty]) + delta
+            )
+            for difficulty, delta in changes
+        }
+        total = sum(delta for _, delta in changes)
+        if total:
+            values['question_count'] = F('question_count') + total
+        manager = Quiz.objects.using(using) if model is Quiz else Category.objects
+        manager.filter(pk__in=object_ids).update(**values)
+        if model is Category:
+            changed_categories.extend(object_ids)
+    if changed_categories:
+        log_changes(Category, changed_categories)
+
+
+def release_quiz_questions(quiz_id: int, using: str | None = None) -> None:
+    """
+    Вычитает вопросы квиза из счётчиков их категорий.
+
+    Вызывается перед удалением квиза вместе с вопросами: счётчики самого
+    квиза уже не нужны.
+
+    :param quiz_id: Идентификатор квиза.
+    :param using: Алиас базы (шарда) квиза.
+    """
+    deltas: CountDeltas = {}
+    for category_id, difficulty, count in (
+        Question.objects.using(using)
+        .filter(quiz_id=quiz_id, category_id__isnull=False)
+        .values_list('category_id', 'difficulty')
+        .annotate(count=Count('pk'))
+        .order_by()
+    ):
+        deltas.setdefault((Category, category_id), Counter())[difficulty] -= count
+    apply_count_deltas(deltas, using)
+
+
+def saved_rows(
+    question: Question,
+    update_fields: Iterable[str] | None = None,
+) -> tuple[QuestionRow, QuestionRow]:
+    """
+    Возвращает строки вопроса для счётчиков до и после сохранения.
+
+    Исходные значения берутся из загруженных из БД и заменяются
+    сохранёнными, чтобы повторное сохранение объекта сравнивалось с
+    этим.
+
+    :param question: Сохранённый вопрос.
+    :param update_fields: Сохранённые поля; None — все поля.
+    :return: Пара строк (quiz_id, category_id, difficulty).
+    """
+    loaded = getattr(question, '_loaded_values', {})
+    previous = []
+    current = []
+    for name, attname in COUNTED_FIELDS:
+        value = getattr(question, attname)
+        saved = update_fields is None or {name, attname} & set(update_fields)
+        previous.append(loaded.get(attname, value))
+        current.append(value if saved else previous[-1])
+        if saved and attname in loaded:
+            loaded[attname] = value
+    return tuple(previous), tuple(current)
+
+
+@receiver(post_save, sender=Question)
+def question_saved(
+    sender,
+    instance: Question,
+    created: bool,
+    using: str,
+    **kwargs,
+) -> None:
+    """Сдвигает счётчики и отмечает квизы сохранённого вопроса изменёнными."""
+    previous, current = saved_rows(instance, kwargs.get('update_fields'))
+    if created:
+        adjust_question_counts(added=(current,), using=using)
+    elif previous != current:
+        adjust_question_counts((previous,), (current,), using)
+    log_changes(Question, (instance.pk,))
+    touch_quizzes(instance.affected_quiz_ids(), using)
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_save, sender=Category)
+def object_saved(sender, instance: models.Model, **kwargs) -> None:
+    """Записывает в журнал созданный или изменённый квиз или категорию."""
+    log_changes(sender, (instance.pk,))
+
+
+@receiver(pre_delete, sender=Quiz)
+def quiz_deleting(sender, instance: Quiz, using: str, **kwargs) -> None:
+    """Вычитает вопросы удаляемого каскадом квиза из счётчиков категорий."""
+    release_quiz_questions(instance.pk, using)
+
+
+@receiver(post_delete, sender=Quiz)
+@receiver(post_delete, sender=Category)
+def object_deleted(sender, instance: models.Model, **kwargs) -> None:
+    """Записывает в журнал удалённый квиз или категорию."""
+    log_changes(sender, (instance.pk,), ChangeOperation.DELETE)
@@ -0,0 +1,189 @@
+"""
+Модуль публикации статических снимков квизов.
+
+Каждый квиз вместе с вопросами (без правильных ответов) записывается
+в неизменяемый JSON-файл quiz-<id>.<хэш>.json в QUIZ_SNAPSHOT_DIR.
+Список актуальных файлов хранится в manifest.json. Файлы можно отдавать
+статическим сервером напрямую: имя меняется вместе с содержимым.
+
+Публикация инкрементальная: квиз перерисовывается, только если его
+updated_at отличается от версии в манифесте.
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from operator import attrgetter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from quiz.metrics import ROWS_PROCESSED
+from quiz.models import Question, Quiz
+from quiz.serializers import QuestionSerializer, QuizSerializer
+from quiz.services.question import QuestionService
+from quiz.services.quiz import QuizService
+
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 16
+SNAPSHOT_NAME_RE = re.compile(rf'^quiz-\d+\.[0-9a-f]{{{HASH_LENGTH}}}\.json$')
+# Поля, которые не попадают в снимок.
+HIDDEN_QUIZ_FIELDS = frozenset({'updated_at'})
+HIDDEN_QUESTION_FIELDS = frozenset({
+    'correct_answer',
+    'answer_aliases',
+    'accepted_answers',
+})
+
+
+@dataclass(frozen=True)
+class PublishResult:
+    """Итог публикации: сколько снимков записано, осталось и удалено."""
+
+    written: int
+    unchanged: int
+    removed: int
+
+
+def snapshot_dir() -> Path:
+    """Возвращает каталог снимков."""
+    return Path(settings.QUIZ_SNAPSHOT_DIR)
+
+
+def is_snapshot_name(name: str) -> bool:
+    """Проверяет, что имя файла — манифест или снимок квиза."""
+    return name == MANIFEST_NAME or SNAPSHOT_NAME_RE.match(name) is not None
+
+
+def render_quiz(quiz: Quiz, questions: list[Question]) -> bytes:
+    """
+    Сериализует квиз с вопросами в канонический JSON.
+
+    :param quiz: Квиз.
+    :param questions: Вопросы квиза.
+    :return: JSON-байты снимка.
+    """
+    payload = QuizSerializer(
+        quiz,
+        fields=_visible_fields(QuizSerializer, HIDDEN_QUIZ_FIELDS),
+    ).data
+    payload['questions'] = QuestionSerializer(
+        sorted(questions, key=attrgetter('pk')),
+        many=True,
+        fields=_visible_fields(QuestionSerializer, HIDDEN_QUESTION_FIELDS),
+    ).data
+    return json.dumps(
+        payload,
+        cls=DjangoJSONEncoder,
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(',', ':'),
+    ).encode()
+
+
+def load_manifest() -> dict:
+    """
+    Загружает манифест опубликованных снимков.
+
+    :return: Манифест или пустой манифест, если публикаций ещё не было.
+    """
+    try:
+        return json.loads((snapshot_dir() / MANIFEST_NAME).read_bytes())
+    except (OSError, ValueError):
+        return {'quizzes': {}}
+
+
+def publish(
+    force: bool = False,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> PublishResult:
+    """
+    Публикует снимки квизов, изменившихся с прошлой публикации.
+
+    :param force: Перерисовать все квизы.
+    :param on_progress: Вызывается после каждого квиза с (готово, всего).
+    :return: Итог публикации.
+    """
+    quiz_service = QuizService()
+    question_service = QuestionService()
+    directory = snapshot_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    previous = load_manifest()['quizzes']
+    versions = {
+        str(quiz.pk): quiz.updated_at.isoformat()
+        for quiz in quiz_service.list_quizzes(('id', 'updated_at'))
+    }
+    changed = [
+        quiz_id for quiz_id, version in versions.items()
+        if force or previous.get(quiz_id, {}).get('version') != version
+    ]
+
+    entries = {
+        quiz_id: entry for quiz_id, entry in previous.items()
+        if quiz_id in versions
+    }
+    question_fields = _visible_fields(QuestionSerializer, HIDDEN_QUESTION_FIELDS)
+    written = 0
+    for done, quiz_id in enumerate(changed, start=1):
+        quiz = quiz_service.get_quiz(int(quiz_id))
+        questions = question_service.get_questions_for_quiz(
+            quiz.pk,
+            question_fields,
+        )
+        content = render_quiz(quiz, questions)
+        digest = hashlib.sha256(content).hexdigest()
+        name = f'quiz-{quiz_id}.{digest[:HASH_LENGTH]}.json'
+        if not (directory / name).exists():
+            _write_atomic(directory / name, content)
+        if entries.get(quiz_id, {}).get('file') != name:
+            written += 1
+        entries[quiz_id] = {
+            'file': name,
+            'sha256': digest,
+            'version': quiz.updated_at.isoformat(),
+            'title': quiz.title,
+            'questions': len(questions),
+        }
+        if on_progress is not None:
+            on_progress(done, len(changed))
+
+    manifest = {
+        'generated_at': timezone.now().isoformat(),
+        'quizzes': dict(sorted(entries.items(), key=lambda item: int(item[0]))),
+    }
+    _write_atomic(
+        directory / MANIFEST_NAME,
+        json.dumps(manifest, ensure_ascii=False, indent=2).encode(),
+    )
+
+    ROWS_PROCESSED.inc(written, operation='snapshot_export')
+
+    current = {entry['file'] for entry in entries.values()}
+    for entry in previous.values():
+        if entry['file'] not in current:
+            (directory / entry['file']).unlink(missing_ok=True)
+    return PublishResult(
+        written=written,
+        unchanged=len(versions) - written,
+        removed=len(previous.keys() - versions.keys()),
+    )
+
+
+def _visible_fields(
+    serializer_class: type[QuizSerializer | QuestionSerializer],
+    hidden: frozenset[str],
+) -> tuple[str, ...]:
+    """Возвращает поля сериализатора, которые попадают в снимок."""
+    return tuple(name for name in serializer_class().fields if name not in hidden)
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    """Записывает файл целиком через временный файл и переименование."""
+    temporary = path.with_name(f'.{path.name}.tmp')
+    temporary.write_bytes(content)
+    os.replace(temporary, path)
@@ -0,0 +1,91 @@
+"""Фоновые задачи приложения quiz."""
+
+from dataclasses import asdict
+
+from quiz import neardup, related, snapshots
+from quiz.jobs import JobContext, register
+from quiz.services.category import CategoryService
+from quiz.services.question import QuestionService
+from quiz.services.quiz import QuizService
+
+
+@register('delete_quiz')
+def delete_quiz(context: JobContext, quiz_id: int) -> dict:
+    """
+    Удаляет квиз вместе с вопросами порциями.
+
+    :param context: Контекст задачи.
+    :param quiz_id: Идентификатор квиза.
+    :return: Количество удалённых вопросов.
+    """
+    total = QuestionService().count_questions({'quiz_id': quiz_id})
+    deleted = QuizService().delete_quiz(
+        quiz_id,
+        on_chunk=lambda done: context.set_progress(done, total),
+    )
+    return {'deleted_questions': deleted}
+
+
+@register('delete_category')
+def delete_category(context: JobContext, category_id: int) -> dict:
+    """
+    Удаляет категорию, порциями отвязывая от неё вопросы.
+
+    :param context: Контекст задачи.
+    :param category_id: Идентификатор категории.
+    :return: Количество отвязанных вопросов.
+    """
+    total = QuestionService().count_questions({'category_id': category_id})
+    updated = CategoryService().delete_category(
+        category_id,
+        on_chunk=lambda done: context.set_progress(done, total),
+    )
+    return {'updated_questions': updated}
+
+
+@register('publish_quizzes')
+def publish_quizzes(context: JobContext, force: bool = False) -> dict:
+    """
+    Публикует снимки изменившихся квизов.
+
+    :param context: Контекст задачи.
+    :param force: Перерисовать все квизы.
+    :return: Количество записанных, неизменных и удалённых снимков.
+    """
+    result = snapshots.publish(force=force, on_progress=context.set_progress)
+    return asdict(result)
+
+
+@register('find_near_duplicates', cpu_bound=True)
+def find_near_duplicates(
+    context: JobContext,
+    threshold: float = neardup.DEFAULT_THRESHOLD,
+) -> dict:
+    """
+    Ищет кластеры почти одинаковых вопросов.
+
+    :param context: Контекст задачи.
+    :param threshold: Минимальная оценка сходства внутри кластера.
+    :return: Количество просмотренных вопросов и найденных кластеров.
+    """
+    result = neardup.find_near_duplicates(
+        threshold,
+        on_progress=context.set_progress,
+    )
+    return asdict(result)
+
+
+@register('build_related_questions', cpu_bound=True)
+def build_related_questions(context: JobContext, full: bool = False) -> dict:
+    """
+    Обновляет индекс похожих вопросов.
+
+    :param context: Контекст задачи.
+    :param full: Собрать индекс заново, а не только добавить новые вопросы.
+    :return: Количество вопросов в индексе и добавленных в него.
+    """
+    if full:
+        result = related.build(on_progress=context.set_progress)
+    else:
+        result = related.update()
+    return asdict(result)
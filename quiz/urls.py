@@ -2,20 +2,36 @@
 
 from django.urls import include, path
 
+from quiz.views.autocomplete import AutocompleteView
 from quiz.views.category import CategoryApiView as CategoryView
+from quiz.views.category import CategoryBulkApiView
+from quiz.views.job import JobApiView
+from quiz.views.live import (
+    LiveRoundAdvanceView,
+    LiveRoundListView,
+    LiveRoundView,
+    live_events_view,
+)
+from quiz.views.practice import PracticeSetView
+from quiz.views.snapshot import snapshot_file_view
 from quiz.views.question import (
     QuestionCRUDApiView,
+    QuestionBulkApiView,
     QuestionByTextApiView,
     QuestionAnswerApiView,
+    QuestionRelatedApiView,
 )
 from quiz.views.quiz import (
     QuizCRUDApiView,
+    QuizPublishView,
     QuizQuestionView,
+    QuizQuestionsView,
     QuizByTitleView,
 )
 
 category_urls = [
     path('', CategoryView.as_view(), name='category_list'),
+    path('bulk/', CategoryBulkApiView.as_view(), name='category_bulk'),
     path(
         '<int:category_id>/',
         CategoryView.as_view(),
@@ -24,6 +40,7 @@ category_urls = [
 ]
 
 question_urls = [
+    path('bulk/', QuestionBulkApiView.as_view(), name='question_bulk'),
     path(
         'by_text/<str:query>/',
         QuestionByTextApiView.as_view(),
@@ -34,6 +51,11 @@ question_urls = [
         QuestionAnswerApiView.as_view(),
         name='question_answer'
     ),
+    path(
+        '<int:question_id>/related/',
+        QuestionRelatedApiView.as_view(),
+        name='question_related'
+    ),
     path(
         '<int:question_id>/',
         QuestionCRUDApiView.as_view(),
@@ -43,6 +65,11 @@ question_urls = [
 ]
 
 quiz_urls = [
+    path(
+        'publish/',
+        QuizPublishView.as_view(),
+        name='quiz_publish'
+    ),
     path(
         'by_title/<str:title>/',
         QuizByTitleView.as_view(),
@@ -53,6 +80,11 @@ quiz_urls = [
         QuizQuestionView.as_view(),
         name='quiz_question'
     ),
+    path(
+        '<int:quiz_id>/random_questions/',
+        QuizQuestionsView.as_view(),
+        name='quiz_questions'
+    ),
     path(
         '<int:quiz_id>/',
         QuizCRUDApiView.as_view(),
@@ -65,8 +97,48 @@ quiz_urls = [
     ),
 ]
 
+job_urls = [
+    path(
+        '<int:job_id>/',
+        JobApiView.as_view(),
+        name='job_detail'
+    ),
+]
+
+live_urls = [
+    path('', LiveRoundListView.as_view(), name='live_round_list'),
+    path(
+        '<str:round_id>/',
+        LiveRoundView.as_view(),
+        name='live_round'
+    ),
+    path(
+        '<str:round_id>/advance/',
+        LiveRoundAdvanceView.as_view(),
+        name='live_round_advance'
+    ),
+    path(
+        '<str:round_id>/events/',
+        live_events_view,
+        name='live_round_events'
+    ),
+]
+
+snapshot_urls = [
+    path(
+        '<str:name>',
+        snapshot_file_view,
+        name='quiz_snapshot'
+    ),
+]
+
 urlpatterns = [
+    path('autocomplete/', AutocompleteView.as_view(), name='autocomplete'),
     path('category/', include(category_urls)),
     path('question/', include(question_urls)),
     path('quiz/', include(quiz_urls)),
+    path('jobs/', include(job_urls)),
+    path('live/', include(live_urls)),
+    path('practice_set/', PracticeSetView.as_view(), name='practice_set'),
+    path('snapshots/', include(snapshot_urls)),
 ]
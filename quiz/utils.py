@@ -1,19 +1,277 @@
+from collections.abc import Callable
+
+from django.db import connections, models, router, transaction
+from django.db.models import QuerySet
 from django.shortcuts import get_object_or_404
-from django.db import models
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.serializers import Serializer
+
+FIELDS_QUERY_PARAM = 'fields'
+EXPAND_QUERY_PARAM = 'expand'
 
 
-def update_object(model: models.Model, object_id: int, data: dict):
+def update_object(
+    model: models.Model,
+    object_id: int,
+    data: dict,
+    using: str | None = None,
+):
     """
     Функция для обновления объектов текущих моделей.
 
     :param model: Класс модели Django.
     :param object_id: Идентификатор объекта.
     :param data: Словарь с полями для обновления.
+    :param using: Алиас базы (по умолчанию база для записи модели).
     :return: Обновлённый объект.
     :raises Http404: Если объект не найден.
     """
-    obj = get_object_or_404(model, pk=object_id)
+    manager = model._default_manager.db_manager(
+        using or router.db_for_write(model)
+    )
+    obj = get_object_or_404(manager, pk=object_id)
     for key, value in data.items():
         setattr(obj, key, value)
     obj.save()
     return obj
+
+
+def get_requested_fields(
+    request: Request,
+    serializer_class: type[Serializer],
+) -> tuple[str, ...] | None:
+    """
+    Разбирает параметр ?fields=a,b,c и проверяет имена полей.
+
+    :param request: Объект запроса.
+    :param serializer_class: Сериализатор, поля которого можно запрашивать.
+    :return: Кортеж имён полей или None, если параметр не передан.
+    :raises ValidationError: Если запрошены неизвестные поля.
+    """
+    raw = request.query_params.get(FIELDS_QUERY_PARAM)
+    if not raw:
+        return None
+    fields = tuple(dict.fromkeys(
+        name.strip() for name in raw.split(',') if name.strip()
+    ))
+    unknown = [name for name in fields if name not in serializer_class().fields]
+    if unknown:
+        raise ValidationError(
+            {FIELDS_QUERY_PARAM: [f'Unknown field: {name}' for name in unknown]}
+        )
+    return fields
+
+
+def get_requested_expand(
+    request: Request,
+    serializer_class: type[Serializer],
+) -> tuple[str, ...]:
+    """
+    Разбирает параметр ?expand=a,b и проверяет имена связей.
+
+    :param request: Объект запроса.
+    :param serializer_class: Сериализатор с атрибутом expandable_fields.
+    :return: Кортеж имён связей (пустой, если параметр не передан).
+    :raises ValidationError: Если запрошены связи, которые нельзя раскрыть.
+    """
+    raw = request.query_params.get(EXPAND_QUERY_PARAM)
+    if not raw:
+        return ()
+    expand = tuple(dict.fromkeys(
+        name.strip() for name in raw.split(',') if name.strip()
+    ))
+    expandable = getattr(serializer_class, 'expandable_fields', {})
+    unknown = [name for name in expand if name not in expandable]
+    if unknown:
+        raise ValidationError(
+            {EXPAND_QUERY_PARAM: [f'Cannot expand: {name}' for name in unknown]}
+        )
+    return expand
+
+
+def only_fields(
+    queryset: QuerySet,
+    fields: tuple[str, ...] | None,
+    expand: tuple[str, ...] = (),
+) -> QuerySet:
+    """
+    Ограничивает выборку только запрошенными колонками модели.
+
+    Имена, не являющиеся полями модели (например, вычисляемые поля
+    сериализатора), пропускаются; первичный ключ загружается всегда.
+    Связи из expand, которые попали в выборку, загружаются тем же
+    запросом через select_related.
+
+    :param queryset: Исходный QuerySet.
+    :param fields: Запрошенные поля или None для выборки всех колонок.
+    :param expand: Имена внешних ключей, объекты которых нужны целиком.
+    :return: QuerySet с применённым .only() или исходный QuerySet.
+    """
+    related = [name for name in expand if not fields or name in fields]
+    if related:
+        queryset = queryset.select_related(*related)
+    if not fields:
+        return queryset
+    meta = queryset.model._meta
+    model_fields = {field.name for field in meta.concrete_fields}
+    return queryset.only(
+        meta.pk.name,
+        *(name for name in fields if name in model_fields),
+    )
+
+
+def estimate_count_from_stats(
+    model: type[models.Model],
+    index_name: str | None,
+    depth: int = 0,
+    using: str = 'default',
+) -> int | None:
+    """
+    Оценивает число строк по статистике планировщика без COUNT(*).
+
+    Для SQLite используется таблица sqlite_stat1, которую заполняет
+    ANALYZE: первое число — размер таблицы, следующие — среднее
+    количество строк на значение префикса индекса длины 1, 2, ...
+
+    :param model: Класс модели.
+    :param index_name: Имя индекса или None для оценки размера таблицы.
+    :param depth: Количество колонок префикса индекса, по которым фильтруем.
+    :param using: Алиас базы данных.
+    :return: Оценка количества строк или None, если статистики нет.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql' and index_name is None:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [table],
+            )
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+        if connection.vendor != 'sqlite':
+            return None
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        )
+        if cursor.fetchone() is None:
+            return None
+        if index_name is None:
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s',
+                [table],
+            )
+        else:
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s AND idx = %s',
+                [table, index_name],
+            )
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    stats = row[0].split()
+    if depth >= len(stats) or not stats[depth].isdigit():
+        return None
+    return int(stats[depth])
+
+
+def delete_in_chunks(
+    model: type[models.Model],
+    column: str,
+    value: object,
+    chunk_size: int,
+    using: str = 'default',
+    on_chunk: Callable[[int], None] | None = None,
+) -> int:
+    """
+    Удаляет строки, где column = value, порциями в коротких транзакциях.
+
+    В отличие от QuerySet.delete() не загружает объекты в память и
+    не держит блокировку записи на всё время удаления.
+
+    :param model: Класс модели.
+    :param column: Имя колонки в таблице.
+    :param value: Значение для отбора строк.
+    :param chunk_size: Сколько строк удалять одной командой.
+    :param using: Алиас базы данных.
+    :param on_chunk: Вызывается после каждой порции с общим числом строк.
+    :return: Количество удалённых строк.
+    """
+    return _execute_in_chunks(
+        model,
+        'DELETE FROM {table} WHERE {pk} IN ({subquery})',
+        column,
+        value,
+        chunk_size,
+        using,
+        on_chunk,
+    )
+
+
+def nullify_in_chunks(
+    model: type[models.Model],
+    column: str,
+    value: object,
+    chunk_size: int,
+    using: str = 'default',
+    on_chunk: Callable[[int], None] | None = None,
+) -> int:
+    """
+    Обнуляет column = value порциями в коротких транзакциях.
+
+    :param model: Класс модели.
+    :param column: Имя колонки в таблице.
+    :param value: Значение для отбора строк.
+    :param chunk_size: Сколько строк обновлять одной командой.
+    :param using: Алиас базы данных.
+    :param on_chunk: Вызывается после каждой порции с общим числом строк.
+    :return: Количество обновлённых строк.
+    """
+    return _execute_in_chunks(
+        model,
+        'UPDATE {table} SET {column} = NULL WHERE {pk} IN ({subquery})',
+        column,
+        value,
+        chunk_size,
+        using,
+        on_chunk,
+    )
+
+
+def _execute_in_chunks(
+    model: type[models.Model],
+    template: str,
+    column: str,
+    value: object,
+    chunk_size: int,
+    using: str,
+    on_chunk: Callable[[int], None] | None,
+) -> int:
+    """
+    Повторяет команду над порциями строк, пока они не закончатся.
+
+    :return: Суммарное количество затронутых строк.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    pk = quote(model._meta.pk.column)
+    column = quote(column)
+    subquery = f'SELECT {pk} FROM {table} WHERE {column} = %s LIMIT %s'
+    sql = template.format(
+        table=table,
+        pk=pk,
+        column=column,
+        subquery=subquery,
+    )
+    total = 0
+    while True:
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(sql, [value, chunk_size])
+            affected = cursor.rowcount
+        total += affected
+        if on_chunk is not None:
+            on_chunk(total)
+        if affected < chunk_size:
+            return total
@@ -2,6 +2,7 @@
 
 from django.core.exceptions import ValidationError
 
+from quiz.answers import MatchPolicy, parse_number
 from quiz.constants import MIN_ANSWERS
 
 
@@ -27,3 +28,51 @@ def validate_answer_options(options):
         or all(type(answer) is str for answer in options)
     ):
         raise ValidationError('All answers must be numbers or strings')
+
+
+def validate_answer_aliases(aliases):
+    """
+    Проверяет, что дополнительные ответы — список строк или чисел.
+
+    :param aliases: Проверяемое значение.
+    :raises ValidationError: Если значение не соответствует требованиям.
+    """
+    if not isinstance(aliases, list):
+        raise ValidationError('Answer aliases must be a list')
+    if not all(type(alias) in (int, float, str) for alias in aliases):
+        raise ValidationError('All answer aliases must be numbers or strings')
+
+
+def validate_answer_tolerance(tolerance):
+    """
+    Проверяет, что допуск числового ответа неотрицателен.
+
+    :param tolerance: Проверяемое значение.
+    :raises ValidationError: Если допуск отрицательный.
+    """
+    if tolerance < 0:
+        raise ValidationError('Answer tolerance must not be negative')
+
+
+def validate_numeric_answers(policy, correct_answer, aliases):
+    """
+    Проверяет, что при числовой политике все принятые ответы — числа.
+
+    Иначе ни один ответ на вопрос не будет засчитан.
+
+    :param policy: Политика сравнения ответа.
+    :param correct_answer: Правильный ответ.
+    :param aliases: Другие принимаемые ответы.
+    :raises ValidationError: Если какой-то из ответов не число; ошибка
+        привязана к полю correct_answer или answer_aliases.
+    """
+    if policy != MatchPolicy.NUMERIC:
+        return
+    for field, values in (
+        ('correct_answer', (correct_answer,)),
+        ('answer_aliases', aliases or ()),
+    ):
+        if any(parse_number(str(value)) is None for value in values):
+            raise ValidationError(
+                {field: 'Numeric match policy requires numeric answers.'}
+            )
@@ -0,0 +1,39 @@
+"""Модуль с представлением подсказок для автодополнения"""
+
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from quiz.autocomplete import get_autocomplete_index
+from quiz.serializers import AutocompleteQuerySerializer, SuggestionSerializer
+
+
+class AutocompleteView(APIView):
+    """Представление подсказок по префиксам слов."""
+
+    serializer_class = SuggestionSerializer
+
+    def get(self, request):
+        """
+        Возвращает подсказки для ?q= среди объектов вида ?type=.
+
+        Каждое слово запроса считается префиксом слова в названии квиза
+        или категории или в тексте вопроса. Ответ строится по индексу в
+        памяти процесса без запросов LIKE к БД.
+
+        :param request: Объект запроса.
+        :return: Response со списком подсказок {id, text}.
+        """
+        query_serializer = AutocompleteQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        params = query_serializer.validated_data
+        suggestions = get_autocomplete_index().suggest(
+            params['type'],
+            params['q'],
+            params['limit'],
+        )
+        serializer = self.serializer_class(
+            [{'id': object_id, 'text': text} for object_id, text in suggestions],
+            many=True,
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
@@ -1,11 +1,18 @@
 """Модуль с представлениями для работы с категориями"""
 
+from django.conf import settings
+from django.urls import reverse
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from quiz.serializers import CategorySerializer
-from quiz.services.category import CategoryService
+from quiz import jobs
+from quiz.serializers import CategoryBulkSerializer, CategorySerializer
+from quiz.services.backends import (
+    get_category_service,
+    get_question_service,
+)
+from quiz.utils import get_requested_fields
 
 
 class CategoryApiView(APIView):
@@ -15,7 +22,8 @@ class CategoryApiView(APIView):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.service = CategoryService()
+        self.service = get_category_service()
+        self.question_service = get_question_service()
 
     def get(self, request, category_id=None):
         """
@@ -28,17 +36,22 @@ class CategoryApiView(APIView):
         :param category_id: Идентификатор категории (опционально).
         :return: Response с данными категории(й) или 404.
         """
+        fields = get_requested_fields(request, self.serializer_class)
         if category_id is not None:
-            category = self.service.get_category(category_id)
+            category = self.service.get_category(category_id, fields)
 
-            serializer = self.serializer_class(category)
+            serializer = self.serializer_class(category, fields=fields)
             return Response(
                 serializer.data,
                 status=status.HTTP_200_OK
             )
 
-        categories = self.service.list_categories()
-        serializer = self.serializer_class(categories, many=True)
+        categories = self.service.list_categories(fields)
+        serializer = self.serializer_class(
+            categories,
+            many=True,
+            fields=fields
+        )
         return Response(serializer.data)
 
     def post(self, request):
@@ -85,11 +98,55 @@ class CategoryApiView(APIView):
         """
         Обрабатывает DELETE-запрос на удаление категории.
 
+        Если у категории много вопросов, удаление выполняется фоновой
+        задачей и возвращается 202 с идентификатором задачи.
+
         :param request: Объект запроса.
         :param category_id: Идентификатор категории.
-        :return: Response со статусом 204 или 404.
+        :return: Response со статусом 204, 202 или 404.
         """
-        self.service.get_category(category_id)
+        self.service.get_category(category_id, ('id',))
+
+        questions_count = self.question_service.count_questions(
+            {'category_id': category_id}
+        )
+        if questions_count >= settings.QUIZ_BACKGROUND_DELETE_THRESHOLD:
+            job = jobs.enqueue('delete_category', category_id=category_id)
+            return Response(
+                {'job_id': job.id},
+                status=status.HTTP_202_ACCEPTED,
+                headers={'Location': reverse(
+                    'job_detail',
+                    kwargs={'job_id': job.id}
+                )}
+            )
 
         self.service.delete_category(category_id)
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class CategoryBulkApiView(APIView):
+    """Представление для массового создания категорий."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = get_category_service()
+
+    def post(self, request):
+        """
+        Находит или создаёт категории по списку названий.
+
+        Тело: {"titles": [...]}. Существующие категории не меняются.
+
+        :param request: Объект запроса с данными.
+        :return: Response со списком категорий в порядке названий.
+        """
+        serializer = CategoryBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        categories = self.service.get_or_create_categories(
+            serializer.validated_data['titles']
+        )
+        return Response(
+            CategorySerializer(categories, many=True).data,
+            status=status.HTTP_200_OK
+        )
@@ -0,0 +1,42 @@
+"""Модуль с представлениями для работы с фоновыми задачами"""
+
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from quiz.serializers import JobSerializer
+from quiz.services.job import JobService
+
+
+class JobApiView(APIView):
+    """Представление для просмотра состояния и отмены фоновой задачи."""
+
+    serializer_class = JobSerializer
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = JobService()
+
+    def get(self, request, job_id):
+        """
+        Возвращает состояние задачи и её прогресс.
+
+        :param request: Объект запроса.
+        :param job_id: Идентификатор задачи.
+        :return: Response с данными задачи или 404.
+        """
+        job = self.service.get_job(job_id)
+        serializer = self.serializer_class(job)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    def delete(self, request, job_id):
+        """
+        Запрашивает отмену задачи.
+
+        :param request: Объект запроса.
+        :param job_id: Идентификатор задачи.
+        :return: Response с данными задачи или 404.
+        """
+        job = self.service.cancel_job(job_id)
+        serializer = self.serializer_class(job)
+        return Response(serializer.data, status=status.HTTP_200_OK)
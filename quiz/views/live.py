@@ -0,0 +1,205 @@
+"""Модуль с представлениями живых раундов квиза"""
+
+from django.http import Http404, HttpRequest, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_safe
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from quiz import live
+from quiz.serializers import (
+    LiveAdvanceSerializer,
+    LiveRoundSerializer,
+    QuestionSerializer,
+)
+from quiz.services.backends import get_question_service, get_quiz_service
+
+# Заголовок с токеном ведущего, который выдаётся при создании раунда.
+HOST_TOKEN_HEADER = 'X-Live-Host-Token'
+# Поля вопроса, которые видят участники: без правильного ответа.
+LIVE_QUESTION_FIELDS = ('id', 'quiz', 'category', 'text', 'options', 'difficulty')
+
+
+class LiveRoundListView(APIView):
+    """Представление для создания живого раунда."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.quiz_service = get_quiz_service()
+
+    def post(self, request):
+        """
+        Создаёт раунд квиза.
+
+        Тело: {"quiz": id}. Токен ведущего из ответа передаётся в
+        заголовке X-Live-Host-Token при переключении вопросов и
+        завершении раунда.
+
+        :param request: Объект запроса с данными.
+        :return: Response с id раунда, токеном ведущего и адресом потока.
+        """
+        serializer = LiveRoundSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        quiz_id = serializer.validated_data['quiz']
+        if not self.quiz_service.get_quiz(quiz_id, ('id',)):
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        live_round = live.create_round(quiz_id)
+        return Response(
+            {
+                'round': live_round.round_id,
+                'quiz': quiz_id,
+                'host_token': live_round.host_token,
+                'events': reverse(
+                    'live_round_events',
+                    kwargs={'round_id': live_round.round_id},
+                ),
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+
+class LiveRoundHostMixin:
+    """Поиск раунда и проверка токена ведущего."""
+
+    def get_round(self, request, round_id: str) -> live.LiveRound:
+        """
+        Возвращает раунд, если запрос пришёл от его ведущего.
+
+        :raises Http404: Если раунда нет.
+        :raises PermissionDenied: Если токен ведущего неверный.
+        """
+        live_round = live.get_round(round_id)
+        if live_round is None:
+            raise Http404
+        if not live_round.is_host(request.headers.get(HOST_TOKEN_HEADER)):
+            self.permission_denied(request, message='Invalid host token.')
+        return live_round
+
+
+class LiveRoundView(LiveRoundHostMixin, APIView):
+    """Представление для просмотра и завершения раунда."""
+
+    def get(self, request, round_id):
+        """
+        Возвращает состояние раунда.
+
+        :param request: Объект запроса.
+        :param round_id: Идентификатор раунда.
+        :return: Response с квизом, показанными вопросами и числом
+            подписчиков.
+        """
+        live_round = self.get_round(request, round_id)
+        return Response(
+            {
+                'round': live_round.round_id,
+                'quiz': live_round.quiz_id,
+                'asked': live_round.asked,
+                'subscribers': live_round.subscriber_count,
+            },
+            status=status.HTTP_200_OK
+        )
+
+    def delete(self, request, round_id):
+        """
+        Завершает раунд: потоки участников получают событие end.
+
+        :param request: Объект запроса.
+        :param round_id: Идентификатор раунда.
+        :return: Response 204.
+        """
+        live.finish_round(self.get_round(request, round_id))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class LiveRoundAdvanceView(LiveRoundHostMixin, APIView):
+    """Представление для переключения вопроса раунда."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.question_service = get_question_service()
+
+    def post(self, request, round_id):
+        """
+        Показывает участникам следующий вопрос.
+
+        Тело: {"question": id} или пустое — тогда выбирается случайный
+        вопрос квиза, которого ещё не было в раунде.
+
+        :param request: Объект запроса с данными.
+        :param round_id: Идентификатор раунда.
+        :return: Response с событием или 409, если вопросы закончились.
+        """
+        live_round = self.get_round(request, round_id)
+        serializer = LiveAdvanceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        question_id = serializer.validated_data.get('question')
+        if question_id is not None:
+            question = self.question_service.get_question(
+                question_id,
+                LIVE_QUESTION_FIELDS,
+            )
+            if question.quiz_id != live_round.quiz_id:
+                return Response(
+                    {'question': ['Question belongs to another quiz.']},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            asked = set(live_round.asked)
+            candidates = self.question_service.random_questions_from_quiz(
+                live_round.quiz_id,
+                len(asked) + 1,
+                fields=LIVE_QUESTION_FIELDS,
+            )
+            question = next(
+                (candidate for candidate in candidates if candidate.pk not in asked),
+                None,
+            )
+            if question is None:
+                return Response(
+                    {'detail': 'No questions left in this quiz.'},
+                    status=status.HTTP_409_CONFLICT
+                )
+        event = live_round.advance(
+            question.pk,
+            QuestionSerializer(question, fields=LIVE_QUESTION_FIELDS).data,
+        )
+        return Response(
+            {
+                'event': event.id,
+                **event.data,
+                'subscribers': live_round.subscriber_count,
+            },
+            status=status.HTTP_200_OK
+        )
+
+
+@require_safe
+async def live_events_view(request: HttpRequest, round_id: str) -> StreamingHttpResponse:
+    """
+    Отдаёт события раунда потоком Server-Sent Events.
+
+    Представление асинхронное: под ASGI ожидающий клиент не занимает
+    поток. При переподключении браузер передаёт Last-Event-ID, и
+    текущий вопрос повторно не отправляется.
+
+    :param request: Объект запроса.
+    :param round_id: Идентификатор раунда.
+    :return: StreamingHttpResponse с text/event-stream или 404.
+    """
+    live_round = live.get_round(round_id)
+    if live_round is None:
+        raise Http404
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        last_event_id = None
+    response = StreamingHttpResponse(
+        live.stream(live_round, last_event_id),
+        content_type='text/event-stream',
+    )
+    patch_cache_control(response, no_cache=True)
+    # Отключает буферизацию ответа в nginx.
+    response['X-Accel-Buffering'] = 'no'
+    return response
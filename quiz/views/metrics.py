@@ -0,0 +1,17 @@
+"""Модуль с представлением метрик Prometheus"""
+
+from django.http import HttpRequest, HttpResponse
+from django.views.decorators.http import require_safe
+
+from quiz import metrics
+
+
+@require_safe
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """
+    Отдаёт метрики всех процессов в текстовом формате Prometheus.
+
+    :param request: Объект запроса.
+    :return: HttpResponse с метриками.
+    """
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
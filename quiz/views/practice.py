@@ -0,0 +1,62 @@
+"""Модуль с представлением наборов вопросов для тренировки"""
+
+import random
+
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from quiz.serializers import PracticeSetSerializer, QuestionSerializer
+from quiz.services.backends import get_question_service
+from quiz.utils import get_requested_expand, get_requested_fields
+
+
+class PracticeSetView(APIView):
+    """Представление для сборки набора вопросов из категорий."""
+
+    serializer_class = QuestionSerializer
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = get_question_service()
+
+    def post(self, request):
+        """
+        Собирает набор вопросов из категорий по долям сложностей.
+
+        Тело: {"categories": [...], "count": n, "difficulty": {...},
+        "seed": s}. Без seed зерно выбирается случайно и возвращается в
+        ответе: повторный запрос с ним вернёт тот же набор, пока вопросы
+        категорий не изменятся.
+
+        :param request: Объект запроса с данными.
+        :return: Response с зерном и списком вопросов.
+        """
+        serializer = PracticeSetSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        fields = get_requested_fields(request, self.serializer_class)
+        expand = get_requested_expand(request, self.serializer_class)
+        seed = params.get('seed')
+        if seed is None:
+            seed = random.getrandbits(63)
+        questions = self.service.practice_set(
+            params['categories'],
+            params['count'],
+            params.get('difficulty'),
+            seed,
+            fields,
+            expand,
+        )
+        return Response(
+            {
+                'seed': seed,
+                'questions': self.serializer_class(
+                    questions,
+                    many=True,
+                    fields=fields,
+                    expand=expand,
+                ).data,
+            },
+            status=status.HTTP_200_OK
+        )
@@ -4,8 +4,17 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from quiz.serializers import QuestionSerializer
-from quiz.services.question import QuestionService
+from quiz.related import related_question_ids
+from quiz.serializers import (
+    COUNT_ESTIMATED,
+    QuestionBulkDeleteSerializer,
+    QuestionBulkUpdateSerializer,
+    QuestionFilterSerializer,
+    QuestionSerializer,
+    RelatedQuerySerializer,
+)
+from quiz.services.backends import get_question_service
+from quiz.utils import get_requested_expand, get_requested_fields
 
 
 class QuestionCRUDApiView(APIView):
@@ -15,27 +24,57 @@ class QuestionCRUDApiView(APIView):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.service = QuestionService()
+        self.service = get_question_service()
 
     def get(self, request, question_id=None):
         """
         Обрабатывает GET-запросы.
 
         Если указан question_id — возвращает конкретный вопрос,
-        иначе — список всех вопросов.
+        иначе — список вопросов с учётом фильтров ?quiz=, ?category=,
+        ?difficulty=. При ?count=exact|estimated количество вопросов
+        возвращается в заголовке X-Total-Count. ?expand=category,quiz
+        выводит связанные объекты вложенными.
 
         :param request: Объект запроса.
         :param question_id: Идентификатор вопроса (опционально).
         :return: Response с данными вопроса(ов) или 404.
         """
+        fields = get_requested_fields(request, self.serializer_class)
+        expand = get_requested_expand(request, self.serializer_class)
         if question_id is not None:
-            question = self.service.get_question(question_id)
-            serializer = self.serializer_class(question)
+            question = self.service.get_question(question_id, fields, expand)
+            serializer = self.serializer_class(
+                question,
+                fields=fields,
+                expand=expand
+            )
             return Response(serializer.data, status=status.HTTP_200_OK)
 
-        questions = self.service.list_questions()
-        serializer = self.serializer_class(questions, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        filter_serializer = QuestionFilterSerializer(data=request.query_params)
+        filter_serializer.is_valid(raise_exception=True)
+        filters = dict(filter_serializer.validated_data)
+        count_mode = filters.pop('count', None)
+
+        questions = self.service.list_questions(fields, filters, expand)
+        serializer = self.serializer_class(
+            questions,
+            many=True,
+            fields=fields,
+            expand=expand
+        )
+        headers = None
+        if count_mode is not None:
+            total = self.service.count_questions(
+                filters,
+                estimated=count_mode == COUNT_ESTIMATED
+            )
+            headers = {'X-Total-Count': str(total)}
+        return Response(
+            serializer.data,
+            status=status.HTTP_200_OK,
+            headers=headers
+        )
 
     def post(self, request):
         """
@@ -66,7 +105,12 @@ class QuestionCRUDApiView(APIView):
         :param question_id: Идентификатор вопроса.
         :return: Response с обновлённым вопросом или 404.
         """
-        serializer = self.serializer_class(data=request.data, partial=True)
+        question = self.service.get_question(question_id)
+        serializer = self.serializer_class(
+            question,
+            data=request.data,
+            partial=True,
+        )
         serializer.is_valid(raise_exception=True)
 
         updated_question = self.service.update_question(
@@ -90,6 +134,52 @@ class QuestionCRUDApiView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+class QuestionBulkApiView(APIView):
+    """Представление для массового изменения и удаления вопросов."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = get_question_service()
+
+    def patch(self, request):
+        """
+        Изменяет difficulty и/или category выбранных вопросов.
+
+        Тело: {"ids": [...]} или {"filter": {"quiz": ..., "category": ...,
+        "difficulty": ...}} и {"set": {"difficulty": ..., "category": ...}}.
+
+        :param request: Объект запроса с данными.
+        :return: Response с количеством изменённых вопросов.
+        """
+        serializer = QuestionBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        updated = self.service.bulk_update_questions(
+            data['set'],
+            data.get('ids'),
+            data.get('filter'),
+        )
+        return Response({'updated': updated}, status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        """
+        Удаляет выбранные вопросы.
+
+        Тело: {"ids": [...]} или {"filter": {...}}.
+
+        :param request: Объект запроса с данными.
+        :return: Response с количеством удалённых вопросов.
+        """
+        serializer = QuestionBulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        deleted = self.service.bulk_delete_questions(
+            data.get('ids'),
+            data.get('filter'),
+        )
+        return Response({'deleted': deleted}, status=status.HTTP_200_OK)
+
+
 class QuestionByTextApiView(APIView):
     """Представление для поиска вопросов по тексту."""
 
@@ -97,7 +187,7 @@ class QuestionByTextApiView(APIView):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.service = QuestionService()
+        self.service = get_question_service()
 
     def get(self, request, query):
         """
@@ -107,8 +197,15 @@ class QuestionByTextApiView(APIView):
         :param query: Подстрока для поиска.
         :return: Response со списком вопросов.
         """
-        questions = self.service.get_questions_by_text(query)
-        serializer = self.serializer_class(questions, many=True)
+        fields = get_requested_fields(request, self.serializer_class)
+        expand = get_requested_expand(request, self.serializer_class)
+        questions = self.service.get_questions_by_text(query, fields, expand)
+        serializer = self.serializer_class(
+            questions,
+            many=True,
+            fields=fields,
+            expand=expand
+        )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -117,7 +214,7 @@ class QuestionAnswerApiView(APIView):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.service = QuestionService()
+        self.service = get_question_service()
 
     def post(self, request, question_id):
         """
@@ -131,3 +228,40 @@ class QuestionAnswerApiView(APIView):
         answer = request.data.get('answer', '')
         correct = self.service.check_answer(question_id, answer)
         return Response({'correct': correct}, status=status.HTTP_200_OK)
+
+
+class QuestionRelatedApiView(APIView):
+    """Представление для получения похожих вопросов."""
+
+    serializer_class = QuestionSerializer
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.service = get_question_service()
+
+    def get(self, request, question_id):
+        """
+        Возвращает до ?k= вопросов, похожих на указанный.
+
+        Соседи берутся из заранее собранного индекса
+        (manage.py build_related_questions), порядок — по убыванию
+        сходства.
+
+        :param request: Объект запроса.
+        :param question_id: Идентификатор вопроса.
+        :return: Response со списком вопросов или 404.
+        """
+        query = RelatedQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        fields = get_requested_fields(request, self.serializer_class)
+        expand = get_requested_expand(request, self.serializer_class)
+        question = self.service.get_question(question_id, ('id',))
+        related_ids = related_question_ids(question.pk, query.validated_data['k'])
+        questions = self.service.get_questions_by_ids(related_ids, fields, expand)
+        serializer = self.serializer_class(
+            questions,
+            many=True,
+            fields=fields,
+            expand=expand
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
@@ -1,12 +1,23 @@
 """Модуль с представлениями для работы с квизами"""
 
+from django.conf import settings
+from django.urls import reverse
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from quiz.serializers import QuizSerializer, QuestionSerializer
-from quiz.services.quiz import QuizService
-from quiz.services.question import QuestionService
+from quiz import jobs
+from quiz.serializers import (
+    PublishSerializer,
+    QuizSerializer,
+    QuestionSerializer,
+    RandomQuestionsQuerySerializer,
+)
+from quiz.services.backends import (
+    get_question_service,
+    get_quiz_service,
+)
+from quiz.utils import get_requested_expand, get_requested_fields
 
 
 class QuizCRUDApiView(APIView):
@@ -16,7 +27,8 @@ class QuizCRUDApiView(APIView):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.service = QuizService()
+        self.service = get_quiz_service()
+        self.question_service = get_question_service()
 
     def get(self, request, quiz_id=None):
         """
@@ -29,13 +41,14 @@ class QuizCRUDApiView(APIView):
         :param quiz_id: Идентификатор квиза (опционально).
         :return: Response с данными квиза(ов) или 404.
         """
+        fields = get_requested_fields(request, self.serializer_class)
         if quiz_id is not None:
-            quiz = self.service.get_quiz(quiz_id)
-            serializer = self.serializer_class(quiz)
+            quiz = self.service.get_quiz(quiz_id, fields)
+            serializer = self.serializer_class(quiz, fields=fields)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
-        quizzes = self.service.list_quizzes()
-        serializer = self.serializer_class(quizzes, many=True)
+        quizzes = self.service.list_quizzes(fields)
+        serializer = self.serializer_class(quizzes, many=True, fields=fields)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def post(self, request):
@@ -78,14 +91,31 @@ class QuizCRUDApiView(APIView):
         """
         Обрабатывает DELETE-запрос на удаление квиза.
 
+        Большие квизы удаляются фоновой задачей: в этом случае
+        возвращается 202 с идентификатором задачи.
+
         :param request: Объект запроса.
         :param quiz_id: Идентификатор квиза.
-        :return: Response со статусом 204 или 404.
+        :return: Response со статусом 204, 202 или 404.
         """
-        quiz = self.service.get_quiz(quiz_id)
+        quiz = self.service.get_quiz(quiz_id, ('id',))
         if not quiz:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
+        questions_count = self.question_service.count_questions(
+            {'quiz_id': quiz_id}
+        )
+        if questions_count >= settings.QUIZ_BACKGROUND_DELETE_THRESHOLD:
+            job = jobs.enqueue('delete_quiz', quiz_id=quiz_id)
+            return Response(
+                {'job_id': job.id},
+                status=status.HTTP_202_ACCEPTED,
+                headers={'Location': reverse(
+                    'job_detail',
+                    kwargs={'job_id': job.id}
+                )}
+            )
+
         self.service.delete_quiz(quiz_id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -95,8 +125,8 @@ class QuizQuestionView(APIView):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.quiz_service = QuizService()
-        self.question_service = QuestionService()
+        self.quiz_service = get_quiz_service()
+        self.question_service = get_question_service()
 
     def get(self, request, quiz_id):
         """
@@ -106,16 +136,66 @@ class QuizQuestionView(APIView):
         :param quiz_id: Идентификатор квиза.
         :return: Response с данными вопроса или 404.
         """
-        quiz = self.quiz_service.get_quiz(quiz_id)
+        fields = get_requested_fields(request, QuestionSerializer)
+        expand = get_requested_expand(request, QuestionSerializer)
+        quiz = self.quiz_service.get_quiz(quiz_id, ('id',))
         if not quiz:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
         try:
-            question = self.question_service.random_question_from_quiz(quiz_id)
+            question = self.question_service.random_question_from_quiz(
+                quiz_id,
+                fields,
+                expand
+            )
         except ValueError:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
-        serializer = QuestionSerializer(question)
+        serializer = QuestionSerializer(question, fields=fields, expand=expand)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class QuizQuestionsView(APIView):
+    """Представление для получения нескольких случайных вопросов квиза."""
+
+    serializer_class = QuestionSerializer
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.quiz_service = get_quiz_service()
+        self.question_service = get_question_service()
+
+    def get(self, request, quiz_id):
+        """
+        Возвращает до ?k= различных случайных вопросов квиза.
+
+        Параметр ?difficulty= (можно повторять) ограничивает сложности.
+
+        :param request: Объект запроса.
+        :param quiz_id: Идентификатор квиза.
+        :return: Response со списком вопросов или 404.
+        """
+        query = RandomQuestionsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        fields = get_requested_fields(request, self.serializer_class)
+        expand = get_requested_expand(request, self.serializer_class)
+        quiz = self.quiz_service.get_quiz(quiz_id, ('id',))
+        if not quiz:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        questions = self.question_service.random_questions_from_quiz(
+            quiz_id,
+            query.validated_data['k'],
+            tuple(sorted(query.validated_data.get('difficulty', ()))),
+            fields,
+            expand,
+        )
+        serializer = self.serializer_class(
+            questions,
+            many=True,
+            fields=fields,
+            expand=expand,
+        )
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -126,7 +206,7 @@ class QuizByTitleView(APIView):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.service = QuizService()
+        self.service = get_quiz_service()
 
     def get(self, request, title):
         """
@@ -136,6 +216,32 @@ class QuizByTitleView(APIView):
         :param title: Подстрока для поиска.
         :return: Response со списком квизов.
         """
-        quizzes = self.service.get_quizzes_by_title(title)
-        serializer = self.serializer_class(quizzes, many=True)
+        fields = get_requested_fields(request, self.serializer_class)
+        quizzes = self.service.get_quizzes_by_title(title, fields)
+        serializer = self.serializer_class(quizzes, many=True, fields=fields)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class QuizPublishView(APIView):
+    """Представление для публикации статических снимков квизов."""
+
+    def post(self, request):
+        """
+        Запускает фоновую публикацию снимков изменившихся квизов.
+
+        Снимки и manifest.json отдаются по /api/snapshots/.
+
+        :param request: Объект запроса; {"force": true} перерисует все квизы.
+        :return: Response со статусом 202 и идентификатором задачи.
+        """
+        serializer = PublishSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = jobs.enqueue('publish_quizzes', **serializer.validated_data)
+        return Response(
+            {'job_id': job.id},
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': reverse(
+                'job_detail',
+                kwargs={'job_id': job.id}
+            )}
+        )
@@ -0,0 +1,64 @@
+"""Модуль с представлениями для отдачи OpenAPI-схемы"""
+
+from django.http import Http404, HttpRequest, HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition, require_safe
+
+from quiz.schema import get_schema
+
+SCHEMA_CONTENT_TYPES = {
+    'json': 'application/json',
+    'yaml': 'application/yaml',
+}
+
+
+def _schema_etag(request: HttpRequest, *args, **kwargs) -> str:
+    """Возвращает ETag текущей схемы."""
+    return get_schema().etag
+
+
+@require_safe
+@condition(etag_func=_schema_etag)
+def schema_file_view(request: HttpRequest, format: str) -> HttpResponse:
+    """
+    Отдаёт предсобранную схему в формате JSON или YAML.
+
+    :param request: Объект запроса.
+    :param format: 'json' или 'yaml'.
+    :return: HttpResponse со схемой или 404.
+    """
+    if format not in SCHEMA_CONTENT_TYPES:
+        raise Http404
+    schema = get_schema()
+    content = schema.content if format == 'json' else schema.yaml_content
+    response = HttpResponse(content, content_type=SCHEMA_CONTENT_TYPES[format])
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+@require_safe
+def schema_ui_view(request: HttpRequest, renderer: str) -> HttpResponse:
+    """
+    Отдаёт страницу Swagger UI или ReDoc.
+
+    Страница загружает схему с schema_file_view, поэтому сама схема
+    здесь не генерируется.
+
+    :param request: Объект запроса.
+    :param renderer: 'swagger' или 'redoc'.
+    :return: HttpResponse с HTML-страницей.
+    """
+    from drf_yasg.renderers import ReDocRenderer, SwaggerUIRenderer
+
+    renderer_class = {
+        'swagger': SwaggerUIRenderer,
+        'redoc': ReDocRenderer,
+    }[renderer]
+    ui_renderer = renderer_class()
+    context = {'request': request}
+    ui_renderer.set_context(context)
+    info = get_schema().spec['info']
+    context['title'] = info.get('title', '')
+    context['version'] = info.get('version', '')
+    return HttpResponse(render_to_string(ui_renderer.template, context, request))
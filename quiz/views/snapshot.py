@@ -0,0 +1,38 @@
+"""Модуль с представлениями для отдачи снимков квизов"""
+
+from django.http import FileResponse, Http404, HttpRequest
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_safe
+
+from quiz.snapshots import MANIFEST_NAME, is_snapshot_name, snapshot_dir
+
+# Снимки неизменяемы: новое содержимое получает новое имя файла.
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+@require_safe
+def snapshot_file_view(request: HttpRequest, name: str) -> FileResponse:
+    """
+    Отдаёт manifest.json или файл снимка квиза без обращения к БД.
+
+    :param request: Объект запроса.
+    :param name: Имя файла из манифеста.
+    :return: FileResponse с JSON или 404.
+    """
+    if not is_snapshot_name(name):
+        raise Http404
+    try:
+        snapshot = (snapshot_dir() / name).open('rb')
+    except FileNotFoundError:
+        raise Http404 from None
+    response = FileResponse(snapshot, content_type='application/json')
+    if name == MANIFEST_NAME:
+        patch_cache_control(response, public=True, no_cache=True)
+    else:
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=IMMUTABLE_MAX_AGE,
+            immutable=True,
+        )
+    return response
@@ -1,5 +1,10 @@
-import pytest
+import io
 import json
+
+import pytest
+from django.core.management import call_command
+from django.db import connections
+from django.db.utils import load_backend
 from quiz.services.category import CategoryService
 from quiz.services.quiz import QuizService
 from quiz.services.question import QuestionService
@@ -35,3 +40,23 @@ def question(question_service, quiz):
         'difficulty': Difficulty.EASY,
     }
     return question_service.create_question(quiz.id, data)
+
+@pytest.fixture
+def shards(db, settings, tmp_path):
+    aliases = ['shard_0', 'shard_1']
+    for alias in aliases:
+        database = {
+            **connections.settings['default'],
+            'NAME': str(tmp_path / f'{alias}.sqlite3'),
+        }
+        connections[alias] = load_backend(database['ENGINE']).DatabaseWrapper(
+            database,
+            alias,
+        )
+    settings.QUIZ_SHARDS = aliases
+    settings.QUIZ_SHARD_ID_SPAN = 1000
+    call_command('init_shards', stdout=io.StringIO())
+    yield aliases
+    for alias in aliases:
+        connections[alias].close()
+        del connections[alias]
@@ -1,12 +1,66 @@
 """Тесты для сервисов приложения quiz."""
 
+import asyncio
+import io
+import itertools
 import json
+import os
+import random
+from datetime import timedelta
+import numpy as np
 import pytest
-from django.http import Http404
+import sqlite3
 
-from quiz.models import Difficulty, Quiz
+from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.management import CommandError
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from project import preload as preload_module
+from quiz import (
+    counters,
+    jobs,
+    live,
+    metrics,
+    neardup,
+    related,
+    routers,
+    sharedcache,
+    sharding,
+    snapshots,
+)
+from quiz.autocomplete import AutocompleteIndex, PrefixIndex
+from quiz.bank import QuestionBank
+from quiz.management.commands.startup_profile import parse_import_times
+from quiz.management.commands.sync_replica import sync_sqlite_file
+from quiz.middleware import PIN_PRIMARY_COOKIE, ReplicaPinningMiddleware
+from quiz.models import (
+    Category,
+    ChangeLog,
+    Difficulty,
+    DuplicateCluster,
+    MatchPolicy,
+    Job,
+    JobStatus,
+    Question,
+    Quiz,
+)
+from quiz.normalization import normalize_text, question_content_hash
+from quiz.sampling import allocate, difficulty_strata, sample_from_pools
+from quiz.services.backends import get_question_service
 from quiz.services.category import CategoryService
 from quiz.services.quiz import QuizService
+from quiz.services.memory import (
+    MemoryCategoryService,
+    MemoryQuestionService,
+    MemoryQuizService,
+)
 from quiz.services.question import QuestionService
 
 
@@ -22,6 +76,25 @@ class TestCategoryService:
         assert fetched is not None
         assert fetched.title == title_example
 
+    def test_get_or_create_categories(self, category_service, category):
+        """Тестирует разрешение многих названий одной командой."""
+        with CaptureQueriesContext(connection) as queries:
+            categories = category_service.get_or_create_categories(
+                ['Math', category.title, 'Math', 'Art']
+            )
+        assert [c.title for c in categories] == ['Math', category.title, 'Art']
+        assert categories[1].pk == category.pk
+        assert Category.objects.count() == 3
+        # Чтение существующих, вставка недостающих, их перечитывание
+        # и запись в журнал изменений.
+        assert len(queries) == 4
+        with CaptureQueriesContext(connection) as queries:
+            again = category_service.get_or_create_categories(['Art', 'Math'])
+        # Существующие категории не перезаписываются.
+        assert len(queries) == 1
+        assert [c.pk for c in again] == [categories[2].pk, categories[0].pk]
+        assert category_service.create_category('Math').pk == categories[0].pk
+
     def test_update_category(self, category_service, category):
         """Тестирует обновление существующей категории."""
         updated = category_service.update_category(
@@ -34,6 +107,25 @@ class TestCategoryService:
         category_from_db = category_service.get_category(category.id)
         assert category_from_db.title == 'Update'
 
+    def test_delete_category_nullifies_questions_in_chunks(
+        self, settings, category_service, category, question_service, quiz
+    ):
+        """Тестирует, что вопросы удалённой категории остаются без категории."""
+        settings.QUIZ_DELETE_CHUNK_SIZE = 2
+        ids = [
+            question_service.create_question(quiz.id, {
+                'text': f'Q{index}',
+                'options': json.dumps(['A', 'B']),
+                'correct_answer': 'A',
+                'difficulty': Difficulty.EASY,
+                'category_id': category.id,
+            }).id
+            for index in range(5)
+        ]
+        category_service.delete_category(category.id)
+        assert not Question.objects.filter(category_id=category.id).exists()
+        assert Question.objects.filter(pk__in=ids).count() == 5
+
     def test_delete_category(self, category_service, category):
         """Тестирует удаление категории."""
         initial_count = len(category_service.list_categories())
@@ -123,6 +215,22 @@ class TestQuizService:
         with pytest.raises(Http404):
             quiz_service.update_quiz(99999, {'title': 'New'})
 
+    def test_delete_quiz_removes_questions_in_chunks(
+        self, settings, quiz_service, question_service, quiz
+    ):
+        """Тестирует порционное удаление вопросов вместе с квизом."""
+        settings.QUIZ_DELETE_CHUNK_SIZE = 2
+        for index in range(5):
+            question_service.create_question(quiz.id, {
+                'text': f'Q{index}',
+                'options': json.dumps(['A', 'B']),
+                'correct_answer': 'A',
+                'difficulty': Difficulty.EASY,
+            })
+        quiz_service.delete_quiz(quiz.id)
+        assert not Question.objects.filter(quiz_id=quiz.id).exists()
+        assert not Quiz.objects.filter(pk=quiz.id).exists()
+
     def test_delete_quiz(self, quiz_service, quiz):
         """Тестирует удаление квиза."""
         qid = quiz.id
@@ -178,6 +286,60 @@ class TestQuestionService:
         assert q1.id in question_ids
         assert q2.id in question_ids
 
+    def test_list_questions_defers_unrequested_fields(self, question_service, quiz):
+        """Тестирует, что незапрошенные поля не загружаются из БД."""
+        question_service.create_question(quiz.id, self._question_data(quiz.id))
+        questions = question_service.list_questions(('id', 'text', 'difficulty'))
+        deferred = questions[0].get_deferred_fields()
+        assert {'options', 'correct_answer', 'explanation'} <= deferred
+        assert 'text' not in deferred
+
+    def test_list_questions_with_filters(self, question_service, quiz, category):
+        """Тестирует фильтрацию вопросов по квизу, категории и сложности."""
+        other_quiz = Quiz.objects.create(title='Other')
+        hard = question_service.create_question(
+            quiz.id,
+            self._question_data(
+                quiz.id,
+                text='Hard',
+                difficulty=Difficulty.HARD,
+                category_id=category.id,
+            ),
+        )
+        question_service.create_question(
+            quiz.id,
+            self._question_data(quiz.id, text='Easy'),
+        )
+        question_service.create_question(
+            other_quiz.id,
+            self._question_data(other_quiz.id, text='Elsewhere'),
+        )
+        by_quiz = question_service.list_questions(filters={'quiz_id': quiz.id})
+        assert len(by_quiz) == 2
+        combined = question_service.list_questions(filters={
+            'quiz_id': quiz.id,
+            'category_id': category.id,
+            'difficulty': Difficulty.HARD,
+        })
+        assert [q.id for q in combined] == [hard.id]
+        assert question_service.count_questions({'quiz_id': quiz.id}) == 2
+
+    def test_count_questions_estimated_uses_statistics(self, question_service, quiz):
+        """Тестирует, что оценка количества берётся из статистики ANALYZE."""
+        for index in range(3):
+            question_service.create_question(
+                quiz.id,
+                self._question_data(quiz.id, text=f'Q{index}'),
+            )
+        assert question_service.count_questions(estimated=True) == 3
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        estimate = question_service.count_questions(
+            {'quiz_id': quiz.id},
+            estimated=True,
+        )
+        assert estimate == 3
+
     def test_get_question_returns_none_for_missing_id(self, question_service):
         """Тестирует, что get_question вызывает Http404 для несуществующего ID."""
         with pytest.raises(Http404):
@@ -242,6 +404,52 @@ class TestQuestionService:
         with pytest.raises(Http404):
             question_service.get_question(qid)
 
+    def test_bulk_update_and_delete(
+        self,
+        settings,
+        question_service,
+        quiz,
+        category,
+    ):
+        """Тестирует массовое изменение и удаление порциями."""
+        settings.QUIZ_DELETE_CHUNK_SIZE = 2
+        questions = [
+            question_service.create_question(
+                quiz.id,
+                self._question_data(quiz.id, text=f'Question {number}?'),
+            )
+            for number in range(5)
+        ]
+        ids = [question.id for question in questions]
+        last_change = ChangeLog.objects.order_by('-pk').first().pk
+
+        updated = question_service.bulk_update_questions(
+            {'difficulty': Difficulty.HARD},
+            filters={'quiz_id': quiz.id, 'difficulty': Difficulty.EASY},
+        )
+        assert updated == 5
+        assert question_service.count_questions({'difficulty': Difficulty.HARD}) == 5
+        changed = ChangeLog.objects.filter(pk__gt=last_change, model_name='question')
+        assert sorted(changed.values_list('object_id', flat=True)) == ids
+
+        updated = question_service.bulk_update_questions(
+            {'category': category},
+            question_ids=[ids[0], ids[1], ids[0], 99_999],
+        )
+        assert updated == 2
+        assert question_service.count_questions({'category_id': category.id}) == 2
+
+        with CaptureQueriesContext(connection) as queries:
+            deleted = question_service.bulk_delete_questions(
+                filters={'category_id': category.id},
+            )
+        assert deleted == 2
+        # Порция: выборка, DELETE, счётчики квиза и категории, журнал;
+        # затем пустая выборка и квизы.
+        assert len(queries) < 13
+        assert question_service.bulk_delete_questions(ids[2:4]) == 2
+        assert [q.id for q in question_service.list_questions(('id',))] == [ids[4]]
+
     @pytest.mark.parametrize(
         'right_answer',
         ('42', ' 42 ')
@@ -283,8 +491,1264 @@ class TestQuestionService:
         assert question.quiz_id == quiz.id
         assert question.id in (q1.id, q2.id)
 
+    @pytest.mark.parametrize('cached', (False, True))
+    def test_random_questions_from_quiz(
+        self,
+        settings,
+        tmp_path,
+        question_service,
+        quiz,
+        cached,
+    ):
+        """Тестирует выборку различных случайных вопросов квиза."""
+        if cached:
+            settings.QUIZ_SHARED_CACHE_PATH = tmp_path / 'cache'
+        difficulties = [Difficulty.EASY] * 3 + [Difficulty.HARD] * 2
+        ids = {
+            difficulty: [] for difficulty in (Difficulty.EASY, Difficulty.HARD)
+        }
+        for number, difficulty in enumerate(difficulties):
+            question = question_service.create_question(
+                quiz.id,
+                self._question_data(quiz.id, text=f'Q{number}', difficulty=difficulty),
+            )
+            ids[difficulty].append(question.id)
+
+        questions = question_service.random_questions_from_quiz(quiz.id, 4)
+        assert len({question.id for question in questions}) == 4
+        everything = question_service.random_questions_from_quiz(quiz.id, 10)
+        assert sorted(question.id for question in everything) == sorted(
+            ids[Difficulty.EASY] + ids[Difficulty.HARD]
+        )
+        hard = question_service.random_questions_from_quiz(
+            quiz.id,
+            10,
+            (Difficulty.HARD,),
+            ('id', 'difficulty'),
+        )
+        assert sorted(question.id for question in hard) == ids[Difficulty.HARD]
+        assert question_service.random_questions_from_quiz(
+            quiz.id,
+            3,
+            (Difficulty.MEDIUM,),
+        ) == []
+
+        bank = QuestionBank()
+        bank.load()
+        memory = MemoryQuestionService(bank)
+        easy = memory.random_questions_from_quiz(quiz.id, 2, (Difficulty.EASY,))
+        assert len(easy) == 2
+        assert {question.id for question in easy} <= set(ids[Difficulty.EASY])
+
+    def test_sample_from_pools(self):
+        """Тестирует выборку без повторений из нескольких пулов."""
+        rng = random.Random(1)
+        pools = [[1, 2], [], [10, 11, 12]]
+        sample = sample_from_pools(pools, 4, rng)
+        assert len(set(sample)) == 4
+        assert set(sample) <= {1, 2, 10, 11, 12}
+        assert sorted(sample_from_pools(pools, 10, rng)) == [1, 2, 10, 11, 12]
+        assert sample_from_pools([], 3, rng) == []
+
+    def test_practice_set(
+        self,
+        settings,
+        tmp_path,
+        question_service,
+        category_service,
+        quiz,
+    ):
+        """Тестирует стратифицированный набор вопросов из категорий."""
+        settings.QUIZ_SHARED_CACHE_PATH = tmp_path / 'cache'
+        first = category_service.create_category('First')
+        second = category_service.create_category('Second')
+        ids = {}
+        for number in range(12):
+            difficulty = (Difficulty.EASY, Difficulty.MEDIUM, Difficulty.HARD)[number % 3]
+            question = question_service.create_question(quiz.id, self._question_data(
+                quiz.id,
+                text=f'Q{number}',
+                category=(first, second)[number % 2],
+                difficulty=difficulty,
+            ))
+            ids[question.id] = difficulty
+        shares = {Difficulty.MEDIUM: 0.5, Difficulty.HARD: 0.25}
+
+        questions = question_service.practice_set([first.id, second.id], 4, shares, 7)
+        assert sorted(question.difficulty for question in questions) == [
+            Difficulty.EASY, Difficulty.HARD, Difficulty.MEDIUM, Difficulty.MEDIUM,
+        ]
+        again = question_service.practice_set([second.id, first.id], 4, shares, 7)
+        assert [q.id for q in again] == [q.id for q in questions]
+        bank = QuestionBank()
+        bank.load()
+        memory = MemoryQuestionService(bank).practice_set(
+            [first.id, second.id], 4, shares, 7,
+        )
+        assert [q.id for q in memory] == [q.id for q in questions]
+
+        # В слое HARD только 4 вопроса: набор получается меньше.
+        hard = question_service.practice_set(
+            [first.id, second.id], 10, {Difficulty.HARD: 1}, 1,
+        )
+        assert sorted(q.id for q in hard) == sorted(
+            question_id for question_id, difficulty in ids.items()
+            if difficulty == Difficulty.HARD
+        )
+        moved = next(q for q in hard if q.category_id == first.id)
+        question_service.update_question(moved.id, {'category': second})
+        only_first = question_service.practice_set(
+            [first.id], 10, {Difficulty.HARD: 1}, 1,
+        )
+        assert moved.id not in {q.id for q in only_first}
+
+    def test_allocate_and_strata(self):
+        """Тестирует деление числа вопросов между слоями сложностей."""
+        assert allocate(10, [0.5, 0.3, 0.2]) == [5, 3, 2]
+        assert allocate(7, [1, 1, 1]) == [3, 2, 2]
+        assert difficulty_strata({Difficulty.MEDIUM: 0.5, Difficulty.HARD: 0.3}) == [
+            (0.3, (Difficulty.HARD,)),
+            (0.5, (Difficulty.MEDIUM,)),
+            (pytest.approx(0.2), (Difficulty.EASY,)),
+        ]
+        assert difficulty_strata({Difficulty.EASY: 0.2, Difficulty.HARD: 0.8}) == [
+            (0.2, (Difficulty.EASY,)),
+            (0.8, (Difficulty.HARD,)),
+        ]
+
     def test_random_question_from_quiz_raises_when_empty(self, question_service):
         """Тестирует, что метод выбрасывает ValueError, если в квизе нет вопросов."""
         empty_quiz = Quiz.objects.create(title='Empty Quiz')
         with pytest.raises(ValueError, match='No questions found'):
             question_service.random_question_from_quiz(empty_quiz.id)
+
+
+_flaky_calls = []
+
+
+@jobs.register('test_flaky')
+def _flaky_job(context, fail_times):
+    """Тестовая задача, падающая заданное число раз."""
+    _flaky_calls.append(1)
+    if len(_flaky_calls) <= fail_times:
+        raise RuntimeError('boom')
+    context.set_progress(1, 1)
+    return {'calls': len(_flaky_calls)}
+
+
+@pytest.mark.django_db
+class TestJobs:
+    """Тесты подсистемы фоновых задач."""
+
+    def test_job_retries_until_success(self, settings):
+        """Тестирует повторный запуск упавшей задачи."""
+        settings.QUIZ_JOBS_EAGER = True
+        _flaky_calls.clear()
+        job = jobs.enqueue('test_flaky', fail_times=1)
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.attempts == 2
+        assert job.progress == 1.0
+        assert job.result == {'calls': 2}
+
+    def test_job_fails_after_max_attempts(self, settings):
+        """Тестирует, что задача помечается failed после всех попыток."""
+        settings.QUIZ_JOBS_EAGER = True
+        _flaky_calls.clear()
+        job = jobs.enqueue('test_flaky', fail_times=10)
+        assert job.status == JobStatus.FAILED
+        assert job.attempts == job.max_attempts
+        assert 'boom' in job.error
+
+    def test_cancel_pending_job(self, settings):
+        """Тестирует отмену задачи, которая ещё не начала выполняться."""
+        settings.QUIZ_JOBS_MODE = 'external'
+        job = jobs.enqueue('test_flaky', fail_times=0)
+        assert jobs.cancel(job.id).status == JobStatus.CANCELLED
+        assert jobs.claim_next() is None
+
+    def test_claim_next_takes_oldest_pending_job(self, settings):
+        """Тестирует, что обработчик забирает задачу ровно один раз."""
+        settings.QUIZ_JOBS_MODE = 'external'
+        first = jobs.enqueue('test_flaky', fail_times=0)
+        jobs.enqueue('test_flaky', fail_times=0)
+        claimed = jobs.claim_next()
+        assert claimed.id == first.id
+        assert claimed.status == JobStatus.RUNNING
+        assert jobs.claim_next().id != first.id
+
+    def test_failed_job_waits_before_retry(self, settings):
+        """Тестирует паузу перед повтором упавшей задачи."""
+        settings.QUIZ_JOBS_MODE = 'external'
+        settings.QUIZ_JOBS_RETRY_DELAY_SECONDS = 60
+        _flaky_calls.clear()
+        job = jobs.enqueue('test_flaky', fail_times=1)
+        jobs.run_job(jobs.claim_next().id)
+        job.refresh_from_db()
+        assert job.status == JobStatus.PENDING
+        assert job.next_attempt_at > timezone.now()
+        assert jobs.claim_next() is None
+        assert jobs.retry_delay(3) == timedelta(minutes=4)
+
+        Job.objects.filter(pk=job.id).update(next_attempt_at=timezone.now())
+        assert jobs.claim_next().id == job.id
+
+    def test_stale_running_jobs_are_requeued(self, settings):
+        """Тестирует возврат в очередь задач упавшего воркера."""
+        settings.QUIZ_JOBS_MODE = 'external'
+        settings.QUIZ_JOBS_STALE_SECONDS = 60
+        retried = jobs.enqueue('test_flaky', fail_times=0)
+        exhausted = jobs.enqueue('test_flaky', fail_times=0)
+        alive = jobs.enqueue('test_flaky', fail_times=0)
+        for job in (retried, exhausted, alive):
+            assert jobs.claim_next().id == job.id
+        long_ago = timezone.now() - timedelta(minutes=5)
+        Job.objects.filter(pk__in=(retried.id, exhausted.id)).update(
+            heartbeat_at=long_ago,
+            attempts=1,
+        )
+        Job.objects.filter(pk=exhausted.id).update(max_attempts=1)
+
+        assert jobs.claim_next().id == retried.id
+        exhausted.refresh_from_db()
+        assert exhausted.status == JobStatus.FAILED
+        assert exhausted.error == jobs.STALE_JOB_ERROR
+        alive.refresh_from_db()
+        assert alive.status == JobStatus.RUNNING
+        assert jobs.claim_next() is None
+
+    def test_heartbeat(self, settings):
+        """Тестирует отметку о работе выполняющейся задачи."""
+        settings.QUIZ_JOBS_MODE = 'external'
+        settings.QUIZ_JOBS_HEARTBEAT_SECONDS = 0
+        job = jobs.enqueue('test_flaky', fail_times=0)
+        jobs.claim_next()
+        Job.objects.filter(pk=job.id).update(heartbeat_at=None)
+        jobs.JobContext(job.id).check_cancelled()
+        job.refresh_from_db()
+        assert job.heartbeat_at is not None
+
+
+@pytest.mark.django_db
+class TestStartup:
+    """Тесты профилирования и прогрева процесса."""
+
+    def test_parse_import_times(self):
+        """Тестирует разбор вывода python -X importtime."""
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        450 | quiz.models\n'
+            'unrelated line\n'
+        )
+        assert parse_import_times(output) == [('quiz.models', 120, 450)]
+
+    def test_profile_fails_with_child_exit_code(self, monkeypatch):
+        """Тестирует, что падение профилируемого процесса — ошибка команды."""
+        monkeypatch.setenv('DJANGO_SETTINGS_MODULE', 'missing_settings_module')
+        err = io.StringIO()
+        with pytest.raises(CommandError, match='exit code 1') as error:
+            call_command('startup_profile', stdout=io.StringIO(), stderr=err)
+        assert error.value.returncode == 1
+        assert 'missing_settings_module' in err.getvalue()
+        assert 'import time:' not in err.getvalue()
+
+    def test_preload_runs_warmup_hooks(self, monkeypatch, settings, tmp_path):
+        """Тестирует, что preload вызывает зарегистрированные хуки прогрева."""
+        settings.QUIZ_SCHEMA_PATH = tmp_path / 'openapi.json'
+        monkeypatch.setattr(preload_module.gc, 'freeze', lambda: None)
+        monkeypatch.setattr('quiz.autocomplete._index', None)
+        calls = []
+        monkeypatch.setattr(
+            preload_module,
+            '_warmup_hooks',
+            [lambda: calls.append('hook')],
+        )
+        preload_module.preload()
+        assert calls == ['hook']
+
+
+class TestReplicaRouting:
+    """Тесты маршрутизации чтений в реплики."""
+
+    @pytest.fixture(autouse=True)
+    def replicas(self, settings):
+        """Включает одну реплику и сбрасывает привязку к основной базе."""
+        settings.QUIZ_READ_REPLICAS = ['replica_1']
+        settings.QUIZ_REPLICA_PIN_SECONDS = 5
+        token = routers.reset_pinning()
+        yield
+        routers.restore_pinning(token)
+
+    def test_reads_go_to_replica_until_write(self):
+        """Тестирует, что после записи чтения идут в основную базу."""
+        router = routers.ReadWriteRouter()
+        assert router.db_for_read(Question) == 'replica_1'
+        assert router.db_for_read(Job) is None
+        assert router.db_for_write(Category) == 'default'
+        assert router.db_for_read(Question) is None
+
+    def test_middleware_sets_cookie_after_write(self):
+        """Тестирует cookie, закрепляющую клиента за основной базой."""
+        def write_view(request):
+            routers.ReadWriteRouter().db_for_write(Quiz)
+            return HttpResponse()
+
+        response = ReplicaPinningMiddleware(write_view)(RequestFactory().post('/'))
+        assert response.cookies[PIN_PRIMARY_COOKIE]['max-age'] == 5
+        assert not routers.is_pinned_to_primary()
+
+    def test_middleware_honours_cookie_without_refreshing_it(self):
+        """Тестирует чтение из основной базы по cookie без её продления."""
+        reads = []
+
+        def read_view(request):
+            reads.append(routers.ReadWriteRouter().db_for_read(Question))
+            return HttpResponse()
+
+        request = RequestFactory().get('/')
+        request.COOKIES[PIN_PRIMARY_COOKIE] = '1'
+        response = ReplicaPinningMiddleware(read_view)(request)
+        assert reads == [None]
+        assert PIN_PRIMARY_COOKIE not in response.cookies
+
+    def test_sync_sqlite_file_replaces_replica(self, tmp_path):
+        """Тестирует копирование основной базы в файл реплики."""
+        source, target = tmp_path / 'primary.sqlite3', tmp_path / 'replica.sqlite3'
+        with sqlite3.connect(source) as primary:
+            primary.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+            primary.execute('INSERT INTO item VALUES (1)')
+        primary.close()
+        target.write_bytes(b'stale')
+        sync_sqlite_file(source, target)
+        replica = sqlite3.connect(target)
+        assert replica.execute('SELECT id FROM item').fetchall() == [(1,)]
+        replica.close()
+        assert not target.with_name('replica.sqlite3.tmp').exists()
+
+
+class TestSharding:
+    """Тесты раскладки квизов и вопросов по шардам."""
+
+    def _create_quizzes(self, quiz_service, titles):
+        """Создаёт квизы и возвращает их по названию."""
+        return {
+            title: quiz_service.create_quiz({'title': title})
+            for title in titles
+        }
+
+    def test_quizzes_are_spread_and_merged(self, shards, quiz_service):
+        """Тестирует раскладку квизов по шардам и слияние списков."""
+        quizzes = self._create_quizzes(quiz_service, ('Alpha', 'Beta', 'Delta', 'Gamma'))
+        used = {quiz._state.db for quiz in quizzes.values()}
+        assert used == set(shards)
+        for quiz in quizzes.values():
+            assert sharding.shard_for_id(quiz.id) == quiz._state.db
+            assert quiz_service.get_quiz(quiz.id).title == quiz.title
+        titles = [quiz.title for quiz in quiz_service.list_quizzes(('id',))]
+        assert titles == ['Alpha', 'Beta', 'Delta', 'Gamma']
+        found = quiz_service.get_quizzes_by_title('a', ('title',))
+        assert len(found) == 4
+        assert not Quiz.objects.using('default').exists()
+
+    def test_quiz_title_is_unique_across_shards(self, shards, quiz_service):
+        """Тестирует проверку уникальности названия во всех шардах."""
+        quizzes = self._create_quizzes(quiz_service, ('Alpha', 'Beta', 'Delta', 'Gamma'))
+        other = next(
+            title for title, quiz in quizzes.items()
+            if quiz._state.db != quizzes['Alpha']._state.db
+        )
+        with pytest.raises(ValidationError):
+            quiz_service.update_quiz(quizzes[other].id, {'title': 'Alpha'})
+        with pytest.raises(ValidationError):
+            quiz_service.create_quiz({'title': 'Alpha'})
+
+    def test_new_category_replaces_stale_shard_copy(
+        self,
+        shards,
+        quiz_service,
+        question_service,
+        category_service,
+    ):
+        """Тестирует копирование категории в шард с тем же названием."""
+        quiz = quiz_service.create_quiz({'title': 'Alpha'})
+        alias = quiz._state.db
+        question = question_service.create_question(quiz.id, {
+            'text': 'Stale?',
+            'options': json.dumps(['A', 'B']),
+            'correct_answer': 'A',
+            'difficulty': Difficulty.EASY,
+        })
+        Category.objects.using(alias).create(pk=900, title='History')
+        Question.objects.using(alias).filter(pk=question.pk).update(category_id=900)
+
+        [category] = category_service.get_or_create_categories(['History'])
+
+        assert category.pk != 900
+        for shard in shards:
+            assert list(
+                Category.objects.using(shard).values_list('pk', 'title')
+            ) == [(category.pk, 'History')]
+        assert Question.objects.using(alias).get(pk=question.pk).category_id == category.pk
+
+    def test_questions_live_in_quiz_shard(
+        self,
+        shards,
+        quiz_service,
+        question_service,
+        category_service,
+    ):
+        """Тестирует запросы к вопросам в одном шарде и во всех шардах."""
+        category = category_service.create_category('Shared')
+        quizzes = self._create_quizzes(quiz_service, ('Alpha', 'Beta', 'Delta', 'Gamma'))
+        for difficulty, quiz in zip(
+            (Difficulty.HARD, Difficulty.EASY, Difficulty.MEDIUM, Difficulty.EASY),
+            quizzes.values(),
+            strict=True,
+        ):
+            question_service.create_question(quiz.id, {
+                'text': f'{quiz.title}?',
+                'options': json.dumps(['A', 'B']),
+                'correct_answer': 'A',
+                'category': category,
+                'difficulty': difficulty,
+            })
+        alpha = quizzes['Alpha']
+        [question] = question_service.get_questions_for_quiz(alpha.id)
+        assert question._state.db == alpha._state.db
+        assert question.category.title == 'Shared'
+        assert question_service.check_answer(question.id, 'A')
+
+        questions = question_service.list_questions(('id',))
+        assert [q.difficulty for q in questions] == [
+            'easy', 'easy', 'hard', 'medium',
+        ]
+        assert question_service.count_questions({'category_id': category.id}) == 4
+
+        assert question_service.bulk_update_questions(
+            {'difficulty': Difficulty.MEDIUM},
+            filters={'difficulty': Difficulty.EASY},
+        ) == 2
+        assert question_service.bulk_update_questions(
+            {'difficulty': Difficulty.EASY},
+            question_ids=[q.id for q in question_service.list_questions(('id',))],
+        ) == 4
+
+        [renamed] = category_service.get_or_create_categories(['Other'])
+        for alias in shards:
+            assert Category.objects.using(alias).get(pk=renamed.pk).title == 'Other'
+
+        category_service.delete_category(category.id)
+        assert question_service.count_questions({'category_id': category.id}) == 0
+        assert question_service.delete_question(question.id) is None
+        quiz_service.delete_quiz(alpha.id)
+        assert question_service.count_questions() == 3
+
+
+@pytest.mark.django_db
+class TestSnapshots:
+    """Тесты публикации снимков квизов."""
+
+    def test_publish_is_incremental(self, settings, tmp_path, quiz, question):
+        """Тестирует, что перерисовываются только изменившиеся квизы."""
+        settings.QUIZ_SNAPSHOT_DIR = tmp_path
+        other = Quiz.objects.create(title='Other quiz')
+        assert snapshots.publish() == snapshots.PublishResult(2, 0, 0)
+        entry = snapshots.load_manifest()['quizzes'][str(quiz.id)]
+        content = json.loads((tmp_path / entry['file']).read_bytes())
+        assert content['title'] == quiz.title
+        assert [q['id'] for q in content['questions']] == [question.id]
+        assert 'correct_answer' not in content['questions'][0]
+
+        assert snapshots.publish() == snapshots.PublishResult(0, 2, 0)
+
+        question.text = 'Changed?'
+        question.save()
+        other.delete()
+        assert snapshots.publish() == snapshots.PublishResult(1, 0, 1)
+        assert not (tmp_path / entry['file']).exists()
+        assert sorted(path.name for path in tmp_path.iterdir()) == [
+            snapshots.MANIFEST_NAME,
+            snapshots.load_manifest()['quizzes'][str(quiz.id)]['file'],
+        ]
+
+
+@pytest.mark.django_db
+class TestQuestionBank:
+    """Тесты банка вопросов в памяти и сервисов поверх него."""
+
+    @pytest.fixture
+    def bank(self, settings):
+        """Банк с журналом изменений и проверкой журнала на каждом чтении."""
+        settings.QUIZ_CHANGE_LOG = True
+        settings.QUIZ_BANK_REFRESH_SECONDS = 3600
+        bank = QuestionBank()
+        bank.load()
+        return bank
+
+    def _create_question(self, quiz, text, difficulty=Difficulty.EASY, **data):
+        """Создаёт вопрос напрямую в БД."""
+        return Question.objects.create(
+            quiz=quiz,
+            text=text,
+            options=json.dumps(['A', 'B']),
+            correct_answer='A',
+            difficulty=difficulty.value,
+            **data,
+        )
+
+    def test_expand_uses_bank_objects(self, bank, quiz, category):
+        """Тестирует раскрытие связей из памяти без запросов к БД."""
+        question = self._create_question(quiz, 'What is Python?', category=category)
+        bank.load()
+        service = MemoryQuestionService(bank)
+        with CaptureQueriesContext(connection) as queries:
+            [found] = service.list_questions(expand=('category', 'quiz'))
+            assert found.category.title == category.title
+            assert found.quiz.title == quiz.title
+            assert service.get_question(question.pk, expand=('quiz',)).quiz.pk == quiz.pk
+        assert len(queries) == 0
+
+    def test_reads_do_not_query_database(self, bank, quiz, category):
+        """Тестирует, что чтения банка обходятся без запросов к БД."""
+        first = self._create_question(quiz, 'What is Python?', category=category)
+        self._create_question(quiz, 'What is Django?', Difficulty.HARD)
+        bank.load()
+        questions = MemoryQuestionService(bank)
+        quizzes = MemoryQuizService(bank)
+        categories = MemoryCategoryService(bank)
+
+        with CaptureQueriesContext(connection) as queries:
+            assert [q.text for q in questions.list_questions()] == [
+                'What is Python?',
+                'What is Django?',
+            ]
+            assert questions.count_questions({'category_id': category.id}) == 1
+            assert [q.pk for q in questions.get_questions_by_text('PYTH')] == [
+                first.pk,
+            ]
+            assert questions.get_questions_by_text('is') != []
+            assert questions.check_answer(first.pk, ' A ')
+            assert not questions.check_answer(first.pk, 'B')
+            assert questions.random_question_from_quiz(quiz.pk).quiz_id == quiz.pk
+            assert quizzes.get_quizzes_by_title('default')[0].pk == quiz.pk
+            assert categories.get_category(category.pk).title == category.title
+        assert len(queries) == 0
+
+        with pytest.raises(Http404):
+            questions.get_question(first.pk + 100)
+        with pytest.raises(ValueError):
+            questions.random_question_from_quiz(quiz.pk + 100)
+
+    def test_refresh_applies_change_log(self, bank, quiz, category):
+        """Тестирует инкрементальное обновление банка по журналу."""
+        question = self._create_question(quiz, 'Old text', category=category)
+        other = Quiz.objects.create(title='Other quiz')
+        self._create_question(other, 'Other question')
+        bank.refresh(force=True)
+        assert bank.count_questions() == 2
+
+        question.text = 'New text'
+        question.save()
+        bank.refresh(force=True)
+        assert bank.search_questions('old') == []
+        assert bank.question(question.pk).text == 'New text'
+
+        CategoryService().delete_category(category.pk)
+        QuizService().delete_quiz(other.pk)
+        bank.refresh(force=True)
+        assert bank.categories() == []
+        assert bank.question(question.pk).category_id is None
+        assert [q.pk for q in bank.quizzes()] == [quiz.pk]
+        assert bank.count_questions() == 1
+
+        QuestionService().delete_question(question.pk)
+        bank.refresh(force=True)
+        assert bank.question(question.pk) is None
+        assert bank.random_question(quiz.pk) is None
+        assert ChangeLog.objects.exists()
+
+    def test_memory_service_sees_own_writes(self, bank, quiz):
+        """Тестирует, что запись через сервис сразу видна в банке."""
+        service = MemoryQuestionService(bank)
+        question = service.create_question(quiz.pk, {
+            'text': 'Fresh?',
+            'options': json.dumps(['A', 'B']),
+            'correct_answer': 'B',
+            'difficulty': Difficulty.MEDIUM.value,
+        })
+        assert service.check_answer(question.pk, 'B')
+        service.update_question(question.pk, {'correct_answer': 'A'})
+        assert service.check_answer(question.pk, 'A')
+
+    def test_backend_setting_selects_service(self, settings, monkeypatch, bank):
+        """Тестирует выбор реализации сервисов настройкой."""
+        monkeypatch.setattr('quiz.bank._bank', bank)
+        assert isinstance(get_question_service(), QuestionService)
+        settings.QUIZ_SERVICE_BACKEND = 'memory'
+        assert isinstance(get_question_service(), MemoryQuestionService)
+        settings.QUIZ_SERVICE_BACKEND = 'unknown'
+        with pytest.raises(ImproperlyConfigured):
+            get_question_service()
+
+
+class TestSharedCache:
+    """Тесты общего кэша в разделяемой памяти."""
+
+    def test_mappings_share_values(self, tmp_path):
+        """Тестирует, что значения видны всем отображениям файла."""
+        path = tmp_path / 'cache'
+        writer = sharedcache.SharedCache(path, 8, 1024)
+        reader = sharedcache.SharedCache(path, 8, 1024)
+        generation = reader.generation()
+        assert writer.put(sharedcache.ANSWER_KEY, 1, b'A', generation)
+        assert reader.get(sharedcache.ANSWER_KEY, 1) == b'A'
+        assert reader.get(sharedcache.QUIZ_ROW, 1) is None
+
+        writer.invalidate([(sharedcache.ANSWER_KEY, 1)])
+        assert reader.get(sharedcache.ANSWER_KEY, 1) is None
+        assert not reader.put(sharedcache.ANSWER_KEY, 1, b'stale', generation)
+        assert reader.generation() == generation + 1
+
+    def test_overflow_starts_new_epoch(self, tmp_path):
+        """Тестирует очистку кэша при переполнении области данных."""
+        cache = sharedcache.SharedCache(tmp_path / 'cache', 8, 16)
+        for object_id in range(1, 9):
+            assert cache.put(
+                sharedcache.QUIZ_QUESTIONS,
+                object_id,
+                b'12345678',
+                cache.generation(),
+            )
+        assert cache.get(sharedcache.QUIZ_QUESTIONS, 8) == b'12345678'
+        assert cache.get(sharedcache.QUIZ_QUESTIONS, 1) is None
+        cache.clear()
+        assert cache.get(sharedcache.QUIZ_QUESTIONS, 8) is None
+
+    @pytest.mark.django_db
+    def test_services_read_through_cache(
+        self,
+        settings,
+        tmp_path,
+        quiz_service,
+        question_service,
+        quiz,
+        question,
+    ):
+        """Тестирует чтение через кэш и сброс записей сигналами."""
+        settings.QUIZ_SHARED_CACHE_PATH = tmp_path / 'cache'
+        assert question_service.check_answer(question.pk, 'A')
+        assert quiz_service.get_quiz(quiz.pk).title == quiz.title
+        with CaptureQueriesContext(connection) as queries:
+            assert question_service.check_answer(question.pk, 'A')
+            cached = quiz_service.get_quiz(quiz.pk)
+        assert len(queries) == 0
+        assert cached.updated_at == Quiz.objects.get(pk=quiz.pk).updated_at
+
+        question_service.update_question(question.pk, {'correct_answer': 'B'})
+        assert question_service.check_answer(question.pk, 'B')
+        assert quiz_service.get_quiz(quiz.pk).updated_at > cached.updated_at
+        assert question_service.random_question_from_quiz(quiz.pk).pk == question.pk
+
+        quiz_service.delete_quiz(quiz.pk)
+        with pytest.raises(Http404):
+            question_service.check_answer(question.pk, 'B')
+        with pytest.raises(ValueError):
+            question_service.random_question_from_quiz(quiz.pk)
+
+
+class TestAutocomplete:
+    """Тесты индекса подсказок."""
+
+    def test_prefix_index_search(self):
+        """Тестирует поиск по префиксам слов и удаление объектов."""
+        index = PrefixIndex()
+        index.load([(1, 'Python basics'), (2, 'Advanced Python'), (3, 'Pytest')])
+        assert index.search('py', 10) == [
+            (3, 'Pytest'),
+            (1, 'Python basics'),
+            (2, 'Advanced Python'),
+        ]
+        assert index.search('PYTHON adv', 10) == [(2, 'Advanced Python')]
+        assert index.search('pyth', 1) == [(1, 'Python basics')]
+        assert index.search('!!', 10) == []
+
+        index.set(1, None)
+        index.set(3, 'Unit tests')
+        assert index.search('py', 10) == [(2, 'Advanced Python')]
+        assert index.search('unit', 10) == [(3, 'Unit tests')]
+
+    @pytest.mark.django_db
+    def test_index_follows_change_log(self, settings, quiz, question, category):
+        """Тестирует инкрементальное обновление индекса по журналу."""
+        settings.QUIZ_CHANGE_LOG = True
+        index = AutocompleteIndex()
+        index.load()
+        assert index.suggest('quiz', 'def', 10) == [(quiz.pk, quiz.title)]
+        assert index.suggest('question', 'default quest', 10) == [
+            (question.pk, question.text),
+        ]
+        assert index.suggest('category', 'cat', 10) == [
+            (category.pk, category.title),
+        ]
+
+        QuizService().update_quiz(quiz.pk, {'title': 'Renamed quiz'})
+        index.refresh(force=True)
+        assert index.suggest('quiz', 'def', 10) == []
+        assert index.suggest('quiz', 'ren', 10) == [(quiz.pk, 'Renamed quiz')]
+
+        QuizService().delete_quiz(quiz.pk)
+        index.refresh(force=True)
+        assert index.suggest('quiz', 'ren', 10) == []
+        assert index.suggest('question', 'default', 10) == []
+
+
+class TestDuplicates:
+    """Тесты поиска дубликатов вопросов."""
+
+    def test_content_hash_ignores_formatting(self):
+        """Тестирует, что хэш не зависит от регистра, пунктуации и порядка."""
+        assert normalize_text('  What IS   Python?! ') == 'what is python'
+        assert question_content_hash(
+            'What is Python?',
+            json.dumps(['A snake', 'A language']),
+        ) == question_content_hash(
+            'what  is python',
+            ['a language', 'A snake.'],
+        )
+        assert question_content_hash('What is Python?', ['A', 'B']) != (
+            question_content_hash('What is Python?', ['A', 'C'])
+        )
+
+    @pytest.mark.django_db
+    def test_create_rejects_duplicate(self, question_service, quiz, question):
+        """Тестирует отказ в создании дубликата внутри квиза."""
+        data = {
+            'text': 'DEFAULT question',
+            'options': json.dumps(['c', 'b', 'a']),
+            'correct_answer': 'A',
+            'difficulty': Difficulty.HARD.value,
+        }
+        with pytest.raises(ValidationError):
+            question_service.create_question(quiz.id, dict(data))
+        other = Quiz.objects.create(title='Other quiz')
+        assert question_service.create_question(other.id, dict(data)).content_hash == (
+            question.content_hash
+        )
+
+    @pytest.mark.django_db
+    def test_update_rejects_duplicate(self, question_service, quiz, question):
+        """Тестирует отказ в изменении вопроса в дубликат другого."""
+        other_quiz = Quiz.objects.create(title='Other quiz')
+        data = {
+            'text': 'Another question',
+            'options': json.dumps(['a', 'b', 'c']),
+            'correct_answer': 'a',
+            'difficulty': Difficulty.HARD.value,
+        }
+        other = question_service.create_question(quiz.id, dict(data))
+        moved = question_service.create_question(other_quiz.id, {
+            **data,
+            'text': question.text,
+        })
+
+        with pytest.raises(ValidationError):
+            question_service.update_question(other.id, {'text': 'default QUESTION'})
+        with pytest.raises(ValidationError):
+            question_service.update_question(moved.id, {'quiz': quiz})
+        # Сам вопрос дубликатом себя не считается.
+        updated = question_service.update_question(
+            question.id,
+            {'text': question.text + '!'},
+        )
+        assert updated.text.endswith('!')
+
+        duplicate = Question(quiz=quiz, text='Default question', options=question.options)
+        with pytest.raises(DjangoValidationError):
+            duplicate.clean()
+        Question.objects.get(pk=other.pk).clean()
+
+    @pytest.mark.django_db
+    def test_find_duplicates_command(self, quiz, question):
+        """Тестирует отчёт о существующих дубликатах."""
+        copy = Question.objects.get(pk=question.pk)
+        copy.pk = None
+        copy.text = 'Default question!!'
+        copy.save()
+        Question.objects.filter(pk=copy.pk).update(content_hash='stale')
+
+        out = io.StringIO()
+        call_command('find_duplicates', stdout=out)
+        assert 'Found 0 duplicate groups' in out.getvalue()
+
+        out = io.StringIO()
+        call_command('find_duplicates', '--rehash', stdout=out)
+        assert f'quiz {quiz.id}: 2 copies of question {question.pk}' in out.getvalue()
+        assert 'Found 1 duplicate groups' in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestNearDuplicates:
+    """Тесты поиска почти одинаковых вопросов."""
+
+    def test_reworded_questions_are_clustered(self, settings, quiz):
+        """Тестирует, что переформулированные вопросы попадают в кластер."""
+        texts = (
+            'What is the capital of France?',
+            'What is the capital city of France?',
+            'Which planet is known as the red planet?',
+            'How many legs does a spider have?',
+        )
+        questions = [
+            Question.objects.create(
+                quiz=quiz,
+                text=text,
+                options=json.dumps(['Paris', 'Lyon', 'Mars', 'Eight']),
+                correct_answer='Paris',
+                difficulty=Difficulty.EASY.value,
+            )
+            for text in texts
+        ]
+        DuplicateCluster.objects.create(question_ids=[1, 2], size=2, similarity=1)
+
+        out = io.StringIO()
+        call_command('find_near_duplicates', stdout=out)
+        assert '4 questions checked, 1 clusters written' in out.getvalue()
+        cluster = DuplicateCluster.objects.get()
+        assert cluster.question_ids == [questions[0].pk, questions[1].pk]
+        assert 0.6 <= cluster.similarity < 1
+
+        settings.QUIZ_JOBS_EAGER = True
+        job = jobs.enqueue('find_near_duplicates', threshold=1.0)
+        job.refresh_from_db()
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.result == {'questions': 4, 'clusters': 0}
+
+    def test_without_questions(self):
+        """Тестирует поиск в пустой базе: старые кластеры удаляются."""
+        DuplicateCluster.objects.create(question_ids=[1, 2], size=2, similarity=1)
+
+        result = neardup.find_near_duplicates()
+
+        assert result == neardup.ClusteringResult(questions=0, clusters=0)
+        assert not DuplicateCluster.objects.exists()
+
+    def test_cluster_signatures_without_candidates(self):
+        """Тестирует кластеризацию пустого и несвязанного наборов."""
+        labels, similarity = neardup.cluster_signatures(
+            neardup.minhash_signatures([])
+        )
+        assert len(labels) == len(similarity) == 0
+        labels, _ = neardup.cluster_signatures(
+            neardup.minhash_signatures(['abc', 'completely different text'])
+        )
+        assert labels.tolist() == [0, 1]
+
+
+@pytest.mark.django_db
+class TestRelatedQuestions:
+    """Тесты индекса похожих вопросов."""
+
+    def _create(self, quiz, text):
+        """Создаёт вопрос с заданным текстом."""
+        return Question.objects.create(
+            quiz=quiz,
+            text=text,
+            options=json.dumps(['Yes', 'No']),
+            correct_answer='Yes',
+            difficulty=Difficulty.EASY.value,
+        )
+
+    def test_build_and_update(self, settings, tmp_path, quiz):
+        """Тестирует полную сборку и дополнение индекса."""
+        settings.QUIZ_RELATED_DIR = tmp_path
+        france = self._create(quiz, 'What is the capital of France?')
+        spider = self._create(quiz, 'How many legs does a spider have?')
+        paris = self._create(quiz, 'Is Paris the capital of France?')
+
+        out = io.StringIO()
+        call_command('build_related_questions', '--full', stdout=out)
+        assert '3 questions indexed, 3 added' in out.getvalue()
+        assert related.related_question_ids(france.pk, 1) == [paris.pk]
+        assert len(related.related_question_ids(france.pk, 5)) == 2
+
+        legs = self._create(quiz, 'How many legs does an ant have?')
+        # Вопрос не в индексе: рекомендаций нет до обновления.
+        assert related.related_question_ids(legs.pk, 1) == []
+
+        settings.QUIZ_JOBS_EAGER = True
+        job = jobs.enqueue('build_related_questions')
+        job.refresh_from_db()
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.result == {'questions': 4, 'added': 1}
+        assert related.related_question_ids(spider.pk, 1) == [legs.pk]
+        assert related.RelatedIndex.current().related_ids(legs.pk, 1) == [spider.pk]
+
+        self._create(quiz, 'Which river flows through Paris?')
+        assert related.update().added == 1
+        # Остаются текущая и предыдущая версии.
+        assert len([path for path in tmp_path.iterdir() if path.is_dir()]) == 2
+
+    def test_update_across_shards(self, settings, tmp_path, shards, quiz_service, question_service):
+        """Тестирует дополнение индекса вопросами всех шардов."""
+        settings.QUIZ_RELATED_DIR = tmp_path
+        quizzes = [
+            quiz_service.create_quiz({'title': title})
+            for title in ('Alpha', 'Beta', 'Delta', 'Gamma')
+        ]
+        first, second = (
+            next(quiz for quiz in quizzes if quiz._state.db == alias)
+            for alias in shards
+        )
+
+        def create(quiz, text):
+            """Создаёт вопрос в шарде квиза."""
+            return question_service.create_question(quiz.id, {
+                'text': text,
+                'options': json.dumps(['Yes', 'No']),
+                'correct_answer': 'Yes',
+                'difficulty': Difficulty.EASY,
+            })
+
+        create(first, 'What is the capital of France?')
+        create(second, 'How many legs does a spider have?')
+        related.build()
+
+        france = create(first, 'Is Paris the capital of France?')
+        legs = create(second, 'How many legs does an ant have?')
+        assert related.update() == related.RelatedIndexResult(questions=4, added=2)
+
+        index = related.RelatedIndex.current()
+        assert np.all(np.diff(index.ids) > 0)
+        assert len(index.related_ids(france.pk, 1)) == 1
+        assert len(index.related_ids(legs.pk, 1)) == 1
+        assert related.update().added == 0
+
+    def test_without_index(self, settings, tmp_path, quiz):
+        """Тестирует, что без собранного индекса рекомендаций нет."""
+        settings.QUIZ_RELATED_DIR = tmp_path
+        question = self._create(quiz, 'What is the capital of France?')
+        assert related.related_question_ids(question.pk, 5) == []
+
+    def test_top_neighbors_blocks(self, monkeypatch):
+        """Тестирует, что поиск блоками совпадает с полным перебором."""
+        monkeypatch.setattr(related, 'QUERY_BLOCK', 3)
+        monkeypatch.setattr(related, 'BASE_BLOCK', 4)
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((10, 8)).astype(np.float32)
+        ids = np.arange(1, 11)
+        neighbors, scores = related.top_neighbors(vectors, vectors, ids, ids, 3)
+
+        similarity = vectors @ vectors.T
+        np.fill_diagonal(similarity, -np.inf)
+        expected = np.argsort(-similarity, axis=1)[:, :3] + 1
+        assert neighbors.tolist() == expected.tolist()
+        assert np.allclose(scores, np.sort(similarity, axis=1)[:, ::-1][:, :3])
+
+
+@pytest.mark.django_db
+class TestAnswerMatching:
+    """Тесты политик проверки ответа."""
+
+    @pytest.mark.parametrize(
+        ('policy', 'correct', 'aliases', 'tolerance', 'accepted', 'rejected'),
+        (
+            (MatchPolicy.EXACT, ' Paris ', [], 0, ('Paris',), ('paris',)),
+            (
+                MatchPolicy.CASEFOLD,
+                'New  York',
+                [],
+                0,
+                ('new york', ' NEW YORK '),
+                ('NewYork',),
+            ),
+            (MatchPolicy.NUMERIC, '3', [], 0, ('3.0', '3,00', ' 3 '), ('3.1', 'x')),
+            (MatchPolicy.NUMERIC, '3.14', [], 0.01, ('3.141', '3.15'), ('3.2',)),
+            (
+                MatchPolicy.ALIASES,
+                'USA',
+                ['United States', 'US'],
+                0,
+                ('usa', 'united states'),
+                ('America',),
+            ),
+        ),
+    )
+    def test_policies(
+        self,
+        question_service,
+        quiz,
+        policy,
+        correct,
+        aliases,
+        tolerance,
+        accepted,
+        rejected,
+    ):
+        """Тестирует сравнение ответа по каждой политике."""
+        question = Question.objects.create(
+            quiz=quiz,
+            text='Question?',
+            options=json.dumps(['A', 'B']),
+            correct_answer=correct,
+            match_policy=policy,
+            answer_aliases=aliases,
+            answer_tolerance=tolerance,
+            difficulty=Difficulty.EASY.value,
+        )
+        for answer in accepted:
+            assert question_service.check_answer(question.pk, answer), answer
+        for answer in rejected:
+            assert not question_service.check_answer(question.pk, answer), answer
+
+    def test_clean_rejects_non_numeric_answers(self, quiz):
+        """Тестирует проверку числовых ответов в Question.clean."""
+        question = Question(
+            quiz=quiz,
+            text='How many legs does a spider have?',
+            options=json.dumps(['6', '8']),
+            correct_answer='8',
+            answer_aliases=['eight'],
+            match_policy=MatchPolicy.NUMERIC,
+            difficulty=Difficulty.EASY,
+        )
+        with pytest.raises(DjangoValidationError) as error:
+            question.clean()
+        assert set(error.value.message_dict) == {'answer_aliases'}
+        question.answer_aliases = ['8.0']
+        question.clean()
+        question.match_policy = MatchPolicy.EXACT
+        question.correct_answer = 'eight'
+        question.clean()
+
+    def test_accepted_answers_are_stored(self, settings, tmp_path, quiz):
+        """Тестирует пересчёт принятых форм при сохранении и чтение из кэшей."""
+        settings.QUIZ_SHARED_CACHE_PATH = tmp_path / 'cache'
+        question = Question.objects.create(
+            quiz=quiz,
+            text='Capital of the USA?',
+            options=json.dumps(['Washington', 'New York']),
+            correct_answer='Washington',
+            difficulty=Difficulty.EASY.value,
+        )
+        assert question.accepted_answers == ['Washington']
+        service = QuestionService()
+        assert not service.check_answer(question.pk, 'washington')
+
+        service.update_question(question.pk, {
+            'match_policy': MatchPolicy.ALIASES,
+            'answer_aliases': ['Washington, D.C.'],
+        })
+        question.refresh_from_db()
+        assert question.accepted_answers == ['washington', 'washington, d.c.']
+        assert service.check_answer(question.pk, 'WASHINGTON, D.C.')
+
+        question.correct_answer = 'New York'
+        question.save(update_fields=['correct_answer'])
+        question.refresh_from_db()
+        assert question.accepted_answers == ['new york', 'washington, d.c.']
+
+        bank = QuestionBank()
+        bank.load()
+        memory_service = MemoryQuestionService(bank)
+        assert memory_service.check_answer(question.pk, 'new YORK')
+        assert not memory_service.check_answer(question.pk, 'Washington')
+
+
+@pytest.mark.django_db
+class TestQuestionCounts:
+    """Тесты счётчиков вопросов квизов и категорий."""
+
+    numbers = itertools.count()
+
+    def _counts(self, instance):
+        """Перечитывает счётчики объекта из БД."""
+        instance.refresh_from_db()
+        return (
+            instance.question_count,
+            instance.easy_count,
+            instance.medium_count,
+            instance.hard_count,
+        )
+
+    def _create(self, question_service, quiz, category=None, difficulty=Difficulty.EASY):
+        """Создаёт вопрос с уникальным текстом через сервис."""
+        return question_service.create_question(quiz.id, {
+            'text': f'Question {next(self.numbers)}?',
+            'options': json.dumps(['A', 'B']),
+            'correct_answer': 'A',
+            'category': category,
+            'difficulty': difficulty,
+        })
+
+    def test_create_move_and_delete(
+        self,
+        question_service,
+        quiz_service,
+        quiz,
+        category,
+    ):
+        """Тестирует счётчики при создании, переносе и удалении вопроса."""
+        other = quiz_service.create_quiz({'title': 'Other'})
+        question = self._create(question_service, quiz, category)
+        self._create(question_service, quiz, difficulty=Difficulty.HARD)
+        assert self._counts(quiz) == (2, 1, 0, 1)
+        assert self._counts(category) == (1, 1, 0, 0)
+
+        question_service.update_question(question.id, {
+            'quiz': other,
+            'difficulty': Difficulty.MEDIUM,
+        })
+        assert self._counts(quiz) == (1, 0, 0, 1)
+        assert self._counts(other) == (1, 0, 1, 0)
+        assert self._counts(category) == (1, 0, 1, 0)
+
+        question = Question.objects.get(pk=question.id)
+        question.category = None
+        question.save(update_fields=['category'])
+        question.save()
+        assert self._counts(category) == (0, 0, 0, 0)
+
+        question_service.delete_question(question.id)
+        assert self._counts(other) == (0, 0, 0, 0)
+
+    def test_bulk_paths_and_quiz_delete(
+        self,
+        question_service,
+        quiz_service,
+        quiz,
+        category,
+    ):
+        """Тестирует счётчики при массовых операциях и удалении квиза."""
+        ids = [self._create(question_service, quiz, category).id for _ in range(4)]
+        question_service.bulk_update_questions(
+            {'difficulty': Difficulty.HARD},
+            question_ids=ids[:3],
+        )
+        assert self._counts(quiz) == (4, 1, 0, 3)
+        assert self._counts(category) == (4, 1, 0, 3)
+
+        question_service.bulk_update_questions({'category': None}, ids[:1])
+        question_service.bulk_delete_questions(ids[1:2])
+        assert self._counts(quiz) == (3, 1, 0, 2)
+        assert self._counts(category) == (2, 1, 0, 1)
+
+        quiz_service.delete_quiz(quiz.id)
+        assert self._counts(category) == (0, 0, 0, 0)
+
+    def test_counts_in_quiz_shard(self, shards, question_service, quiz_service, category):
+        """Тестирует счётчики квиза в шарде и категории в основной базе."""
+        quiz = quiz_service.create_quiz({'title': 'Sharded'})
+        self._create(question_service, quiz, category, Difficulty.MEDIUM)
+        assert self._counts(quiz) == (1, 0, 1, 0)
+        assert self._counts(category) == (1, 0, 1, 0)
+
+    def test_recount_repairs_counts(self, question_service, quiz, category):
+        """Тестирует пересчёт разошедшихся счётчиков командой recount."""
+        self._create(question_service, quiz, category)
+        self._create(question_service, quiz, difficulty=Difficulty.HARD)
+        Quiz.objects.filter(pk=quiz.pk).update(question_count=7, hard_count=0)
+        Category.objects.filter(pk=category.pk).update(easy_count=5)
+
+        assert counters.recount_question_counts() == counters.RecountResult(1, 1)
+        assert self._counts(quiz) == (2, 1, 0, 1)
+        assert self._counts(category) == (1, 1, 0, 0)
+
+        output = io.StringIO()
+        call_command('recount', stdout=output)
+        assert output.getvalue().strip() == '0 quizzes and 0 categories fixed'
+
+
+class TestLiveRounds:
+    """Тесты рассылки событий живых раундов."""
+
+    def test_slow_subscriber_keeps_latest_events(self, settings):
+        """Тестирует вытеснение старых событий из очереди медленного клиента."""
+        settings.QUIZ_LIVE_CLIENT_BUFFER = 2
+
+        async def run():
+            """Публикует три события и читает очередь подписчика."""
+            live_round = live.create_round(1)
+            subscriber = live.Subscriber(asyncio.get_running_loop(), 2)
+            assert live_round.subscribe(subscriber) is None
+            for question_id in (10, 11, 12):
+                live_round.advance(question_id, {'id': question_id})
+            await asyncio.sleep(0)
+            received = [await subscriber.get(1) for _ in range(2)]
+            assert await subscriber.get(0.01) is None
+            live.finish_round(live_round)
+            return received
+
+        received = asyncio.run(run())
+        assert [event.data['number'] for event in received] == [2, 3]
+
+    def test_stream_skips_seen_event_and_sends_heartbeat(self, settings):
+        """Тестирует Last-Event-ID, keep-alive и завершение потока."""
+        settings.QUIZ_LIVE_HEARTBEAT_SECONDS = 0.01
+        live_round = live.create_round(1)
+        event = live_round.advance(10, {'id': 10})
+
+        async def run():
+            """Читает поток переподключившегося клиента."""
+            chunks = live.stream(live_round, last_event_id=event.id)
+            first = await anext(chunks)
+            live.finish_round(live_round)
+            rest = [chunk async for chunk in chunks]
+            return [first, *rest]
+
+        chunks = asyncio.run(run())
+        assert chunks[0] == live.HEARTBEAT
+        assert chunks[-1].startswith(b'id: 2\nevent: end\n')
+        assert live.get_round(live_round.round_id) is None
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    """Тесты метрик Prometheus."""
+
+    def test_values_of_workers_are_merged(self, settings, tmp_path):
+        """Тестирует сложение файлов процессов и вывод гистограммы."""
+        settings.QUIZ_METRICS_DIR = tmp_path
+        metrics.JOB_DURATION.observe(0.5, job='test_metrics')
+        metrics.JOB_DURATION.observe(100, job='test_metrics')
+        metrics.ROWS_PROCESSED.inc(2, operation='test_metrics')
+        (tmp_path / '0.json').write_text(json.dumps({
+            'quiz_job_duration_seconds': [
+                [['test_metrics'], [1, 0, 0, 0, 0, 0, 0, 0.25, 1]],
+            ],
+            'quiz_rows_processed_total': [[['test_metrics'], 5]],
+            'quiz_removed_metric': [[[], 1]],
+        }))
+        (tmp_path / '1.json').write_text('{')
+
+        lines = metrics.render().splitlines()
+
+        assert '# TYPE quiz_job_duration_seconds histogram' in lines
+        buckets = [
+            line.rsplit(' ', 1)[1] for line in lines
+            if line.startswith(
+                'quiz_job_duration_seconds_bucket{job="test_metrics"'
+            )
+        ]
+        assert buckets == ['1', '2', '2', '2', '3', '3', '3']
+        assert 'quiz_job_duration_seconds_sum{job="test_metrics"} 100.75' in lines
+        assert 'quiz_job_duration_seconds_count{job="test_metrics"} 3' in lines
+        assert 'quiz_rows_processed_total{operation="test_metrics"} 7' in lines
+        assert not any('quiz_removed_metric' in line for line in lines)
+        assert (tmp_path / f'{os.getpid()}.json').exists()
+
+    def test_jobs(self, settings):
+        """Тестирует учёт выполненных задач и очередь по статусам."""
+        settings.QUIZ_JOBS_EAGER = True
+        settings.QUIZ_METRICS_DIR = ''
+        _flaky_calls.clear()
+        finished = metrics.JOBS_FINISHED.samples()
+        jobs.enqueue('test_flaky', fail_times=1)
+        Job.objects.create(name='test_flaky')
+
+        after = metrics.JOBS_FINISHED.samples()
+        for status in (JobStatus.PENDING, JobStatus.SUCCEEDED):
+            key = ('test_flaky', status)
+            assert after[key] == finished.get(key, 0) + 1
+        lines = metrics.render().splitlines()
+        assert 'quiz_jobs{status="pending"} 1' in lines
+        assert 'quiz_jobs{status="succeeded"} 1' in lines
+        assert 'quiz_jobs{status="failed"} 0' in lines
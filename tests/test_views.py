@@ -1,13 +1,20 @@
 """Тесты для API представлений приложения quiz."""
 
+import io
 import json
 from http import HTTPStatus
 
 import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 
+from quiz import schema
 from quiz.models import Category, Quiz, Question, Difficulty
+from quiz.services.question import QuestionService
 
 
 @pytest.fixture
@@ -27,6 +34,34 @@ class TestCategoryAPI:
         assert response.status_code == HTTPStatus.CREATED
         assert response.json()['title'] == 'History'
 
+    def test_bulk_create_categories(self, api_client) -> None:
+        """Тестирует массовое создание категорий через POST-запрос."""
+        existing = Category.objects.create(title='History')
+        Question.objects.create(
+            quiz=Quiz.objects.create(title='Quiz'),
+            category=existing,
+            text='Who was the first emperor of Rome?',
+            options=json.dumps(['Augustus', 'Nero']),
+            correct_answer='Augustus',
+            difficulty=Difficulty.EASY,
+        )
+        url = reverse('category_bulk')
+        response = api_client.post(
+            url,
+            {'titles': ['Science', 'History', 'Science']},
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [c['title'] for c in data] == ['Science', 'History']
+        assert data[1]['id'] == existing.id
+        assert data[1]['question_count'] == 1
+        assert data[1]['easy_count'] == 1
+        assert data[1]['medium_count'] == data[1]['hard_count'] == 0
+
+        response = api_client.post(url, {'titles': []}, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
     def test_list_categories(self, api_client) -> None:
         """Тестирует получение списка всех категорий через GET-запрос."""
         Category.objects.create(title='A')
@@ -122,6 +157,28 @@ class TestQuizAPI:
         assert response.status_code == HTTPStatus.OK
         assert response.json()['title'] == 'My Quiz'
 
+    def test_get_quiz_question_counts(self, api_client) -> None:
+        """Тестирует отдачу счётчиков вопросов квиза без лишних запросов."""
+        quiz = Quiz.objects.create(title='Counted')
+        for difficulty in (Difficulty.EASY, Difficulty.HARD, Difficulty.HARD):
+            Question.objects.create(
+                quiz=quiz,
+                text=f'{difficulty} {Question.objects.count()}?',
+                options='["A","B"]',
+                correct_answer='A',
+                difficulty=difficulty,
+            )
+        url = reverse('quiz_detail', kwargs={'quiz_id': quiz.id})
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert len(queries) == 1
+        data = response.json()
+        assert [
+            data[field]
+            for field in ('question_count', 'easy_count', 'medium_count', 'hard_count')
+        ] == [3, 1, 0, 2]
+
     def test_get_quiz_404(self, api_client) -> None:
         """Тестирует, что GET-запрос к несуществующему квизу возвращает 404."""
         url = reverse('quiz_detail', kwargs={'quiz_id': 99999})
@@ -148,6 +205,34 @@ class TestQuizAPI:
         assert response.status_code == HTTPStatus.NO_CONTENT
         assert not Quiz.objects.filter(pk=quiz.id).exists()
 
+    def test_delete_large_quiz_in_background(self, api_client, settings) -> None:
+        """Тестирует, что большой квиз удаляется фоновой задачей с ответом 202."""
+        settings.QUIZ_BACKGROUND_DELETE_THRESHOLD = 2
+        settings.QUIZ_JOBS_EAGER = True
+        quiz = Quiz.objects.create(title='Big')
+        for index in range(2):
+            Question.objects.create(
+                quiz=quiz,
+                text=f'Q{index}',
+                options='["A","B"]',
+                correct_answer='A',
+                difficulty=Difficulty.EASY,
+            )
+        url = reverse('quiz_detail', kwargs={'quiz_id': quiz.id})
+        response = api_client.delete(url)
+        assert response.status_code == HTTPStatus.ACCEPTED
+        job_url = reverse(
+            'job_detail',
+            kwargs={'job_id': response.json()['job_id']}
+        )
+        assert response['Location'] == job_url
+        assert not Quiz.objects.filter(pk=quiz.id).exists()
+        assert not Question.objects.filter(quiz_id=quiz.id).exists()
+
+        job = api_client.get(job_url).json()
+        assert job['status'] == 'succeeded'
+        assert job['result'] == {'deleted_questions': 2}
+
     def test_get_quiz_by_title(self, api_client) -> None:
         """Тестирует поиск квизов по части названия через GET-запрос."""
         Quiz.objects.create(title='Python Basics')
@@ -175,6 +260,40 @@ class TestQuizAPI:
         assert response.status_code == HTTPStatus.OK
         assert response.json()['text'] == 'Q1'
 
+    def test_random_questions_from_quiz(self, api_client) -> None:
+        """Тестирует выборку нескольких случайных вопросов квиза."""
+        quiz = Quiz.objects.create(title='Test')
+        for number, difficulty in enumerate(
+            (Difficulty.EASY, Difficulty.MEDIUM, Difficulty.HARD, Difficulty.HARD)
+        ):
+            Question.objects.create(
+                quiz=quiz,
+                text=f'Q{number}',
+                options='["A","B"]',
+                correct_answer='A',
+                difficulty=difficulty,
+            )
+        url = reverse('quiz_questions', kwargs={'quiz_id': quiz.id})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url, {'k': 3})
+        assert response.status_code == HTTPStatus.OK
+        assert len({question['id'] for question in response.json()}) == 3
+        # Квиз, id вопросов квиза и сами вопросы.
+        assert len(queries) == 3
+
+        response = api_client.get(
+            f'{url}?k=5&difficulty=easy&difficulty=hard&fields=difficulty'
+        )
+        assert sorted(
+            question['difficulty'] for question in response.json()
+        ) == ['easy', 'hard', 'hard']
+
+        response = api_client.get(url, {'k': 0})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        missing = reverse('quiz_questions', kwargs={'quiz_id': 99999})
+        assert api_client.get(missing).status_code == HTTPStatus.NOT_FOUND
+
     def test_random_question_404_when_no_questions(self, api_client) -> None:
         """
         Тестирует, что запрос случайного вопроса из пустого квиза
@@ -186,6 +305,121 @@ class TestQuizAPI:
         assert response.status_code == HTTPStatus.NOT_FOUND
 
 
+@pytest.mark.django_db
+class TestPracticeSetAPI:
+    """Тесты API наборов вопросов для тренировки."""
+
+    def test_practice_set(self, api_client) -> None:
+        """Тестирует сборку набора по долям сложностей и повтор по зерну."""
+        quiz = Quiz.objects.create(title='Quiz')
+        categories = [Category.objects.create(title=title) for title in 'AB']
+        for number in range(8):
+            Question.objects.create(
+                quiz=quiz,
+                category=categories[number % 2],
+                text=f'Q{number}',
+                options='["A","B"]',
+                correct_answer='A',
+                difficulty=(Difficulty.MEDIUM, Difficulty.HARD)[number // 4],
+            )
+        url = reverse('practice_set')
+        body = {
+            'categories': [category.id for category in categories],
+            'count': 4,
+            'difficulty': {'medium': 0.5, 'hard': 0.5},
+        }
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.post(url, body, format='json')
+        assert response.status_code == HTTPStatus.OK
+        # Пулы категорий и выбранные вопросы.
+        assert len(queries) == 2
+        data = response.json()
+        assert sorted(q['difficulty'] for q in data['questions']) == [
+            'hard', 'hard', 'medium', 'medium',
+        ]
+        repeated = api_client.post(
+            f'{url}?fields=id',
+            {**body, 'seed': data['seed']},
+            format='json',
+        )
+        assert repeated.json()['questions'] == [
+            {'id': question['id']} for question in data['questions']
+        ]
+
+        for invalid in (
+            {**body, 'difficulty': {'easy': 0.8, 'hard': 0.5}},
+            {**body, 'difficulty': {'impossible': 1}},
+            {**body, 'categories': []},
+        ):
+            response = api_client.post(url, invalid, format='json')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestLiveRoundAPI:
+    """Тесты живых раундов и потока Server-Sent Events."""
+
+    def test_live_round(self, api_client, async_client) -> None:
+        """Тестирует переключение вопросов ведущим и доставку подписчику."""
+        quiz = Quiz.objects.create(title='Live')
+        questions = [
+            Question.objects.create(
+                quiz=quiz,
+                text=f'Q{number}',
+                options='["A","B"]',
+                correct_answer='A',
+                difficulty=Difficulty.EASY,
+            )
+            for number in range(2)
+        ]
+        response = api_client.post(reverse('live_round_list'), {'quiz': quiz.id})
+        assert response.status_code == HTTPStatus.CREATED
+        created = response.json()
+        round_id = created['round']
+        advance_url = reverse('live_round_advance', kwargs={'round_id': round_id})
+        host = {'HTTP_X_LIVE_HOST_TOKEN': created['host_token']}
+
+        assert api_client.post(advance_url).status_code == HTTPStatus.FORBIDDEN
+        response = api_client.post(
+            advance_url,
+            {'question': questions[0].id},
+            format='json',
+            **host,
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['number'] == 1
+        assert 'correct_answer' not in response.json()['question']
+
+        async def listen():
+            """Читает текущий вопрос, следующий и конец раунда."""
+            stream = await async_client.get(created['events'])
+            assert stream['Content-Type'] == 'text/event-stream'
+            chunks = stream.streaming_content
+            received = [await anext(chunks)]
+            await sync_to_async(api_client.post)(advance_url, **host)
+            received.append(await anext(chunks))
+            await sync_to_async(api_client.delete)(
+                reverse('live_round', kwargs={'round_id': round_id}),
+                **host,
+            )
+            received.extend([chunk async for chunk in chunks])
+            return received
+
+        received = async_to_sync(listen)()
+        events = [chunk.decode().split('\n') for chunk in received]
+        assert [lines[1] for lines in events] == [
+            'event: question',
+            'event: question',
+            'event: end',
+        ]
+        texts = [json.loads(events[i][2][6:])['question']['text'] for i in (0, 1)]
+        assert sorted(texts) == ['Q0', 'Q1']
+
+        response = api_client.get(created['events'])
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
 def _question_payload(quiz_id: int, **overrides) -> dict:
     """
     Возвращает словарь с данными для создания вопроса через API.
@@ -232,12 +466,21 @@ class TestQuestionAPI:
             text='Unique question text',
             options='["A","B"]',
             correct_answer='A',
+            answer_aliases=['a'],
             difficulty=Difficulty.EASY,
         )
         url = reverse('question_detail', kwargs={'question_id': q.id})
         response = api_client.get(url)
         assert response.status_code == HTTPStatus.OK
-        assert response.json()['text'] == 'Unique question text'
+        data = response.json()
+        assert data['text'] == 'Unique question text'
+        hidden = {'answer_aliases', 'accepted_answers', 'content_hash', 'search_text'}
+        assert not hidden & data.keys()
+
+        response = api_client.put(url, {'answer_aliases': ['b']}, format='json')
+        assert response.status_code == HTTPStatus.OK
+        assert 'answer_aliases' not in response.json()
+        assert Question.objects.get(pk=q.id).answer_aliases == ['b']
 
     def test_get_question_404(self, api_client) -> None:
         """
@@ -264,6 +507,58 @@ class TestQuestionAPI:
         assert len(data) >= 1
         assert any('Searchable' in q['text'] for q in data)
 
+    def test_bulk_update_and_delete(self, api_client) -> None:
+        """Тестирует массовые PATCH и DELETE и их валидацию."""
+        quiz = Quiz.objects.create(title='Quiz')
+        category = Category.objects.create(title='Category')
+        questions = [
+            Question.objects.create(
+                quiz=quiz,
+                text=f'Q{number}',
+                options='["A","B"]',
+                correct_answer='A',
+                difficulty=Difficulty.EASY,
+            )
+            for number in range(3)
+        ]
+        url = reverse('question_bulk')
+
+        response = api_client.patch(
+            url,
+            {
+                'filter': {'quiz': quiz.id},
+                'set': {'difficulty': 'hard', 'category': category.id},
+            },
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'updated': 3}
+        assert Question.objects.filter(
+            difficulty='hard',
+            category=category,
+        ).count() == 3
+
+        response = api_client.delete(
+            url,
+            {'ids': [questions[0].id, questions[1].id]},
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {'deleted': 2}
+        assert list(Question.objects.values_list('id', flat=True)) == [
+            questions[2].id
+        ]
+
+        for body in (
+            {},
+            {'filter': {}},
+            {'ids': [1], 'filter': {'quiz': quiz.id}},
+            {'ids': [1], 'set': {}},
+            {'ids': [1], 'set': {'category': 999}},
+        ):
+            response = api_client.patch(url, body, format='json')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, body
+
     def test_check_answer_correct(self, api_client) -> None:
         """Тестирует проверку правильного ответа через POST-запрос."""
         quiz = Quiz.objects.create(title='Quiz')
@@ -294,6 +589,42 @@ class TestQuestionAPI:
         assert response.status_code == HTTPStatus.OK
         assert response.json()['correct'] is False
 
+    def test_numeric_match_policy(self, api_client) -> None:
+        """Тестирует смену политики проверки ответа через PUT-запрос."""
+        quiz = Quiz.objects.create(title='Quiz')
+        q = Question.objects.create(
+            quiz=quiz,
+            text='Q',
+            options='["1","2"]',
+            correct_answer='2',
+            difficulty=Difficulty.EASY,
+        )
+        url = reverse('question_detail', kwargs={'question_id': q.id})
+        response = api_client.put(
+            url,
+            {'match_policy': 'numeric', 'correct_answer': 'two'},
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'correct_answer' in response.json()
+
+        response = api_client.put(
+            url,
+            {'match_policy': 'numeric', 'answer_tolerance': 0.5},
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = api_client.put(url, {'correct_answer': 'three'}, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'correct_answer' in response.json()
+        response = api_client.put(url, {'answer_aliases': ['two']}, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'answer_aliases' in response.json()
+
+        url = reverse('question_answer', kwargs={'question_id': q.id})
+        response = api_client.post(url, {'answer': '2.4'}, format='json')
+        assert response.json()['correct'] is True
+
     def test_check_answer_404(self, api_client) -> None:
         """Тестирует, что для несуществующего вопроса возвращается 404."""
         url = reverse('question_answer', kwargs={'question_id': 99999})
@@ -329,3 +660,393 @@ class TestQuestionAPI:
         response = api_client.delete(url)
         assert response.status_code == HTTPStatus.NO_CONTENT
         assert not Question.objects.filter(pk=q.id).exists()
+
+    def test_list_questions_sparse_fields(self, api_client) -> None:
+        """Тестирует, что ?fields= ограничивает поля в ответе."""
+        quiz = Quiz.objects.create(title='Quiz')
+        Question.objects.create(
+            quiz=quiz,
+            text='Q1',
+            options='["A","B"]',
+            correct_answer='A',
+            difficulty=Difficulty.EASY,
+        )
+        url = reverse('question_list')
+        response = api_client.get(url, {'fields': 'id,text,difficulty'})
+        assert response.status_code == HTTPStatus.OK
+        assert set(response.json()[0]) == {'id', 'text', 'difficulty'}
+
+    def test_sparse_fields_unknown_field_400(self, api_client) -> None:
+        """Тестирует, что неизвестное поле в ?fields= возвращает 400."""
+        url = reverse('question_list')
+        response = api_client.get(url, {'fields': 'id,secret'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_expand_related_objects(self, api_client) -> None:
+        """Тестирует ?expand= без запросов на каждый вопрос."""
+        category = Category.objects.create(title='Science')
+        for number in range(5):
+            quiz = Quiz.objects.create(title=f'Quiz {number}')
+            Question.objects.create(
+                quiz=quiz,
+                category=category,
+                text=f'Q{number}',
+                options='["A","B"]',
+                correct_answer='A',
+                difficulty=Difficulty.EASY,
+            )
+        url = reverse('question_list')
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url, {'expand': 'category,quiz'})
+        assert response.status_code == HTTPStatus.OK
+        assert len(queries) == 1
+        for item in response.json():
+            assert item['category'] == {'id': category.id, 'title': 'Science'}
+            assert item['quiz']['title'] == f'Quiz {item["text"][1:]}'
+        first = response.json()[0]
+
+        response = api_client.get(
+            url,
+            {'expand': 'quiz', 'fields': 'id,category'},
+        )
+        assert set(response.json()[0]) == {'id', 'category'}
+        assert response.json()[0]['category'] == category.id
+
+        url = reverse('question_detail', kwargs={'question_id': first['id']})
+        response = api_client.get(url, {'expand': 'category'})
+        assert response.json()['category']['title'] == 'Science'
+        response = api_client.get(url, {'expand': 'options'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_list_questions_filtered_with_count(self, api_client) -> None:
+        """Тестирует фильтры списка вопросов и заголовок X-Total-Count."""
+        quiz = Quiz.objects.create(title='Quiz')
+        other = Quiz.objects.create(title='Other')
+        for target, difficulty in (
+            (quiz, Difficulty.EASY),
+            (quiz, Difficulty.HARD),
+            (other, Difficulty.HARD),
+        ):
+            Question.objects.create(
+                quiz=target,
+                text='Q',
+                options='["A","B"]',
+                correct_answer='A',
+                difficulty=difficulty,
+            )
+        url = reverse('question_list')
+        response = api_client.get(
+            url,
+            {'quiz': quiz.id, 'difficulty': 'hard', 'count': 'exact'},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert len(response.json()) == 1
+        assert response['X-Total-Count'] == '1'
+
+    def test_list_questions_invalid_filter_400(self, api_client) -> None:
+        """Тестирует, что некорректная сложность в фильтре возвращает 400."""
+        url = reverse('question_list')
+        response = api_client.get(url, {'difficulty': 'impossible'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestShardedAPI:
+    """Тесты API при раскладке квизов по шардам."""
+
+    def test_question_requests_go_to_quiz_shard(self, api_client, shards) -> None:
+        """Тестирует чтение и обновление вопроса в шарде его квиза."""
+        response = api_client.post(
+            reverse('quiz_list'),
+            {'title': 'Sharded quiz'},
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        quiz_id = response.json()['id']
+        question = QuestionService().create_question(quiz_id, {
+            'text': 'Where am I?',
+            'options': '["Here","There"]',
+            'correct_answer': 'Here',
+            'difficulty': Difficulty.EASY,
+        })
+        question_id = question.id
+        response = api_client.put(
+            reverse('question_detail', kwargs={'question_id': question_id}),
+            {'quiz': quiz_id, 'text': 'Still here?'},
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = api_client.get(
+            reverse('question_detail', kwargs={'question_id': question_id})
+        )
+        assert response.json()['text'] == 'Still here?'
+        assert response.json()['quiz'] == quiz_id
+        response = api_client.get(
+            reverse('quiz_question', kwargs={'quiz_id': quiz_id})
+        )
+        assert response.json()['id'] == question_id
+        response = api_client.get(
+            reverse('question_detail', kwargs={'question_id': 10 ** 6})
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestSnapshotAPI:
+    """Тесты публикации и отдачи снимков квизов."""
+
+    def test_publish_and_fetch_snapshot(self, api_client, settings, tmp_path) -> None:
+        """Тестирует публикацию через API и отдачу файлов снимков."""
+        settings.QUIZ_SNAPSHOT_DIR = tmp_path
+        settings.QUIZ_JOBS_EAGER = True
+        quiz = Quiz.objects.create(title='Published')
+        response = api_client.post(reverse('quiz_publish'), {}, format='json')
+        assert response.status_code == HTTPStatus.ACCEPTED
+        job = api_client.get(response['Location']).json()
+        assert job['result'] == {'written': 1, 'unchanged': 0, 'removed': 0}
+
+        response = api_client.get(
+            reverse('quiz_snapshot', kwargs={'name': 'manifest.json'})
+        )
+        assert 'no-cache' in response['Cache-Control']
+        entry = json.loads(b''.join(response.streaming_content))[
+            'quizzes'
+        ][str(quiz.id)]
+        response = api_client.get(
+            reverse('quiz_snapshot', kwargs={'name': entry['file']})
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert 'immutable' in response['Cache-Control']
+        assert json.loads(b''.join(response.streaming_content))['questions'] == []
+
+    def test_unknown_snapshot_404(self, api_client, settings, tmp_path) -> None:
+        """Тестирует, что отдаются только файлы снимков."""
+        settings.QUIZ_SNAPSHOT_DIR = tmp_path
+        url = reverse('quiz_snapshot', kwargs={'name': '..settings.py'})
+        assert api_client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestQuestionAdmin:
+    """Тесты changelist вопросов в админке."""
+
+    def _create_questions(self, quiz, count):
+        """Создаёт несколько вопросов в квизе."""
+        return [
+            Question.objects.create(
+                quiz=quiz,
+                text=f'Question number {index}',
+                options='["A","B"]',
+                correct_answer='A',
+                difficulty=Difficulty.EASY,
+            )
+            for index in range(count)
+        ]
+
+    def test_changelist_search_and_filters(self, admin_client) -> None:
+        """Тестирует поиск по префиксу и фильтры с автодополнением."""
+        quiz = Quiz.objects.create(title='Geography')
+        other = Quiz.objects.create(title='History')
+        self._create_questions(quiz, 2)
+        Question.objects.create(
+            quiz=other,
+            text='Other text',
+            options='["A","B"]',
+            correct_answer='A',
+            difficulty=Difficulty.HARD,
+        )
+        url = reverse('admin:quiz_question_changelist')
+
+        response = admin_client.get(url, {'q': 'question NUMBER'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.context['cl'].result_count == 2
+
+        response = admin_client.get(url, {'q': 'Hist'})
+        assert response.context['cl'].result_count == 1
+
+        response = admin_client.get(url, {'quiz': other.id})
+        assert response.status_code == HTTPStatus.OK
+        assert response.context['cl'].result_count == 1
+
+    def test_changelist_search_cyrillic(self, admin_client) -> None:
+        """Тестирует поиск по префиксу без учёта регистра для кириллицы."""
+        quiz = Quiz.objects.create(title='География')
+        question = Question.objects.create(
+            quiz=quiz,
+            text='Столица Франции?',
+            options='["Париж","Лион"]',
+            correct_answer='Париж',
+            difficulty=Difficulty.EASY,
+        )
+        url = reverse('admin:quiz_question_changelist')
+
+        for term in ('Столица', 'столица', 'СТОЛИЦА ФР'):
+            response = admin_client.get(url, {'q': term})
+            assert response.status_code == HTTPStatus.OK
+            assert list(response.context['cl'].result_list) == [question]
+
+        question.text = 'Река в Париже?'
+        question.save(update_fields=('text',))
+        response = admin_client.get(url, {'q': 'река'})
+        assert list(response.context['cl'].result_list) == [question]
+        response = admin_client.get(url, {'q': 'столица'})
+        assert response.context['cl'].result_count == 0
+
+    def test_changelist_list_editable_bulk_update(self, admin_client) -> None:
+        """Тестирует сохранение list_editable одним bulk_update."""
+        quiz = Quiz.objects.create(title='Quiz')
+        questions = self._create_questions(quiz, 2)
+        data = {
+            'form-TOTAL_FORMS': '2',
+            'form-INITIAL_FORMS': '2',
+            'form-MIN_NUM_FORMS': '0',
+            'form-MAX_NUM_FORMS': '1000',
+            '_save': 'Save',
+        }
+        for index, question in enumerate(questions):
+            data.update({
+                f'form-{index}-id': question.id,
+                f'form-{index}-difficulty': Difficulty.HARD.value,
+                f'form-{index}-category': '',
+                f'form-{index}-quiz': quiz.id,
+            })
+        url = reverse('admin:quiz_question_changelist')
+        response = admin_client.post(url, data)
+        assert response.status_code == HTTPStatus.FOUND
+        assert set(
+            Question.objects.values_list('difficulty', flat=True)
+        ) == {Difficulty.HARD}
+        quiz.refresh_from_db()
+        assert (quiz.question_count, quiz.easy_count, quiz.hard_count) == (2, 0, 2)
+
+
+@pytest.mark.django_db
+class TestSchemaAPI:
+    """Тесты отдачи предсобранной OpenAPI-схемы."""
+
+    def test_schema_served_with_etag(self, api_client, settings, tmp_path) -> None:
+        """Тестирует отдачу схемы из памяти и ответ 304 по ETag."""
+        settings.QUIZ_SCHEMA_PATH = tmp_path / 'openapi.json'
+        url = reverse('schema-json', kwargs={'format': 'json'})
+        response = api_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert '/quiz/' in response.json()['paths']
+        etag = response['ETag']
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_schema_artifact_reused_until_code_changes(self, settings, tmp_path) -> None:
+        """Тестирует, что сохранённая схема не пересобирается без изменений кода."""
+        settings.QUIZ_SCHEMA_PATH = tmp_path / 'openapi.json'
+        first = schema.build_schema(force=True)
+        fingerprint = schema.code_fingerprint()
+        assert schema.load_schema(settings.QUIZ_SCHEMA_PATH, fingerprint) == first
+        assert schema.load_schema(settings.QUIZ_SCHEMA_PATH, 'changed') is None
+
+    def test_swagger_ui_page(self, api_client, settings, tmp_path) -> None:
+        """Тестирует, что страница Swagger UI ссылается на файл схемы."""
+        settings.QUIZ_SCHEMA_PATH = tmp_path / 'openapi.json'
+        response = api_client.get(reverse('schema-swagger-ui'))
+        assert response.status_code == HTTPStatus.OK
+        assert b'swagger.json' in response.content
+
+
+@pytest.mark.django_db
+class TestAutocompleteAPI:
+    """Тесты API подсказок."""
+
+    def test_autocomplete(self, api_client, monkeypatch) -> None:
+        """Тестирует подсказки по названиям квизов и валидацию запроса."""
+        monkeypatch.setattr('quiz.autocomplete._index', None)
+        quiz = Quiz.objects.create(title='Python for beginners')
+        Quiz.objects.create(title='Django ORM')
+        url = reverse('autocomplete')
+
+        response = api_client.get(url, {'q': 'pyth beg'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == [{'id': quiz.id, 'text': quiz.title}]
+
+        response = api_client.get(url, {'q': 'py', 'type': 'question'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == []
+
+        response = api_client.get(url, {'type': 'unknown'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestRelatedAPI:
+    """Тесты API похожих вопросов."""
+
+    def test_related(self, api_client, settings, tmp_path, quiz) -> None:
+        """Тестирует выдачу похожих вопросов и валидацию ?k=."""
+        settings.QUIZ_RELATED_DIR = tmp_path
+        questions = [
+            Question.objects.create(
+                quiz=quiz,
+                text=text,
+                options=json.dumps(['Yes', 'No']),
+                correct_answer='Yes',
+                difficulty=Difficulty.EASY.value,
+            )
+            for text in (
+                'What is the capital of France?',
+                'Is Paris the capital of France?',
+                'How many legs does a spider have?',
+            )
+        ]
+        url = reverse('question_related', args=[questions[0].id])
+
+        response = api_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == []
+
+        call_command('build_related_questions', '--full', stdout=io.StringIO())
+        response = api_client.get(url, {'k': 1, 'fields': 'id,text'})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == [
+            {'id': questions[1].id, 'text': questions[1].text}
+        ]
+        response = api_client.get(url)
+        assert [item['id'] for item in response.json()][0] == questions[1].id
+
+        response = api_client.get(url, {'k': 0})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = api_client.get(reverse('question_related', args=[999]))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestMetricsAPI:
+    """Тесты эндпоинта метрик."""
+
+    def test_metrics(self, api_client, settings, quiz) -> None:
+        """Тестирует метрики запросов к API и формат ответа."""
+        settings.QUIZ_METRICS_DIR = ''
+        api_client.get(reverse('quiz_list'))
+        api_client.get(reverse('quiz_detail', args=[999]))
+
+        response = api_client.get(reverse('metrics'))
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+        lines = response.content.decode().splitlines()
+        assert '# TYPE quiz_http_request_duration_seconds histogram' in lines
+        assert any(
+            line.startswith('quiz_http_responses_total{view="quiz_list",status="200"} ')
+            for line in lines
+        )
+        assert any(
+            line.startswith('quiz_http_responses_total{view="quiz_detail",status="404"} ')
+            for line in lines
+        )
+        assert any(
+            line.startswith(
+                'quiz_http_request_db_queries_bucket{view="quiz_list",le="+Inf"} '
+            )
+            for line in lines
+        )
+        assert 'quiz_jobs{status="pending"} 0' in lines
+
+        response = api_client.post(reverse('metrics'))
+        assert response.status_code == HTTPStatus.METHOD_NOT_ALLOWED